@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from numba import njit
 
 def backtest_strategy(df, short_window, long_window, cash_allocation_percentage=0.9, transaction_cost_pct=0.001, stop_loss_pct=0.05, take_profit_pct=0.10):
     # Calculate moving averages
@@ -16,42 +17,52 @@ def backtest_strategy(df, short_window, long_window, cash_allocation_percentage=
 
     # Initialize portfolio
     initial_capital = 10000.0
+
+    history = run_backtest(df['Close'].to_numpy(dtype=np.float64), df['Signal'].to_numpy(dtype=np.int64),
+                           initial_capital, cash_allocation_percentage, transaction_cost_pct,
+                           stop_loss_pct, take_profit_pct)
+
+    portfolio_df = pd.DataFrame(history, index=pd.Index(df.index.to_numpy(), name='Open time'))
+    portfolio_df['Returns'] = portfolio_df['Total Value'].pct_change()
+
+    return portfolio_df
+
+def run_backtest(close, signal, initial_capital=10000.0, cash_allocation_percentage=0.9, transaction_cost_pct=0.001, stop_loss_pct=0.05, take_profit_pct=0.10):
+    """Single pass over the bars; returns the portfolio history as columnar arrays."""
+    cash, btc_holdings = _backtest_nb(close, signal, initial_capital, cash_allocation_percentage,
+                                      transaction_cost_pct, stop_loss_pct, take_profit_pct)
+    holdings_usd = btc_holdings * close
+    return {
+        'Cash': cash,
+        'BTC Holdings': btc_holdings,
+        'Holdings USD': holdings_usd,
+        'Total Value': cash + holdings_usd,
+    }
+
+@njit(cache=True)
+def _backtest_nb(close, signal, initial_capital, cash_allocation_percentage, transaction_cost_pct, stop_loss_pct, take_profit_pct):
+    n = close.shape[0]
+    cash_out = np.empty(n)
+    holdings_out = np.empty(n)
     cash = initial_capital
     btc_holdings = 0.0
     entry_price = 0.0 # To track the price at which BTC was last bought
+    prev_signal = 0 # Signal of the previous bar, to detect crossovers
 
-    portfolio_history = []
-
-    for i, row in df.iterrows():
-        current_close_price = row['Close']
-        signal = row['Signal']
-
-        # Previous signal to detect crossovers
-        prev_signal = df.loc[df.index < i, 'Signal'].iloc[-1] if not df.loc[df.index < i].empty else 0
+    for i in range(n):
+        current_close_price = close[i]
 
         # Check for Stop-Loss or Take-Profit conditions if holding BTC
         if btc_holdings > 0 and entry_price > 0:
-            # Calculate current profit/loss percentage
             current_profit_loss_pct = (current_close_price - entry_price) / entry_price
-
-            # Stop-Loss
-            if current_profit_loss_pct <= -stop_loss_pct:
-                usd_received = btc_holdings * current_close_price
-                cash += usd_received * (1 - transaction_cost_pct) # Deduct transaction cost
-                # print(f"Stop-Loss Sell at {i}: {btc_holdings:.4f} BTC for {usd_received:.2f} USD @ {current_close_price:.2f} (Loss: {current_profit_loss_pct:.2%})")
-                btc_holdings = 0.0
-                entry_price = 0.0
-
-            # Take-Profit
-            elif current_profit_loss_pct >= take_profit_pct:
+            if current_profit_loss_pct <= -stop_loss_pct or current_profit_loss_pct >= take_profit_pct:
                 usd_received = btc_holdings * current_close_price
                 cash += usd_received * (1 - transaction_cost_pct) # Deduct transaction cost
-                # print(f"Take-Profit Sell at {i}: {btc_holdings:.4f} BTC for {usd_received:.2f} USD @ {current_close_price:.2f} (Profit: {current_profit_loss_pct:.2%})")
                 btc_holdings = 0.0
                 entry_price = 0.0
 
         # Buy signal (SMA crosses above LMA) and not currently holding BTC
-        if signal == 1 and prev_signal != 1 and btc_holdings == 0:
+        if signal[i] == 1 and prev_signal != 1 and btc_holdings == 0:
             amount_to_invest = cash * cash_allocation_percentage
             if amount_to_invest > 0:
                 btc_bought = amount_to_invest / current_close_price
@@ -59,56 +70,43 @@ def backtest_strategy(df, short_window, long_window, cash_allocation_percentage=
                 cash -= amount_to_invest * transaction_cost_pct # Deduct transaction cost
                 btc_holdings += btc_bought
                 entry_price = current_close_price # Record entry price
-                # print(f"Buy at {i}: {amount_to_invest:.2f} USD worth of BTC ({btc_bought:.4f} BTC) @ {current_close_price:.2f}")
 
         # Sell signal (SMA crosses below LMA) and currently holding BTC
-        elif signal == -1 and prev_signal != -1 and btc_holdings > 0:
+        elif signal[i] == -1 and prev_signal != -1 and btc_holdings > 0:
             usd_received = btc_holdings * current_close_price
             cash += usd_received * (1 - transaction_cost_pct) # Deduct transaction cost
-            # print(f"Sell at {i}: {btc_holdings:.4f} BTC for {usd_received:.2f} USD @ {current_close_price:.2f}")
             btc_holdings = 0.0
             entry_price = 0.0
 
-        current_holdings_usd = btc_holdings * current_close_price
-        total_value = cash + current_holdings_usd
-
-        portfolio_history.append({
-            'Open time': i,
-            'Cash': cash,
-            'BTC Holdings': btc_holdings,
-            'Holdings USD': current_holdings_usd,
-            'Total Value': total_value
-        })
+        cash_out[i] = cash
+        holdings_out[i] = btc_holdings
+        prev_signal = signal[i]
 
-    portfolio_df = pd.DataFrame(portfolio_history).set_index('Open time')
-    portfolio_df['Returns'] = portfolio_df['Total Value'].pct_change()
-
-    return portfolio_df
+    return cash_out, holdings_out
 
 # Function to calculate performance metrics
 def calculate_metrics(portfolio_df, initial_capital):
-    total_return = (portfolio_df['Total Value'].iloc[-1] - initial_capital) / initial_capital * 100
+    value = portfolio_df['Total Value'].to_numpy(dtype=np.float64)
+    total_return = (value[-1] - initial_capital) / initial_capital * 100
 
     # Annualized Return (CAGR)
     # Assuming 1-hour data, 24 hours/day, 365 days/year
     num_years = (portfolio_df.index[-1] - portfolio_df.index[0]).days / 365.25
     if num_years > 0:
-        cagr = ((portfolio_df['Total Value'].iloc[-1] / initial_capital) ** (1 / num_years)) - 1
+        cagr = ((value[-1] / initial_capital) ** (1 / num_years)) - 1
     else:
         cagr = np.nan
 
-    # Max Drawdown
-    # Calculate the running maximum
-    running_max = portfolio_df['Total Value'].cummax()
-    # Calculate the daily drawdown
-    drawdown = (portfolio_df['Total Value'] / running_max) - 1
+    # Max Drawdown against the running maximum
+    drawdown = value / np.maximum.accumulate(value) - 1
     max_drawdown = drawdown.min() * 100
 
     # Sharpe Ratio (assuming risk-free rate is 0 for simplicity)
-    # Daily returns for Sharpe Ratio
-    daily_returns = portfolio_df['Total Value'].pct_change().dropna()
-    if daily_returns.std() != 0:
-        sharpe_ratio = daily_returns.mean() / daily_returns.std() * np.sqrt(252 * 24) # 252 trading days, 24 hours/day
+    returns = value[1:] / value[:-1] - 1
+    returns = returns[~np.isnan(returns)]
+    std = returns.std(ddof=1) if len(returns) > 1 else np.nan
+    if std != 0:
+        sharpe_ratio = returns.mean() / std * np.sqrt(252 * 24) # 252 trading days, 24 hours/day
     else:
         sharpe_ratio = np.nan
 
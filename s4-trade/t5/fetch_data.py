@@ -1,9 +1,21 @@
+import os
+import sys
 import requests
 import pandas as pd
 import time
 
-def fetch_klines(symbol, interval, start_time, end_time):
+KLINE_COLUMNS = [
+    "Open time", "Open", "High", "Low", "Close", "Volume",
+    "Close time", "Quote asset volume", "Number of trades",
+    "Taker buy base asset volume", "Taker buy quote asset volume", "Ignore"
+]
+CSV_COLUMNS = ["Open time", "Open", "High", "Low", "Close", "Volume"]
+
+def fetch_klines(symbol, interval, start_time, end_time, session=None):
     url = "https://api.binance.com/api/v3/klines"
+    # t5 stands alone, so this is its own pooled session rather than t7's http_client;
+    # a refresh is one request, and kline pages (the last candle still forming) must not be disk-cached
+    session = session or requests.Session()
     klines = []
     limit = 1000 # Max 1000 klines per request
 
@@ -12,44 +24,77 @@ def fetch_klines(symbol, interval, start_time, end_time):
             "symbol": symbol,
             "interval": interval,
             "startTime": start_time,
+            "endTime": end_time,
             "limit": limit
         }
-        response = requests.get(url, params=params)
+        response = session.get(url, params=params, timeout=30)
+        response.raise_for_status()
         data = response.json()
 
         if not data:
             break
 
         klines.extend(data)
+        if len(data) < limit:
+            break # Short page: nothing newer yet
         start_time = data[-1][6] + 1 # Next request starts after the last kline's close time
 
         # Binance API rate limit: 1200 requests per minute.
         # We are fetching 1000 klines per request, so we need to be careful.
         # Adding a small delay to avoid hitting rate limits.
-        time.sleep(0.1) 
-        
+        time.sleep(0.1)
+
     return klines
 
-def save_to_csv(klines, filename):
-    df = pd.DataFrame(klines, columns=[
-        "Open time", "Open", "High", "Low", "Close", "Volume",
-        "Close time", "Quote asset volume", "Number of trades",
-        "Taker buy base asset volume", "Taker buy quote asset volume", "Ignore"
-    ])
+def klines_to_frame(klines):
+    df = pd.DataFrame(klines, columns=KLINE_COLUMNS)
     df["Open time"] = pd.to_datetime(df["Open time"], unit="ms")
-    df["Close time"] = pd.to_datetime(df["Close time"], unit="ms")
-    df = df[["Open time", "Open", "High", "Low", "Close", "Volume"]]
+    return df[CSV_COLUMNS]
+
+def save_to_csv(klines, filename):
+    klines_to_frame(klines).to_csv(filename, index=False)
+    print(f"Data saved to {filename}")
+
+def sync_to_csv(symbol, interval, start_time, filename, end_time=None, fetch=fetch_klines):
+    """Bring the CSV up to date, downloading only candles it doesn't have yet.
+
+    The high-water mark is the newest "Open time" already in the file. The
+    sync re-requests from that candle (it may still have been forming when it
+    was saved), replaces it and appends everything newer, so refreshing an
+    existing dataset is a single request instead of the full history. Rows
+    before ``start_time`` are dropped to keep the file a rolling window.
+    """
+    end_time = end_time or int(time.time() * 1000)
+    since = start_time
+    old = None
+    if os.path.exists(filename):
+        # Prices stay strings so existing rows are written back unchanged
+        old = pd.read_csv(filename, dtype=str)
+        old["Open time"] = pd.to_datetime(old["Open time"])
+        if len(old):
+            since = max(start_time, int(old["Open time"].iloc[-1].value // 1_000_000))
+
+    klines = fetch(symbol, interval, since, end_time)
+    print(f"Fetched {len(klines)} klines from {pd.to_datetime(since, unit='ms')}")
+    df = klines_to_frame(klines)
+    if old is not None:
+        df = pd.concat([old[~old["Open time"].isin(df["Open time"])], df], ignore_index=True)
+    df = df[df["Open time"] >= pd.to_datetime(start_time, unit="ms")]
     df.to_csv(filename, index=False)
     print(f"Data saved to {filename}")
+    return df
 
 if __name__ == "__main__":
     symbol = "BTCUSDT"
     interval = "1h" # 1-hour candles
-    
+
     # Fetch data for the last 90 days (approx. 3 months)
     end_time = int(time.time() * 1000)
     start_time = end_time - (90 * 24 * 60 * 60 * 1000) # 90 days ago in milliseconds
 
-    print(f"Fetching {symbol} {interval} data from {pd.to_datetime(start_time, unit='ms')} to {pd.to_datetime(end_time, unit='ms')}...")
-    klines = fetch_klines(symbol, interval, start_time, end_time)
-    save_to_csv(klines, "BTCUSDT_1h.csv")
+    if "--full" in sys.argv:
+        print(f"Fetching {symbol} {interval} data from {pd.to_datetime(start_time, unit='ms')} to {pd.to_datetime(end_time, unit='ms')}...")
+        klines = fetch_klines(symbol, interval, start_time, end_time)
+        save_to_csv(klines, "BTCUSDT_1h.csv")
+    else:
+        sync_to_csv(symbol, interval, start_time, "BTCUSDT_1h.csv", end_time)
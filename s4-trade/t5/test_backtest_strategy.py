@@ -0,0 +1,110 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest_strategy import backtest_strategy, calculate_metrics
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def reference_backtest(df, short_window, long_window, cash_allocation_percentage=0.9, transaction_cost_pct=0.001, stop_loss_pct=0.05, take_profit_pct=0.10):
+    """The original iterrows() implementation."""
+    df['SMA'] = df['Close'].rolling(window=short_window).mean()
+    df['LMA'] = df['Close'].rolling(window=long_window).mean()
+    df['Signal'] = 0
+    df.loc[df['SMA'] > df['LMA'], 'Signal'] = 1
+    df.loc[df['SMA'] < df['LMA'], 'Signal'] = -1
+    df.dropna(inplace=True)
+
+    cash = 10000.0
+    btc_holdings = 0.0
+    entry_price = 0.0
+    portfolio_history = []
+    for i, row in df.iterrows():
+        current_close_price = row['Close']
+        signal = row['Signal']
+        prev_signal = df.loc[df.index < i, 'Signal'].iloc[-1] if not df.loc[df.index < i].empty else 0
+        if btc_holdings > 0 and entry_price > 0:
+            current_profit_loss_pct = (current_close_price - entry_price) / entry_price
+            if current_profit_loss_pct <= -stop_loss_pct:
+                cash += btc_holdings * current_close_price * (1 - transaction_cost_pct)
+                btc_holdings = 0.0
+                entry_price = 0.0
+            elif current_profit_loss_pct >= take_profit_pct:
+                cash += btc_holdings * current_close_price * (1 - transaction_cost_pct)
+                btc_holdings = 0.0
+                entry_price = 0.0
+        if signal == 1 and prev_signal != 1 and btc_holdings == 0:
+            amount_to_invest = cash * cash_allocation_percentage
+            if amount_to_invest > 0:
+                btc_bought = amount_to_invest / current_close_price
+                cash -= amount_to_invest
+                cash -= amount_to_invest * transaction_cost_pct
+                btc_holdings += btc_bought
+                entry_price = current_close_price
+        elif signal == -1 and prev_signal != -1 and btc_holdings > 0:
+            cash += btc_holdings * current_close_price * (1 - transaction_cost_pct)
+            btc_holdings = 0.0
+            entry_price = 0.0
+        current_holdings_usd = btc_holdings * current_close_price
+        portfolio_history.append({'Open time': i, 'Cash': cash, 'BTC Holdings': btc_holdings,
+                                  'Holdings USD': current_holdings_usd,
+                                  'Total Value': cash + current_holdings_usd})
+    portfolio_df = pd.DataFrame(portfolio_history).set_index('Open time')
+    portfolio_df['Returns'] = portfolio_df['Total Value'].pct_change()
+    return portfolio_df
+
+
+def reference_metrics(portfolio_df, initial_capital):
+    """The original pandas implementation of calculate_metrics."""
+    total_return = (portfolio_df['Total Value'].iloc[-1] - initial_capital) / initial_capital * 100
+    num_years = (portfolio_df.index[-1] - portfolio_df.index[0]).days / 365.25
+    cagr = ((portfolio_df['Total Value'].iloc[-1] / initial_capital) ** (1 / num_years)) - 1 if num_years > 0 else np.nan
+    running_max = portfolio_df['Total Value'].cummax()
+    max_drawdown = ((portfolio_df['Total Value'] / running_max) - 1).min() * 100
+    daily_returns = portfolio_df['Total Value'].pct_change().dropna()
+    sharpe_ratio = daily_returns.mean() / daily_returns.std() * np.sqrt(252 * 24) if daily_returns.std() != 0 else np.nan
+    return {"Total Return": total_return, "CAGR": cagr, "Max Drawdown": max_drawdown, "Sharpe Ratio": sharpe_ratio}
+
+
+def load_btc():
+    df = pd.read_csv(os.path.join(HERE, "BTCUSDT_1h.csv"), parse_dates=['Open time'])
+    df.set_index('Open time', inplace=True)
+    df['Close'] = pd.to_numeric(df['Close'])
+    return df
+
+
+def random_walk(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({'Close': close}, index=pd.date_range('2020-01-01', periods=n, freq='h', name='Open time'))
+
+
+@pytest.mark.parametrize('df,short,long,params', [
+    (load_btc(), 20, 50, {}),
+    (load_btc(), 5, 30, {'stop_loss_pct': 0.005, 'take_profit_pct': 0.01}),
+    (random_walk(1500, 0), 10, 40, {'stop_loss_pct': 0.03, 'take_profit_pct': 0.04, 'cash_allocation_percentage': 0.5}),
+])
+def test_engine_matches_original_loop(df, short, long, params):
+    expected = reference_backtest(df.copy(), short, long, **params)
+    portfolio = backtest_strategy(df.copy(), short, long, **params)
+    pd.testing.assert_frame_equal(portfolio, expected, check_exact=True)
+    assert calculate_metrics(portfolio, 10000.0) == pytest.approx(reference_metrics(expected, 10000.0), rel=1e-12, nan_ok=True)
+
+
+def test_engine_runs_long_series():
+    df = random_walk(200_000, 1)
+    portfolio = backtest_strategy(df.copy(), 20, 50)
+    assert len(portfolio) == 200_000 - 49 and np.isfinite(portfolio['Total Value']).all()
+
+
+@pytest.mark.benchmark
+def test_engine_is_linear_in_bars():
+    df = random_walk(200_000, 1)
+    backtest_strategy(df.iloc[:1000].copy(), 20, 50)  # compile
+    started = time.perf_counter()
+    backtest_strategy(df.copy(), 20, 50)
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from fetch_data import sync_to_csv
+
+H = 60 * 60 * 1000
+
+
+def kline(t, close):
+    return [t, "1.00000000", "2.00000000", "0.50000000", f"{close:.8f}", "10.00000000", t + H - 1,
+            "0", 1, "0", "0", "0"]
+
+
+class FakeBinance:
+    def __init__(self, closes):
+        self.closes = closes
+        self.calls = []
+
+    def __call__(self, symbol, interval, start_time, end_time):
+        self.calls.append(start_time)
+        return [kline(i * H, c) for i, c in enumerate(self.closes) if start_time <= i * H < end_time]
+
+
+def test_sync_only_fetches_from_the_newest_candle(tmp_path):
+    path = str(tmp_path / 'BTCUSDT_1h.csv')
+    first = FakeBinance([1.0, 2.0, 3.0])
+    sync_to_csv('BTCUSDT', '1h', 0, path, end_time=3 * H, fetch=first)
+    assert first.calls == [0]
+    before = open(path).read()
+
+    # The last saved candle was still forming; it is fetched again and replaced
+    second = FakeBinance([1.0, 2.0, 3.5, 4.0, 5.0])
+    sync_to_csv('BTCUSDT', '1h', 0, path, end_time=5 * H, fetch=second)
+    assert second.calls == [2 * H]
+    df = pd.read_csv(path)
+    assert df['Close'].tolist() == [1.0, 2.0, 3.5, 4.0, 5.0]
+    assert df['Open time'].tolist() == [str(pd.to_datetime(i * H, unit='ms')) for i in range(5)]
+    # Untouched rows keep their original formatting
+    assert open(path).read().startswith(before.rsplit('\n', 2)[0])
+
+    # Rows older than the window start are dropped
+    third = FakeBinance([1.0, 2.0, 3.5, 4.0, 5.0])
+    sync_to_csv('BTCUSDT', '1h', 2 * H, path, end_time=5 * H, fetch=third)
+    assert pd.read_csv(path)['Close'].tolist() == [3.5, 4.0, 5.0]
@@ -7,6 +7,8 @@ import plotly.graph_objects as go
 import inspect
 from typing import Any, Dict, Optional
 
+from indicator_cache import cached_run  # results survive reruns; same series + params skip recomputation
+
 st.set_page_config(page_title="VectorBT Playground", layout="wide")
 
 st.title("🛝 VectorBT Playground")
@@ -92,7 +94,7 @@ def dynamic_ui_for_func(func: callable, prefix: str = "") -> Dict[str, Any]:
 
 def run_indicator(ind_class: Any, close: pd.Series, **kwargs):
     try:
-        return ind_class.run(close, **kwargs)
+        return cached_run(ind_class, close, **kwargs)
     except Exception as e:
         st.error(f"Error running indicator: {e}")
         return None
@@ -104,7 +106,7 @@ def generate_signals(ind_result: Any, signal_type: str = "cross"):
         entries = ind_result.rsi_crossed_below(70)
         exits = ind_result.rsi_crossed_above(30)
     elif signal_type == "MA Crossover" and hasattr(ind_result, 'ma'):
-        slow_ma = vbt.MA.run(st.session_state.close, window=max(ind_result.window, 50))
+        slow_ma = cached_run(vbt.MA, st.session_state.close, window=max(ind_result.window, 50))
         entries = ind_result.ma_crossed_above(slow_ma)
         exits = ind_result.ma_crossed_below(slow_ma)
     else:
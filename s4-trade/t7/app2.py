@@ -4,6 +4,8 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from yf_candles import load_yf_candles
+
 st.title("Crypto RSI-based Runup & Drawdown Analysis")
 
 # User inputs
@@ -21,9 +23,8 @@ upper_rsi = st.slider("Upper RSI Threshold", min_value=0, max_value=100, value=7
 
 if st.button("Fetch Data and Analyze"):
     try:
-        # Fetch OHLCV data using vectorbt
-        data = vbt.YFData.download(symbol, interval=tf, period=period)
-        df = data.get()
+        # Fetch OHLCV data from the local candle store (resampled from a cached base timeframe)
+        df = load_yf_candles(symbol, tf, period=period)
         if df.empty:
             st.error("No data fetched. Try a shorter period or different timeframe (e.g., 1m limited to 7d).")
             st.stop()
@@ -3,8 +3,36 @@ import vectorbt as vbt
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+
+from stop_sweep import run_stop_sweep, sweep_summary
+from yf_candles import load_yf_candles
 import traceback
 
+MAE_COLUMNS = {
+    'mean_mae_winners': 'Avg MAE for Winners (%)',
+    'min_mae_winners': 'Min MAE for Winners (%)',
+    'max_mae_winners': 'Max MAE for Winners (%)',
+    'std_mae_winners': 'Std MAE for Winners (%)',
+    'mean_mae_losers': 'Avg MAE for Losers (%)',
+    'min_mae_losers': 'Min MAE for Losers (%)',
+    'max_mae_losers': 'Max MAE for Losers (%)',
+    'std_mae_losers': 'Std MAE for Losers (%)',
+}
+
+def results_table(summary):
+    """Display table of a stop_sweep summary: rounded values, 'N/A' for missing MAE stats."""
+    table = pd.DataFrame({
+        'TP (%)': summary.index.get_level_values('tp_pct'),
+        'RR': summary.index.get_level_values('rr'),
+        'SL (%)': summary['sl_pct'].round(2).to_numpy(),
+        'Win Rate (%)': summary['win_rate'].round(2).to_numpy(),
+        'Ann. Return (%)': summary['ann_return'].round(2).to_numpy(),
+    })
+    for column, label in MAE_COLUMNS.items():
+        table[label] = summary[column].round(2).astype(object).where(summary[column].notna(), 'N/A').to_numpy()
+    table['Number of Trades'] = summary['trades'].to_numpy()
+    return table
+
 st.title("Crypto RSI Trading Backtest with MAE-Adjusted Entries")
 
 # User inputs
@@ -20,11 +48,16 @@ rsi_period = st.slider("RSI Period", min_value=2, max_value=100, value=14)
 lower_rsi = st.slider("Lower RSI Threshold (for Long Entries)", min_value=0, max_value=100, value=30)
 upper_rsi = st.slider("Upper RSI Threshold (for Short Entries)", min_value=0, max_value=100, value=70)
 
+# TP x RR grid (evenly spaced); every pair is a column of one vectorized simulation
+tp_min, tp_max = st.slider("TP Range (%)", min_value=0.1, max_value=20.0, value=(1.0, 4.0), step=0.1)
+tp_steps = st.number_input("TP Steps", min_value=1, max_value=100, value=4)
+rr_min, rr_max = st.slider("Risk-Reward Range", min_value=0.25, max_value=10.0, value=(1.0, 3.0), step=0.25)
+rr_steps = st.number_input("RR Steps", min_value=1, max_value=100, value=9)
+
 if st.button("Fetch Data and Analyze"):
     try:
-        # Fetch OHLCV data using vectorbt
-        data = vbt.YFData.download(symbol, interval=tf, period=period)
-        df = data.get()
+        # Fetch OHLCV data from the local candle store (resampled from a cached base timeframe)
+        df = load_yf_candles(symbol, tf, period=period)
         if df.empty:
             st.error("No data fetched. Ensure the period is valid for the selected timeframe (e.g., 1m limited to 7d).")
             st.stop()
@@ -49,111 +82,29 @@ if st.button("Fetch Data and Analyze"):
         short_entries_base = (rsi.shift(1) < upper_rsi) & (rsi >= upper_rsi)
         st.write(f"First Backtest - Number of Long Entry Signals: {long_entries_base.sum()}, Short Entry Signals: {short_entries_base.sum()}")
 
-        # Hardcoded TP percentages and RR ratios
-        tp_percentages = [1, 2, 3, 4]
-        rr_ratios = [1, 1.25, 1.5, 1.75, 2, 2.25, 2.5, 2.75, 3]
-
-        # First backtest: Collect results and compute average MAE
-        results_first = []
-        mae_long_list = []
-        mae_short_list = []
-        num_winners = 0
-
-        for tp in tp_percentages:
-            for rr in rr_ratios:
-                sl_pct = tp / rr
-                tp_frac = tp / 100
-                sl_frac = sl_pct / 100
-
-                # Simulate portfolio with base signals
-                pf = vbt.Portfolio.from_signals(
-                    close=df['Close'],
-                    entries=long_entries_base,
-                    short_entries=short_entries_base,
-                    tp_stop=tp_frac,
-                    sl_stop=sl_frac,
-                    direction='both',
-                    freq=freq,
-                    init_cash=10000,
-                    accumulate=False
-                )
-
-                # Compute MAE for each trade
-                def compute_mae(row):
-                    try:
-                        start = int(row['entry_idx'])
-                        end = int(row['exit_idx'])
-                        if start < 0 or end >= len(df) or start > end:
-                            raise ValueError(f"Invalid indices: start={start}, end={end}, df_len={len(df)}")
-                        entry_price = row['entry_price']
-                        slice_df = df.iloc[start:end + 1]
-                        if row['direction'] == 'long':
-                            min_price = slice_df['Low'].min()
-                            mae = (min_price - entry_price) / entry_price * 100
-                            if mae == 0:
-                                st.warning(f"Zero MAE for long trade at index {start}. Check price data.")
-                        else:  # short
-                            max_price = slice_df['High'].max()
-                            mae = (entry_price - max_price) / entry_price * 100
-                            if mae == 0:
-                                st.warning(f"Zero MAE for short trade at index {start}. Check price data.")
-                        return mae if not np.isnan(mae) else np.nan
-                    except Exception as inner_e:
-                        st.error(f"Error in MAE computation at line 93: {str(inner_e)}\n{traceback.format_exc()}")
-                        return np.nan
-
-                if not pf.trades.records.empty:
-                    trades_df = pf.trades.records.copy()
-                    trades_df['mae'] = np.nan
-                    trades_df['mae'] = trades_df.apply(compute_mae, axis=1)
-                    winners = trades_df[trades_df['return'] > 0]
-                    losers = trades_df[trades_df['return'] <= 0]
-                    avg_mae = winners['mae'].mean() if not winners.empty else np.nan
-                    min_mae = winners['mae'].min() if not winners.empty else np.nan
-                    max_mae = winners['mae'].max() if not winners.empty else np.nan
-                    std_mae = winners['mae'].std() if not winners.empty else np.nan
-                    avg_mae_losers = losers['mae'].mean() if not losers.empty else np.nan
-                    min_mae_losers = losers['mae'].min() if not losers.empty else np.nan
-                    max_mae_losers = losers['mae'].max() if not losers.empty else np.nan
-                    std_mae_losers = losers['mae'].std() if not losers.empty else np.nan
-                    num_trades = len(trades_df)
-                    num_winners += len(winners)
-                    # Collect MAE for long and short winners, excluding zeros
-                    if not winners.empty:
-                        long_maes = winners[winners['direction'] == 'long']['mae'].dropna()
-                        short_maes = winners[winners['direction'] == 'short']['mae'].dropna()
-                        mae_long_list.extend(long_maes[long_maes != 0])
-                        mae_short_list.extend(short_maes[short_maes != 0])
-                else:
-                    avg_mae = min_mae = max_mae = std_mae = np.nan
-                    avg_mae_losers = min_mae_losers = max_mae_losers = std_mae_losers = np.nan
-                    num_trades = 0
+        # TP x RR grid, simulated as one portfolio with a column per pair
+        tp_percentages = np.linspace(tp_min, tp_max, tp_steps)
+        rr_ratios = np.linspace(rr_min, rr_max, rr_steps)
 
-                win_rate = pf.trades.win_rate() * 100 if pf.trades.count() > 0 else 0
-                total_return = pf.total_return()
-                time_delta = (df.index[-1] - df.index[0]).total_seconds() / (365 * 24 * 3600)
-                ann_return = ((1 + total_return) ** (1 / time_delta) - 1) * 100 if time_delta > 0 else 0
+        def run_sweep(long_entries, short_entries):
+            pf = run_stop_sweep(df['Close'], long_entries, short_entries, tp_percentages, rr_ratios,
+                                direction='both', freq=freq, init_cash=10000)
+            summary, trades = sweep_summary(pf, df['High'], df['Low'])
+            zero = int((trades['mae'] == 0).sum())
+            if zero:
+                st.warning(f"Zero MAE for {zero} trades. Check price data.")
+            return results_table(summary), trades
 
-                results_first.append({
-                    'TP (%)': tp,
-                    'RR': rr,
-                    'SL (%)': round(sl_pct, 2),
-                    'Win Rate (%)': round(win_rate, 2),
-                    'Ann. Return (%)': round(ann_return, 2),
-                    'Avg MAE for Winners (%)': round(avg_mae, 2) if not np.isnan(avg_mae) else 'N/A',
-                    'Min MAE for Winners (%)': round(min_mae, 2) if not np.isnan(min_mae) else 'N/A',
-                    'Max MAE for Winners (%)': round(max_mae, 2) if not np.isnan(max_mae) else 'N/A',
-                    'Std MAE for Winners (%)': round(std_mae, 2) if not np.isnan(std_mae) else 'N/A',
-                    'Avg MAE for Losers (%)': round(avg_mae_losers, 2) if not np.isnan(avg_mae_losers) else 'N/A',
-                    'Min MAE for Losers (%)': round(min_mae_losers, 2) if not np.isnan(min_mae_losers) else 'N/A',
-                    'Max MAE for Losers (%)': round(max_mae_losers, 2) if not np.isnan(max_mae_losers) else 'N/A',
-                    'Std MAE for Losers (%)': round(std_mae_losers, 2) if not np.isnan(std_mae_losers) else 'N/A',
-                    'Number of Trades': num_trades
-                })
+        # First backtest: Collect results and compute average MAE
+        results_df_first, trades_first = run_sweep(long_entries_base, short_entries_base)
+        winners = trades_first[(trades_first['return'] > 0) & (trades_first['mae'] != 0)]
+        num_winners = int((trades_first['return'] > 0).sum())
 
         # Calculate average MAE for long and short from first backtest
-        avg_mae_long = np.mean(mae_long_list) if mae_long_list else 0
-        avg_mae_short = np.mean(mae_short_list) if mae_short_list else 0
+        mae_long = winners.loc[winners['direction'] == 0, 'mae'].dropna()
+        mae_short = winners.loc[winners['direction'] == 1, 'mae'].dropna()
+        avg_mae_long = mae_long.mean() if len(mae_long) else 0
+        avg_mae_short = mae_short.mean() if len(mae_short) else 0
         st.write(f"First Backtest - Total Winning Trades: {num_winners}")
         st.write(f"Average MAE for Winning Long Trades: {round(avg_mae_long, 2)}%")
         st.write(f"Average MAE for Winning Short Trades: {round(avg_mae_short, 2)}%")
@@ -166,78 +117,19 @@ if st.button("Fetch Data and Analyze"):
 
         st.write(f"Second Backtest - Number of Long Entry Signals: {long_entries_adjusted.sum()}, Short Entry Signals: {short_entries_adjusted.sum()}")
 
-        # Second backtest: Run with adjusted entries
-        results_second = []
-        num_winners_second = 0
-        for tp in tp_percentages:
-            for rr in rr_ratios:
-                sl_pct = tp / rr
-                tp_frac = tp / 100
-                sl_frac = sl_pct / 100
-
-                pf = vbt.Portfolio.from_signals(
-                    close=df['Close'],
-                    entries=long_entries_adjusted,
-                    short_entries=short_entries_adjusted,
-                    tp_stop=tp_frac,
-                    sl_stop=sl_frac,
-                    direction='both',
-                    freq=freq,
-                    init_cash=10000,
-                    accumulate=False
-                )
-
-                if not pf.trades.records.empty:
-                    trades_df = pf.trades.records.copy()
-                    trades_df['mae'] = np.nan
-                    trades_df['mae'] = trades_df.apply(compute_mae, axis=1)
-                    winners = trades_df[trades_df['return'] > 0]
-                    losers = trades_df[trades_df['return'] <= 0]
-                    avg_mae = winners['mae'].mean() if not winners.empty else np.nan
-                    min_mae = winners['mae'].min() if not winners.empty else np.nan
-                    max_mae = winners['mae'].max() if not winners.empty else np.nan
-                    std_mae = winners['mae'].std() if not winners.empty else np.nan
-                    avg_mae_losers = losers['mae'].mean() if not losers.empty else np.nan
-                    min_mae_losers = losers['mae'].min() if not losers.empty else np.nan
-                    max_mae_losers = losers['mae'].max() if not losers.empty else np.nan
-                    std_mae_losers = losers['mae'].std() if not losers.empty else np.nan
-                    num_trades = len(trades_df)
-                    num_winners_second += len(winners)
-                else:
-                    avg_mae = min_mae = max_mae = std_mae = np.nan
-                    avg_mae_losers = min_mae_losers = max_mae_losers = std_mae_losers = np.nan
-                    num_trades = 0
-
-                win_rate = pf.trades.win_rate() * 100 if pf.trades.count() > 0 else 0
-                total_return = pf.total_return()
-                time_delta = (df.index[-1] - df.index[0]).total_seconds() / (365 * 24 * 3600)
-                ann_return = ((1 + total_return) ** (1 / time_delta) - 1) * 100 if time_delta > 0 else 0
-
-                results_second.append({
-                    'TP (%)': tp,
-                    'RR': rr,
-                    'SL (%)': round(sl_pct, 2),
-                    'Win Rate (%)': round(win_rate, 2),
-                    'Ann. Return (%)': round(ann_return, 2),
-                    'Avg MAE for Winners (%)': round(avg_mae, 2) if not np.isnan(avg_mae) else 'N/A',
-                    'Min MAE for Winners (%)': round(min_mae, 2) if not np.isnan(min_mae) else 'N/A',
-                    'Max MAE for Winners (%)': round(max_mae, 2) if not np.isnan(max_mae) else 'N/A',
-                    'Std MAE for Winners (%)': round(std_mae, 2) if not np.isnan(std_mae) else 'N/A',
-                    'Avg MAE for Losers (%)': round(avg_mae_losers, 2) if not np.isnan(avg_mae_losers) else 'N/A',
-                    'Min MAE for Losers (%)': round(min_mae_losers, 2) if not np.isnan(min_mae_losers) else 'N/A',
-                    'Max MAE for Losers (%)': round(max_mae_losers, 2) if not np.isnan(max_mae_losers) else 'N/A',
-                    'Std MAE for Losers (%)': round(std_mae_losers, 2) if not np.isnan(std_mae_losers) else 'N/A',
-                    'Number of Trades': num_trades
-                })
+        # Second backtest: Run with adjusted entries (unchanged signals give the same sweep)
+        if long_entries_adjusted.equals(long_entries_base) and short_entries_adjusted.equals(short_entries_base):
+            results_df_second, trades_second = results_df_first, trades_first
+        else:
+            results_df_second, trades_second = run_sweep(long_entries_adjusted, short_entries_adjusted)
+        num_winners_second = int((trades_second['return'] > 0).sum())
 
         # Display results
-        if results_first:
+        if len(results_df_first):
             st.subheader("First Backtest Results (Base RSI Entries)")
-            results_df_first = pd.DataFrame(results_first)
             st.write(results_df_first)
 
             st.subheader("Second Backtest Results (MAE-Adjusted Entries)")
-            results_df_second = pd.DataFrame(results_second)
             st.write(results_df_second)
             st.write(f"Second Backtest - Total Winning Trades: {num_winners_second}")
 
@@ -246,17 +138,18 @@ if st.button("Fetch Data and Analyze"):
             fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6), sharey=True)
             for tp in tp_percentages:
                 subset_first = results_df_first[results_df_first['TP (%)'] == tp]
-                ax1.plot(subset_first['RR'], subset_first['Win Rate (%)'], marker='o', label=f"TP {tp}%")
+                ax1.plot(subset_first['RR'], subset_first['Win Rate (%)'], marker='o', label=f"TP {tp:g}%")
                 subset_second = results_df_second[results_df_second['TP (%)'] == tp]
-                ax2.plot(subset_second['RR'], subset_second['Win Rate (%)'], marker='o', label=f"TP {tp}%")
+                ax2.plot(subset_second['RR'], subset_second['Win Rate (%)'], marker='o', label=f"TP {tp:g}%")
             ax1.set_title("Base RSI Entries")
             ax1.set_xlabel("Risk-Reward Ratio")
             ax1.set_ylabel("Win Rate (%)")
-            ax1.legend()
+            if len(tp_percentages) <= 10:
+                ax1.legend()
+                ax2.legend()
             ax1.grid(True)
             ax2.set_title("MAE-Adjusted Entries")
             ax2.set_xlabel("Risk-Reward Ratio")
-            ax2.legend()
             ax2.grid(True)
             plt.tight_layout()
             st.pyplot(fig)
@@ -3,16 +3,18 @@ import vectorbt as vbt
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import requests
 import traceback
-import yfinance as yf
+
+import http_client
+from ticker_validity import TickerValidity
+from yf_candles import load_yf_candles
 
 @st.cache_data(ttl=3600)  # Cache for 1 hour
 def fetch_coingecko_symbols(category='all'):
     symbols = []
     try:
         if category in ['all', 'trending']:
-            trending_resp = requests.get('https://api.coingecko.com/api/v3/search/trending', timeout=10)
+            trending_resp = http_client.get('https://api.coingecko.com/api/v3/search/trending', timeout=10)
             trending_resp.raise_for_status()
             trending = trending_resp.json().get('coins', [])
             trending_symbols = [c['item']['symbol'].upper() for c in trending if 'item' in c and 'symbol' in c['item']]
@@ -20,7 +22,7 @@ def fetch_coingecko_symbols(category='all'):
             st.info(f"Fetched {len(trending_symbols)} trending symbols.")
 
         if category in ['all', 'gainers']:
-            gainers_resp = requests.get('https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=percent_change_24h_desc&per_page=50&page=1', timeout=10)
+            gainers_resp = http_client.get('https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=percent_change_24h_desc&per_page=50&page=1', timeout=10)
             gainers_resp.raise_for_status()
             gainers = gainers_resp.json()
             gainers_symbols = [c['symbol'].upper() for c in gainers if 'symbol' in c]
@@ -28,7 +30,7 @@ def fetch_coingecko_symbols(category='all'):
             st.info(f"Fetched {len(gainers_symbols)} gainers symbols.")
 
         if category in ['all', 'losers']:
-            losers_resp = requests.get('https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=percent_change_24h_asc&per_page=50&page=1', timeout=10)
+            losers_resp = http_client.get('https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=percent_change_24h_asc&per_page=50&page=1', timeout=10)
             losers_resp.raise_for_status()
             losers = losers_resp.json()
             losers_symbols = [c['symbol'].upper() for c in losers if 'symbol' in c]
@@ -40,16 +42,8 @@ def fetch_coingecko_symbols(category='all'):
             st.warning(f"No symbols fetched for category '{category}'. API may be down or returned no data. Try again or select a different category.")
             return []
 
-        # Validate symbols with Yahoo Finance
-        valid_symbols = []
-        for symbol in unique_symbols:
-            ticker = f"{symbol}-USD"
-            try:
-                data = yf.Ticker(ticker).history(period="1d")
-                if not data.empty:
-                    valid_symbols.append(symbol)
-            except:
-                continue
+        # Validate symbols with Yahoo Finance (batched; known tickers come from the validity table)
+        valid_symbols = TickerValidity().valid_symbols(unique_symbols)
 
         if not valid_symbols:
             st.warning(f"No valid Yahoo Finance symbols found for category '{category}'. Try a different category.")
@@ -142,9 +136,8 @@ if st.button('Run Backtest', disabled=not current_symbols or symbol == '-USD'):
         start_str = start_date.strftime('%Y-%m-%d')
         end_str = end_date.strftime('%Y-%m-%d')
         
-        # Download data
-        data = vbt.YFData.download(symbol, start=start_str, end=end_str, interval=timeframe, missing_index='drop')
-        close = data.get('Close')
+        # Load data from the local candle store (resampled from a cached base timeframe)
+        close = load_yf_candles(symbol, timeframe, start=start_str, end=end_str)['Close']
         
         if close.empty:
             raise ValueError(f"No data available for {symbol} in the specified date range.")
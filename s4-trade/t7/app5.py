@@ -1,6 +1,5 @@
 import streamlit as st
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
@@ -8,6 +7,11 @@ import vectorbt as vbt
 from typing import Dict, List, Tuple
 import numpy as np
 
+import http_client
+from coin_index import CoinIndex
+from coingecko_history import CoinGeckoHistory
+from grid_engine import grid_signals
+
 # Page config
 st.set_page_config(page_title="Grid Strategy Backtester", layout="wide")
 
@@ -15,23 +19,8 @@ st.set_page_config(page_title="Grid Strategy Backtester", layout="wide")
 if 'fetched_assets' not in st.session_state:
     st.session_state.fetched_assets = []
 
-# Helper to get coin id
-@st.cache_data(ttl=3600)
-def get_coin_id(name, symbol):
-    if pd.isna(name) or pd.isna(symbol):
-        return None
-    query = f"{name} {symbol}"
-    url = "https://api.coingecko.com/api/v3/search"
-    params = {'query': query}
-    try:
-        resp = requests.get(url, params=params)
-        if resp.status_code == 200:
-            data = resp.json()
-            if data['coins']:
-                return data['coins'][0]['id']
-    except:
-        pass
-    return None
+# Coin ids come from a local index over the full CoinGecko coin list (no per-row requests)
+coin_index = CoinIndex()
 
 # Function to fetch top cryptos using API
 @st.cache_data(ttl=3600)
@@ -45,7 +34,7 @@ def fetch_top_cryptos(limit=50):
         'sparkline': False
     }
     try:
-        response = requests.get(url, params=params)
+        response = http_client.get(url, params=params)
         if response.status_code == 200:
             data = response.json()
             df = pd.DataFrame(data)
@@ -63,7 +52,7 @@ def fetch_trending(limit=20):
     url = "https://www.coingecko.com/en/highlights/trending-crypto"
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
     try:
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=headers)
         df_list = pd.read_html(response.text)
         trending_df = pd.DataFrame()
         for df in df_list:
@@ -92,7 +81,7 @@ def fetch_trending(limit=20):
         
         trending_df['name'] = names
         trending_df['symbol'] = [s.upper() for s in symbols]
-        trending_df['coin_id'] = [get_coin_id(n, s) for n, s in zip(names, symbols)]
+        trending_df['coin_id'] = coin_index.resolve_many(zip(names, symbols))
         
         # Current price
         price_col = trending_df.iloc[:, 3].astype(str).str.replace('$', '').str.replace(',', '').str.extract(r'(\d+\.?\d*)').astype(float)
@@ -115,7 +104,7 @@ def fetch_gainers(limit=20):
     url = "https://www.coingecko.com/en/crypto-gainers-losers"
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
     try:
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=headers)
         df_list = pd.read_html(response.text)
         # Assume first table is gainers
         gainers_df = df_list[0]
@@ -146,7 +135,7 @@ def fetch_gainers(limit=20):
         
         gainers_df['name'] = names
         gainers_df['symbol'] = [s.upper() for s in symbols]
-        gainers_df['coin_id'] = [get_coin_id(n, s) for n, s in zip(names, symbols)]
+        gainers_df['coin_id'] = coin_index.resolve_many(zip(names, symbols))
         
         # Price
         price_col = gainers_df.iloc[:, 2].astype(str).str.replace('$', '').str.replace(',', '').str.extract(r'(\d+\.?\d*)').astype(float)
@@ -170,7 +159,7 @@ def fetch_losers(limit=20):
     url = "https://www.coingecko.com/en/crypto-gainers-losers"
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
     try:
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=headers)
         df_list = pd.read_html(response.text)
         # Assume second table is losers
         if len(df_list) < 2:
@@ -202,7 +191,7 @@ def fetch_losers(limit=20):
         
         losers_df['name'] = names
         losers_df['symbol'] = [s.upper() for s in symbols]
-        losers_df['coin_id'] = [get_coin_id(n, s) for n, s in zip(names, symbols)]
+        losers_df['coin_id'] = coin_index.resolve_many(zip(names, symbols))
         
         # Price
         price_col = losers_df.iloc[:, 2].astype(str).str.replace('$', '').str.replace(',', '').str.extract(r'(\d+\.?\d*)').astype(float)
@@ -220,33 +209,14 @@ def fetch_losers(limit=20):
     except:
         return pd.DataFrame()
 
-# Function to fetch OHLCV data
-@st.cache_data
+# Function to fetch OHLCV data (real OHLC candles, cached on disk across sessions)
+coingecko_history = CoinGeckoHistory()
+
 def fetch_ohlcv(coin_id: str, days: int = 365):
-    url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-    params = {
-        'vs_currency': 'usd',
-        'days': days,
-        'interval': 'daily'
-    }
     try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            prices = pd.DataFrame(data['prices'], columns=['timestamp', 'close'])
-            prices['timestamp'] = pd.to_datetime(prices['timestamp'], unit='ms')
-            prices.set_index('timestamp', inplace=True)
-            volumes = pd.DataFrame(data['total_volumes'], columns=['timestamp', 'volume'])
-            volumes['timestamp'] = pd.to_datetime(volumes['timestamp'], unit='ms')
-            volumes.set_index('timestamp', inplace=True)
-            prices['volume'] = volumes['volume']
-            prices['open'] = prices['close']  # Approximate
-            prices['high'] = prices['close']
-            prices['low'] = prices['close']
-            return prices
-    except:
-        pass
-    return pd.DataFrame()
+        return coingecko_history.ohlcv(coin_id, days)
+    except Exception:
+        return pd.DataFrame()
 
 # Grid Strategy Implementation with VectorBT
 def run_grid_backtest(close: pd.Series, num_grids: int, grid_spacing: float, tp_pct: float, sl_pct: float, initial_capital: float = 10000):
@@ -255,39 +225,17 @@ def run_grid_backtest(close: pd.Series, num_grids: int, grid_spacing: float, tp_
     mean_price = close.mean()
     grid_levels = np.linspace(mean_price * (1 - grid_spacing), mean_price * (1 + grid_spacing * (num_grids - 1)), num_grids)
     
-    entries = pd.Series(False, index=close.index)
-    exits = pd.Series(False, index=close.index)
-    
-    position_entries = []
-    
-    for i in range(1, len(close)):
-        price = close.iloc[i]
-        prev_price = close.iloc[i-1]
-        
-        # Entry: cross below grid level
-        for level in grid_levels:
-            if len(position_entries) < num_grids and prev_price >= level > price:
-                entries.iloc[i] = True
-                position_entries.append(level)
-                break
-        
-        # Exits
-        new_active = []
-        for entry_price in position_entries:
-            tp_price = entry_price * (1 + tp_pct)
-            sl_price = entry_price * (1 - sl_pct)
-            if price >= tp_price or price <= sl_price:
-                exits.iloc[i] = True
-            else:
-                new_active.append(entry_price)
-        position_entries = new_active
+    # Compiled per-bar walk (per-level position counts, TP/SL per entry)
+    entry_signals, exit_signals = grid_signals(close.to_numpy(), grid_levels, num_grids, tp_pct, sl_pct)
+    entries = pd.Series(entry_signals, index=close.index)
+    exits = pd.Series(exit_signals, index=close.index)
     
     pf = vbt.Portfolio.from_signals(
         close, entries, exits,
         size=entry_size / close,
         init_cash=initial_capital,
         fees=0.001,
-        freq='D'
+        freq=close.index.to_series().diff().median()  # CoinGecko candle width depends on days
     )
     
     return pf
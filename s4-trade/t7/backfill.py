@@ -0,0 +1,177 @@
+"""Bulk multi-symbol kline backfill into the OHLCV store.
+
+Every (symbol, interval) pair is a job. Jobs are pulled by a bounded pool of
+async workers that share one ``KlineDownloader`` (one connection pool, one
+request-weight bucket). Each job walks forward from its resume point in
+chunks; every chunk is appended to the store and then checkpointed, so a
+crash, Ctrl-C or rate-limit ban resumes at the last committed chunk.
+
+Usage:
+    python backfill.py --symbols SOLUSDT,BTCUSDT --intervals 1h,4h --start 2021-01-01
+    python backfill.py --symbols-file universe.txt --intervals 1m --workers 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from kline_download import KlineDownloader, interval_ms
+from kline_sync import klines_to_frame
+from ohlcv_store import OHLCVStore
+
+CHUNK_CANDLES = 50_000  # Candles fetched (concurrently) between checkpoints
+
+
+class Checkpoint:
+    """Per-(symbol, interval) progress persisted as one JSON file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.state = json.load(f)
+
+    @staticmethod
+    def key(symbol, interval):
+        return f"{symbol}:{interval}"
+
+    def get(self, symbol, interval):
+        return self.state.get(self.key(symbol, interval), {})
+
+    def update(self, symbol, interval, **fields):
+        self.state.setdefault(self.key(symbol, interval), {}).update(fields)
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+class Progress:
+    """Throughput counters for the running backfill."""
+
+    def __init__(self, total_jobs):
+        self.total_jobs = total_jobs
+        self.jobs_done = 0
+        self.candles = 0
+        self.errors = 0
+        self.started = time.monotonic()
+
+    def line(self, requests):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (f"[backfill] {self.jobs_done}/{self.total_jobs} jobs | "
+                f"{self.candles:,} candles ({self.candles / elapsed:,.0f}/s) | "
+                f"{requests:,} requests ({requests / elapsed:.1f}/s) | "
+                f"{self.errors} errors | {elapsed:.0f}s")
+
+
+async def backfill_job(downloader, store, checkpoint, progress, symbol, interval,
+                       start_time, end_time, source='binance', chunk_candles=CHUNK_CANDLES):
+    """Backfill one (symbol, interval) from its resume point up to ``end_time``."""
+    state = checkpoint.get(symbol, interval)
+    if state.get('done') and state.get('end', 0) >= end_time:
+        return
+    # The store's newest open time is the committed high-water mark
+    last = store.last_timestamp(source, symbol, interval)
+    since = max(start_time, last if last is not None else start_time, state.get('next', start_time))
+    if last is None and 'next' not in state:
+        first = await downloader.first_open_time(symbol, interval, since)
+        since = end_time if first is None else max(since, first)
+
+    step = interval_ms(interval) * chunk_candles
+    while since < end_time:
+        chunk_end = min(since + step, end_time)
+        klines = await downloader.fetch(symbol, interval, since, chunk_end)
+        if klines:
+            await asyncio.to_thread(store.append, source, symbol, interval, klines_to_frame(klines))
+            progress.candles += len(klines)
+        since = chunk_end
+        checkpoint.update(symbol, interval, next=since, error=None)
+    checkpoint.update(symbol, interval, done=True, end=end_time)
+
+
+async def run_backfill(symbols, intervals, start_time, end_time, store=None, checkpoint_path=None,
+                       workers=8, downloader=None, report_every=10.0, source='binance',
+                       chunk_candles=CHUNK_CANDLES):
+    """Schedule every (symbol, interval) job across ``workers`` async workers."""
+    store = store or OHLCVStore()
+    checkpoint = Checkpoint(checkpoint_path or os.path.join(store.root, f'backfill_{source}.json'))
+    jobs = [(s, i) for s in symbols for i in intervals]
+    progress = Progress(len(jobs))
+    downloader = downloader or KlineDownloader(max_concurrency=workers)
+    queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    async def worker():
+        while True:
+            try:
+                symbol, interval = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await backfill_job(downloader, store, checkpoint, progress, symbol, interval,
+                                   start_time, end_time, source, chunk_candles)
+            except Exception as e:
+                # Leave the job resumable from its last committed chunk
+                progress.errors += 1
+                checkpoint.update(symbol, interval, error=f"{type(e).__name__}: {e}")
+                print(f"Error backfilling {symbol} {interval}: {e}")
+            progress.jobs_done += 1
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(report_every)
+            print(progress.line(downloader.stats['requests']))
+
+    async with downloader:
+        report_task = asyncio.create_task(reporter())
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(workers, len(jobs)) or 1)))
+        finally:
+            report_task.cancel()
+    print(progress.line(downloader.stats['requests']))
+    return progress
+
+
+def read_symbols(args):
+    symbols = [s.strip().upper() for s in (args.symbols or '').split(',') if s.strip()]
+    if args.symbols_file:
+        with open(args.symbols_file) as f:
+            symbols += [line.strip().upper() for line in f if line.strip() and not line.startswith('#')]
+    return list(dict.fromkeys(symbols))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill Binance klines for many symbols into the OHLCV store")
+    parser.add_argument('--symbols', help="Comma-separated symbols, e.g. SOLUSDT,BTCUSDT")
+    parser.add_argument('--symbols-file', help="File with one symbol per line")
+    parser.add_argument('--intervals', default='4h', help="Comma-separated intervals (default: 4h)")
+    parser.add_argument('--start', default='2020-01-01', help="Backfill start date (default: 2020-01-01)")
+    parser.add_argument('--end', help="Backfill end date (default: now)")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent jobs / connections (default: 8)")
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: <store>/backfill_binance.json)")
+    parser.add_argument('--report-every', type=float, default=10.0, help="Seconds between progress lines")
+    args = parser.parse_args()
+
+    symbols = read_symbols(args)
+    if not symbols:
+        parser.error("no symbols given (use --symbols or --symbols-file)")
+    intervals = [i.strip() for i in args.intervals.split(',') if i.strip()]
+    start_time = int(pd.Timestamp(args.start).value // 1_000_000)
+    end_time = int(pd.Timestamp(args.end).value // 1_000_000) if args.end else int(time.time() * 1000)
+
+    asyncio.run(run_backfill(symbols, intervals, start_time, end_time, checkpoint_path=args.checkpoint,
+                             workers=args.workers, report_every=args.report_every))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark ``indicators`` against the implementations it replaced in sol4h/k2think_bt.py.
+
+Runs on the 4h SOL dataset (~11k bars) and on a synthetic 1-minute series
+(10M bars by default). The original OBV loop is linear in bars and far too
+slow for 10M, so on large inputs it is timed on a slice and scaled up
+(marked ``*``).
+
+    python bench_indicators.py [--bars 10000000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicators import band_width, day_sessions, obv, rolling_max, session_vwap
+from ohlcv_store import load_data
+
+LOOP_SLICE = 100_000
+
+
+def old_obv(close, volume):
+    out = pd.Series(0.0, index=close.index)
+    for i in range(1, len(close)):
+        if close.iloc[i] > close.iloc[i-1]:
+            out.iloc[i] = out.iloc[i-1] + volume.iloc[i]
+        else:
+            out.iloc[i] = out.iloc[i-1] - volume.iloc[i]
+    return out
+
+
+def old_vwap(high, low, close, volume):
+    typical_price = (high + low + close) / 3
+    return typical_price.groupby(typical_price.index.date).apply(
+        lambda x: (x * volume.loc[x.index]).sum() / x.sum()
+    ).reindex(typical_price.index, method='ffill')
+
+
+def old_band_width(close):
+    sma20 = close.rolling(window=20).mean()
+    std20 = close.rolling(window=20).std()
+    return ((sma20 + 2 * std20) - (sma20 - 2 * std20)) / sma20
+
+
+def timed(f, *args):
+    started = time.perf_counter()
+    f(*args)
+    return time.perf_counter() - started
+
+
+def synthetic(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    spread = close * rng.uniform(0, 0.002, n)
+    return pd.DataFrame({'high': close + spread, 'low': close - spread, 'close': close,
+                         'volume': rng.uniform(10, 1000, n)},
+                        index=pd.date_range('2000-01-01', periods=n, freq='min'))
+
+
+def bench(name, df):
+    high, low, close, volume = (df[c].astype(float) for c in ('high', 'low', 'close', 'volume'))
+    n = len(df)
+    sessions = day_sessions(df.index)
+    if n > LOOP_SLICE:
+        old_obv_s, mark = timed(old_obv, close.iloc[:LOOP_SLICE], volume.iloc[:LOOP_SLICE]) * n / LOOP_SLICE, '*'
+    else:
+        old_obv_s, mark = timed(old_obv, close, volume), ''
+    rows = [
+        ('obv (loop)', old_obv_s, mark, timed(obv, close, volume)),
+        ('vwap (groupby.apply)', timed(old_vwap, high, low, close, volume), '',
+         timed(session_vwap, high, low, close, volume, sessions)),
+        ('band width (rolling)', timed(old_band_width, close), '', timed(band_width, close)),
+        ('rolling max 50', timed(lambda: high.rolling(50).max()), '', timed(rolling_max, high, 50)),
+    ]
+    print(f"\n{name}: {n:,} bars")
+    print(f"{'indicator':<22}{'before (s)':>12}{'after (s)':>12}{'speedup':>10}")
+    for label, before, mark, after in rows:
+        print(f"{label:<22}{before:>11.4f}{mark or ' '}{after:>12.4f}{before / after:>9.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bars', type=int, default=10_000_000)
+    args = parser.parse_args()
+    warm = synthetic(1000)  # compile the kernels outside the timings
+    session_vwap(warm['high'], warm['low'], warm['close'], warm['volume'], day_sessions(warm.index))
+    rolling_max(warm['high'], 50)
+    band_width(warm['close'])
+    bench('SOL 4h', load_data())
+    bench('synthetic 1m', synthetic(args.bars))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""Gap detection and repair for stored candles.
+
+Gaps are found with one vectorized pass over the timestamp array: every
+``np.diff`` larger than the interval marks a hole. Each (source, symbol,
+interval) gets an ``int64`` array of ``[start, end)`` missing open-time
+ranges, which can be re-fetched exactly instead of re-downloading history.
+
+Ranges the exchange confirms are empty (real outages) are remembered in a
+small JSON index next to the store, so they are reported but not re-fetched
+on every run.
+
+Usage:
+    python candle_gaps.py                 # coverage report for every stored key
+    python candle_gaps.py --repair        # re-fetch missing ranges from Binance
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from kline_download import INTERVAL_MS, KlineDownloader, interval_ms
+from kline_sync import klines_to_frame
+from ohlcv_store import OHLCVStore
+
+
+def find_gaps(timestamps, step, start=None, end=None):
+    """Return an (n, 2) int64 array of missing ``[start, end)`` open-time ranges.
+
+    ``timestamps`` must be sorted open times (ms) and ``step`` the interval in
+    ms. ``start``/``end`` optionally extend the check to an expected span
+    before the first and after the last candle.
+    """
+    ts = np.asarray(timestamps, dtype=np.int64)
+    if not len(ts):
+        if start is not None and end is not None and end > start:
+            return np.array([[start, end]], dtype=np.int64)
+        return np.empty((0, 2), dtype=np.int64)
+    holes = np.flatnonzero(np.diff(ts) > step)
+    gaps = np.column_stack([ts[holes] + step, ts[holes + 1]])
+    if start is not None and ts[0] > start:
+        gaps = np.vstack([[start, ts[0]], gaps])
+    if end is not None and ts[-1] + step < end:
+        gaps = np.vstack([gaps, [ts[-1] + step, end]])
+    return gaps.astype(np.int64, copy=False)
+
+
+def contained(ranges, within):
+    """Boolean mask of ``ranges`` rows lying fully inside some row of ``within``.
+
+    ``within`` must be sorted by start; lookup is a binary search per range.
+    """
+    if not len(ranges) or not len(within):
+        return np.zeros(len(ranges), dtype=bool)
+    reach = np.maximum.accumulate(within[:, 1])
+    idx = np.searchsorted(within[:, 0], ranges[:, 0], side='right') - 1
+    return (idx >= 0) & (reach[np.maximum(idx, 0)] >= ranges[:, 1])
+
+
+def missing_candles(gaps, step):
+    """Number of candles covered by a gap array."""
+    return int(((gaps[:, 1] - gaps[:, 0]) // step).sum()) if len(gaps) else 0
+
+
+class GapIndex:
+    """Missing ranges per (source, symbol, interval), plus known-empty ranges."""
+
+    def __init__(self, store=None, path=None):
+        self.store = store or OHLCVStore()
+        self.path = path or os.path.join(self.store.root, 'known_gaps.json')
+        self.known = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.known = {k: np.asarray(v, dtype=np.int64).reshape(-1, 2) for k, v in json.load(f).items()}
+
+    @staticmethod
+    def key(source, symbol, interval):
+        return f"{source}/{symbol}/{interval}"
+
+    def scan(self, source, symbol, interval, include_known=False):
+        """Missing ranges for one key (known exchange outages excluded by default)."""
+        gaps = find_gaps(self.store.timestamps(source, symbol, interval), interval_ms(interval))
+        known = self.known.get(self.key(source, symbol, interval))
+        if include_known or known is None:
+            return gaps
+        return gaps[~contained(gaps, known)]
+
+    def scan_all(self, source=None):
+        return {k: self.scan(*k) for k in self.store.keys(source) if k[2] in INTERVAL_MS}
+
+    def mark_known(self, source, symbol, interval, gaps):
+        if not len(gaps):
+            return
+        key = self.key(source, symbol, interval)
+        merged = np.vstack([self.known.get(key, np.empty((0, 2), dtype=np.int64)), gaps])
+        self.known[key] = np.unique(merged, axis=0)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({k: v.tolist() for k, v in self.known.items()}, f)
+        os.replace(tmp, self.path)
+
+    def coverage_report(self, source=None):
+        """One row per stored key: span, candle counts, missing candles and coverage."""
+        rows = []
+        for source_, symbol, interval in self.store.keys(source):
+            if interval not in INTERVAL_MS:
+                continue
+            step = interval_ms(interval)
+            ts = self.store.timestamps(source_, symbol, interval)
+            gaps = self.scan(source_, symbol, interval, include_known=True)
+            known = self.known.get(self.key(source_, symbol, interval), np.empty((0, 2), dtype=np.int64))
+            expected = int((ts[-1] - ts[0]) // step) + 1 if len(ts) else 0
+            rows.append({
+                'source': source_, 'symbol': symbol, 'interval': interval,
+                'first': pd.to_datetime(ts[0], unit='ms') if len(ts) else pd.NaT,
+                'last': pd.to_datetime(ts[-1], unit='ms') if len(ts) else pd.NaT,
+                'candles': len(ts),
+                'expected': expected,
+                'missing': missing_candles(gaps, step),
+                'gaps': len(gaps),
+                'known_outages': len(known),
+                'coverage': len(ts) / expected if expected else np.nan,
+            })
+        return pd.DataFrame(rows)
+
+    async def repair(self, downloader, source, symbol, interval, gaps=None):
+        """Re-fetch just the missing ranges; ranges still empty are marked known."""
+        gaps = self.scan(source, symbol, interval) if gaps is None else gaps
+        filled, empty = 0, []
+        for start, end in gaps:
+            klines = await downloader.fetch(symbol, interval, int(start), int(end))
+            if klines:
+                self.store.append(source, symbol, interval, klines_to_frame(klines))
+                filled += len(klines)
+            else:
+                empty.append((start, end))
+        # Partially filled ranges leave smaller holes; rescan to find what is still missing
+        remaining = self.scan(source, symbol, interval)
+        requested = gaps[np.argsort(gaps[:, 0])] if len(gaps) else gaps
+        self.mark_known(source, symbol, interval, remaining[contained(remaining, requested)])
+        return {'filled': filled, 'requested': len(gaps), 'empty': len(empty)}
+
+    def repair_sync(self, source, symbol, interval, downloader=None):
+        """Blocking wrapper around ``repair`` for plain scripts."""
+        return asyncio.run(self.repair(downloader or KlineDownloader(), source, symbol, interval))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report and repair gaps in the OHLCV store")
+    parser.add_argument('--source', default=None, help="Only scan this source (default: all)")
+    parser.add_argument('--repair', action='store_true', help="Re-fetch missing ranges from Binance")
+    args = parser.parse_args()
+
+    index = GapIndex()
+    if args.repair:
+        async def repair_all():
+            async with KlineDownloader() as downloader:
+                for (source, symbol, interval), gaps in index.scan_all(args.source).items():
+                    if source == 'binance' and len(gaps):
+                        stats = await index.repair(downloader, source, symbol, interval, gaps)
+                        print(f"{symbol} {interval}: {stats}")
+        asyncio.run(repair_all())
+
+    report = index.coverage_report(args.source)
+    if report.empty:
+        print("No candles stored.")
+    else:
+        print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
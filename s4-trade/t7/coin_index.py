@@ -0,0 +1,156 @@
+"""Local CoinGecko symbol/name -> coin id index.
+
+Resolving a scraped (name, symbol) row used to cost one ``/search`` request.
+``CoinIndex`` downloads the full coin list once (``/coins/list``, plus
+market-cap ranks from ``/coins/markets``), saves it as JSON next to the OHLCV
+store and answers lookups from in-memory dicts, so resolving a whole table
+is a handful of dict hits and no network calls.
+
+Symbols are ambiguous (hundreds of coins call themselves ``ETH`` something),
+so a symbol match is narrowed by exact name and then by market-cap rank. A
+name that matches nothing exactly falls back to a fuzzy match over names.
+
+The index is refreshed in a background thread once it is older than
+``ttl``; lookups keep using the previous copy until the new one is swapped in.
+If there is no copy yet and it can't be built (CoinGecko down or rate
+limiting), ``resolve_many`` falls back to one ``/search`` request per row,
+and only the rows whose lookup fails come back as None.
+
+    from coin_index import CoinIndex
+    index = CoinIndex()
+    index.resolve('Solana', 'SOL')           # 'solana'
+    index.resolve_many(zip(names, symbols))  # one id (or None) per row
+"""
+import difflib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+import requests
+
+import http_client
+from coingecko_history import COINGECKO_API_URL
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'coingecko', 'coin_index.json')
+TTL_SECONDS = 24 * 60 * 60
+RANKED_PAGES = 4  # 250 coins per /coins/markets page
+UNRANKED = 1 << 30
+
+
+def normalize(text):
+    return re.sub(r'[^a-z0-9]', '', str(text).lower())
+
+
+class CoinIndex:
+    """In-memory lookup tables over the CoinGecko coin list."""
+
+    def __init__(self, path=DEFAULT_PATH, ttl=TTL_SECONDS, session=None, base_url=COINGECKO_API_URL):
+        self.path = path
+        self.ttl = ttl
+        self.session = session or http_client.default_client()
+        self.base_url = base_url
+        self.by_symbol = {}
+        self.by_name = {}
+        self.names = []
+        self.updated = 0.0
+        self._refreshing = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                self._load(json.load(f))
+
+    # --------------------------
+    # Lookup
+    # --------------------------
+    def resolve(self, name, symbol=None):
+        """Coin id for a (name, symbol) pair, or None."""
+        self.ensure()
+        key = normalize(name) if isinstance(name, str) else ''
+        candidates = self.by_symbol.get(symbol.lower(), ()) if isinstance(symbol, str) and symbol else ()
+        if candidates:
+            # Candidates are sorted by rank, so the first hit is the biggest coin
+            for coin_id, coin_name in candidates:
+                if normalize(coin_name) == key:
+                    return coin_id
+            return candidates[0][0]
+        if not key:
+            return None
+        if key in self.by_name:
+            return self.by_name[key]
+        close = difflib.get_close_matches(key, self.names, n=1, cutoff=0.85)
+        return self.by_name[close[0]] if close else None
+
+    def resolve_many(self, pairs):
+        pairs = list(pairs)
+        try:
+            self.ensure()
+        except (requests.RequestException, ValueError):
+            return [self.search(name, symbol) for name, symbol in pairs]
+        return [self.resolve(name, symbol) for name, symbol in pairs]
+
+    def search(self, name, symbol=None):
+        """Coin id from one ``/search`` request (the fallback while no index exists), or None."""
+        if not isinstance(name, str):
+            return None
+        query = f"{name} {symbol}" if isinstance(symbol, str) and symbol else name
+        try:
+            coins = self._get('/search', {'query': query}).get('coins', [])
+        except (requests.RequestException, ValueError):
+            return None
+        return coins[0]['id'] if coins else None
+
+    # --------------------------
+    # Building / refreshing
+    # --------------------------
+    def ensure(self):
+        """Build the index on first use; refresh a stale one in the background."""
+        if not self.updated:
+            self.refresh()
+        elif time.time() - self.updated > self.ttl:
+            self.refresh_in_background()
+
+    def refresh_in_background(self):
+        if self._refreshing.locked():
+            return None
+        thread = threading.Thread(target=self.refresh, daemon=True)
+        thread.start()
+        return thread
+
+    def refresh(self):
+        """Download the coin list and ranks, save them and swap in the new tables."""
+        with self._refreshing:
+            coins = self._get('/coins/list', {})
+            ranks = {}
+            for page in range(1, RANKED_PAGES + 1):
+                for row in self._get('/coins/markets', {'vs_currency': 'usd', 'order': 'market_cap_desc',
+                                                        'per_page': 250, 'page': page}):
+                    if row.get('market_cap_rank'):
+                        ranks[row['id']] = row['market_cap_rank']
+            data = {'updated': time.time(),
+                    'coins': [[c['id'], c['symbol'], c['name'], ranks.get(c['id'], UNRANKED)] for c in coins]}
+            self._save(data)
+            self._load(data)
+
+    def _load(self, data):
+        rows = sorted(data['coins'], key=lambda c: c[3])
+        by_symbol, by_name = {}, {}
+        for coin_id, symbol, name, _ in rows:
+            by_symbol.setdefault(symbol.lower(), []).append((coin_id, name))
+            by_name.setdefault(normalize(name), coin_id)
+        # Rebind whole tables so concurrent readers never see a half-built index
+        self.by_symbol, self.by_name, self.names = by_symbol, by_name, list(by_name)
+        self.updated = data['updated']
+
+    def _save(self, data):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def _get(self, path, params):
+        response = self.session.get(self.base_url + path, params=params, timeout=30)
+        response.raise_for_status()
+        return response.json()
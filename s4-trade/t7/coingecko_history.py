@@ -0,0 +1,169 @@
+"""CoinGecko price history as real OHLCV, cached on disk.
+
+CoinGecko splits history over two endpoints: ``/coins/{id}/ohlc`` has real
+open/high/low/close candles but no volume, and ``/coins/{id}/market_chart``
+has volume but only prices. Up to 30 days, ``merge_ohlcv`` joins them into
+one OHLCV matrix on the OHLC candle grid (30-minute candles up to 2 days,
+4-hour candles up to 30). Beyond that ``/ohlc`` only serves 4-day candles,
+so longer histories are built as daily candles by ``daily_ohlcv`` from the
+hourly samples ``/market_chart/range`` returns for ranges of up to 90 days,
+fetched in 90-day slices. ``'max'`` still uses the 4-day candles.
+
+Results are kept in the ``OHLCVStore`` (source ``coingecko``) keyed by
+(coin_id, days, vs_currency), so every Streamlit session, worker process and
+restart shares one copy. An entry is re-downloaded once it is older than the
+TTL; if CoinGecko is unreachable or rate limiting, the stale entry is served.
+
+    from coingecko_history import CoinGeckoHistory
+    df = CoinGeckoHistory().ohlcv('solana', days=365)
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+
+import http_client
+from ohlcv_store import OHLCVStore
+
+COINGECKO_API_URL = "https://api.coingecko.com/api/v3"
+SOURCE = 'coingecko'
+TTL_SECONDS = 60 * 60
+OHLC_DAYS = (1, 7, 14, 30, 90, 180, 365)  # Values the /ohlc endpoint accepts (plus 'max')
+OHLC_INTRADAY_DAYS = 30  # Longest /ohlc request still served in candles shorter than 4 days
+CHART_SLICE_DAYS = 90  # Longest /market_chart/range request still served as hourly samples
+DAY_MS = 86_400_000
+
+
+def ohlc_days(days):
+    """Smallest ``days`` value the OHLC endpoint accepts that covers ``days``."""
+    if days == 'max':
+        return 'max'
+    return next((d for d in OHLC_DAYS if d >= int(days)), 'max')
+
+
+def history_days(days):
+    """Days actually downloaded (and cached) for a request of ``days``."""
+    if days == 'max' or int(days) <= OHLC_INTRADAY_DAYS:
+        return ohlc_days(days)
+    return -(-int(days) // CHART_SLICE_DAYS) * CHART_SLICE_DAYS
+
+
+def daily_ohlcv(prices, volumes):
+    """Daily (n, 6) candles from ``market_chart`` ``[time, price]`` and ``[time, 24h_volume]`` samples.
+
+    Each UTC day's open/high/low/close are the first, highest, lowest and
+    last price sampled in it; its volume is the mean 24h volume sampled in it.
+    """
+    prices = np.asarray(prices, dtype=np.float64).reshape(-1, 2)
+    prices = prices[np.unique(prices[:, 0], return_index=True)[1]]
+    day = prices[:, 0] // DAY_MS * DAY_MS
+    opens, first = np.unique(day, return_index=True)
+    out = np.empty((len(opens), 6), dtype=np.float64, order='F')
+    if not len(opens):
+        return out
+    out[:, 0] = opens
+    out[:, 1] = prices[first, 1]
+    out[:, 2] = np.maximum.reduceat(prices[:, 1], first)
+    out[:, 3] = np.minimum.reduceat(prices[:, 1], first)
+    out[:, 4] = prices[np.append(first[1:], len(prices)) - 1, 1]
+
+    volumes = np.asarray(volumes, dtype=np.float64).reshape(-1, 2)
+    volumes = volumes[np.unique(volumes[:, 0], return_index=True)[1]]
+    k = np.searchsorted(opens, volumes[:, 0] // DAY_MS * DAY_MS)
+    inside = k < len(opens)
+    inside[inside] &= opens[k[inside]] == volumes[inside, 0] // DAY_MS * DAY_MS
+    total = np.bincount(k[inside], weights=volumes[inside, 1], minlength=len(opens))
+    count = np.bincount(k[inside], minlength=len(opens))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[:, 5] = np.where(count > 0, total / count, 0.0)
+    return out
+
+
+def merge_ohlcv(ohlc, volumes):
+    """Join ``/ohlc`` candles with ``market_chart`` volumes into an (n, 6) matrix.
+
+    ``ohlc`` rows are ``[close_time, open, high, low, close]``; ``volumes``
+    rows are ``[time, 24h_volume]``. Timestamps in the result are candle open
+    times, like every other source in the store. A candle's volume is the
+    mean 24h volume sampled inside it, scaled to the candle's length.
+    """
+    ohlc = np.asarray(ohlc, dtype=np.float64).reshape(-1, 5)
+    ohlc = ohlc[np.unique(ohlc[:, 0], return_index=True)[1]]
+    out = np.empty((len(ohlc), 6), dtype=np.float64, order='F')
+    if not len(ohlc):
+        return out
+    close_time = ohlc[:, 0]
+    step = np.median(np.diff(close_time)) if len(ohlc) > 1 else DAY_MS
+    out[:, 0] = close_time - step
+    out[:, 1:5] = ohlc[:, 1:]
+
+    volumes = np.asarray(volumes, dtype=np.float64).reshape(-1, 2)
+    # Candle k covers (close_time[k] - step, close_time[k]]
+    k = np.searchsorted(close_time, volumes[:, 0], side='left')
+    inside = k < len(ohlc)
+    inside[inside] &= volumes[inside, 0] > close_time[k[inside]] - step
+    total = np.bincount(k[inside], weights=volumes[inside, 1], minlength=len(ohlc))
+    count = np.bincount(k[inside], minlength=len(ohlc))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[:, 5] = np.where(count > 0, total / count, 0.0) * (step / DAY_MS)
+    return out
+
+
+class CoinGeckoHistory:
+    """OHLCV history per coin, served from a persistent TTL cache."""
+
+    def __init__(self, store=None, ttl=TTL_SECONDS, session=None, base_url=COINGECKO_API_URL):
+        self.store = store or OHLCVStore()
+        self.ttl = ttl
+        self.session = session or http_client.default_client()
+        self.base_url = base_url
+
+    def key(self, coin_id, days, vs_currency='usd'):
+        days = history_days(days)
+        if days == 'max' or days <= OHLC_INTRADAY_DAYS:
+            return SOURCE, f"{coin_id}-{vs_currency}", f"days_{days}"
+        return SOURCE, f"{coin_id}-{vs_currency}", f"daily_{days}"
+
+    def is_fresh(self, coin_id, days, vs_currency='usd'):
+        path = self.store.path(*self.key(coin_id, days, vs_currency))
+        return os.path.exists(path) and time.time() - os.path.getmtime(path) < self.ttl
+
+    def download(self, coin_id, days, vs_currency='usd'):
+        """Fetch the candles for ``days`` and return them as an (n, 6) matrix."""
+        days = history_days(days)
+        if days != 'max' and days > OHLC_INTRADAY_DAYS:
+            return self.download_daily(coin_id, days, vs_currency)
+        params = {'vs_currency': vs_currency, 'days': days}
+        ohlc = self._get(f"/coins/{coin_id}/ohlc", params)
+        chart = self._get(f"/coins/{coin_id}/market_chart", params)
+        return merge_ohlcv(ohlc, chart.get('total_volumes', []))
+
+    def download_daily(self, coin_id, days, vs_currency='usd'):
+        """Daily candles for the last ``days`` days from hourly samples, one request per 90 days."""
+        end = int(time.time())
+        prices, volumes = [], []
+        for to in range(end, end - days * 86_400, -CHART_SLICE_DAYS * 86_400):
+            chart = self._get(f"/coins/{coin_id}/market_chart/range",
+                              {'vs_currency': vs_currency, 'from': to - CHART_SLICE_DAYS * 86_400, 'to': to})
+            prices.extend(chart.get('prices', []))
+            volumes.extend(chart.get('total_volumes', []))
+        return daily_ohlcv(prices, volumes)
+
+    def ohlcv(self, coin_id, days=365, vs_currency='usd'):
+        """Return ``open/high/low/close/volume`` for the last ``days`` days, indexed by open time."""
+        key = self.key(coin_id, days, vs_currency)
+        if not self.is_fresh(coin_id, days, vs_currency):
+            try:
+                self.store.write(*key, self.download(coin_id, days, vs_currency))
+            except requests.RequestException:
+                if not self.store.exists(*key):
+                    raise
+        start = None if days == 'max' else pd.Timestamp.now(tz='UTC').tz_localize(None) - pd.Timedelta(days=int(days))
+        return self.store.load(*key, start=start)[['open', 'high', 'low', 'close', 'volume']]
+
+    def _get(self, path, params):
+        response = self.session.get(self.base_url + path, params=params, timeout=15)
+        response.raise_for_status()
+        return response.json()
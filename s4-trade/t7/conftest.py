@@ -0,0 +1,19 @@
+"""Wall-clock timing tests are opt-in: ``python -m pytest --benchmarks``."""
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption('--benchmarks', action='store_true', help="also run the wall-clock timing tests")
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "benchmark: asserts a wall-clock budget; skipped unless --benchmarks")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--benchmarks'):
+        return
+    skip = pytest.mark.skip(reason="timing test, run with --benchmarks")
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
@@ -1,7 +1,10 @@
+import os
 import sys
-import requests
 import csv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import http_client  # pooled, rate-limited, disk-cached
+
 # Command line arguments
 token_contract = sys.argv[1]  # Token contract address
 timeframe = sys.argv[2]  # Candle timeframe (e.g., '1h', '1d')
@@ -9,7 +12,7 @@ num_candles = int(sys.argv[3])  # Number of candles
 
 # First, fetch pools for the token
 token_url = f"https://api.dexscreener.com/latest/dex/search?q={token_contract}"
-response = requests.get(token_url)
+response = http_client.get(token_url)
 if response.status_code != 200 or not response.text.strip().startswith('{'):
     print("Invalid token address or API error.")
     exit()
@@ -20,7 +23,7 @@ if 'pairs' in token_data and token_data['pairs']:
         # Input is a pair address, fetch OHLCV
         pair_contract = token_contract
         chart_url = f"https://api.dexscreener.com/latest/dex/pairs/bsc/{pair_contract}/chart?limit={num_candles}&interval={timeframe}"
-        response = requests.get(chart_url)
+        response = http_client.get(chart_url)
         if response.status_code != 200 or not response.text.strip().startswith('{'):
             print("Invalid pair address or API error.")
             exit()
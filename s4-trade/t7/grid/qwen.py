@@ -2,10 +2,15 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import requests
+import os
+import sys
 from datetime import datetime
 import vectorbt as vbt
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import http_client  # pooled, rate-limited, disk-cached
+from grid_engine import grid_level_portfolio
+
 # -----------------------------
 # CoinGecko API Helper Functions
 # -----------------------------
@@ -20,7 +25,7 @@ def fetch_top_cryptos():
         "page": 1,
         "sparkline": False
     }
-    resp = requests.get(url, params=params)
+    resp = http_client.get(url, params=params)
     if resp.status_code != 200:
         return []
     data = resp.json()
@@ -35,7 +40,7 @@ def fetch_top_cryptos():
 @st.cache_data(ttl=600)
 def fetch_trending_cryptos():
     url = "https://api.coingecko.com/api/v3/search/trending"
-    resp = requests.get(url)
+    resp = http_client.get(url)
     if resp.status_code != 200:
         return []
     data = resp.json()
@@ -58,7 +63,7 @@ def fetch_gainers_losers():
         "sparkline": False,
         "price_change_percentage": "24h"
     }
-    resp = requests.get(url, params=params)
+    resp = http_client.get(url, params=params)
     if resp.status_code != 200:
         return []
     data = resp.json()
@@ -155,6 +160,7 @@ grid_upper = st.sidebar.number_input("Upper Price Bound (%)", -100.0, 100.0, 20.
 grid_lower = st.sidebar.number_input("Lower Price Bound (%)", -100.0, 100.0, -20.0) / 100
 tp_pct = st.sidebar.number_input("Take Profit per Level (%)", 0.0, 50.0, 2.0) / 100
 sl_pct = st.sidebar.number_input("Stop Loss per Level (%)", 0.0, 50.0, 3.0) / 100
+initial_capital = st.sidebar.number_input("Initial Capital ($)", 100.0, 10_000_000.0, 10_000.0)
 
 # --- Download & Backtest ---
 st.header("📈 Backtest Results")
@@ -182,49 +188,19 @@ for symbol in selected_symbols:
         # Create grid levels
         grid_levels = np.linspace(lower_bound, upper_bound, n_grids)
 
-        # Initialize entries and exits
-        entries = []
-        exits = []
-
-        position_size = 1 / n_grids  # Equal allocation per grid
-        in_position = [False] * len(grid_levels)
-        tp_level = [lvl * (1 + tp_pct) for lvl in grid_levels]
-        sl_level = [lvl * (1 - sl_pct) for lvl in grid_levels]
-
-        # Simulate grid trading
-        for i, (idx, px) in enumerate(price.items()):
-            for j, lvl in enumerate(grid_levels):
-                if not in_position[j] and px <= lvl:
-                    entries.append((idx, position_size))
-                    in_position[j] = True
-                elif in_position[j]:
-                    if px >= tp_level[j] or px <= sl_level[j]:
-                        exits.append((idx, position_size))
-                        in_position[j] = False
-
-        # Convert to vectorbt signals
-        entry_arr = pd.Series([amt for _, amt in entries], index=[t[0] for t in entries])
-        exit_arr = pd.Series([amt for _, amt in exits], index=[t[0] for t in exits])
-
-        # Align with price
-        entry_signals = (~entry_arr.index.duplicated()).astype(int)
-        exit_signals = (~exit_arr.index.duplicated()).astype(int)
-        entry_signals = entry_signals.reindex(price.index, fill_value=0)
-        exit_signals = exit_signals.reindex(price.index, fill_value=0)
-
-        # Run vectorbt portfolio
-        portfolio = vbt.Portfolio.from_signals(
-            price,
-            entries=entry_signals,
-            exits=exit_signals,
-            size=1,
-            upon_opposite_entry=vbt.PF_CONSTANTS.keep_opposite_shares_close
-        )
+        # Independent position per grid level, each sized to an equal share of capital
+        level_value = initial_capital / n_grids
+        # Columns are level indices: rounded prices collide for coins priced around 1e-5
+        level_prices = pd.Series(grid_levels, index=pd.RangeIndex(n_grids, name='grid_level'), name='level_price')
+
+        # One long-only column per level, sharing one cash pool
+        portfolio = grid_level_portfolio(price, grid_levels, tp_pct, sl_pct, level_value, initial_capital)
 
         # Show metrics
         st.write(f"### {symbol} Results")
         stats = portfolio.stats()
         st.write(stats[['Total Return [%]', 'Win Rate [%]', 'Total Trades', 'Profit Factor']])
+        st.write("Grid levels", level_prices.to_frame())
 
         # Plot
         fig = portfolio.plot()
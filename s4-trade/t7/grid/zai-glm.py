@@ -2,9 +2,17 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import vectorbt as vbt
-import requests
 from datetime import datetime, timedelta
 import time
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import http_client  # pooled, rate-limited, disk-cached
+from coingecko_history import CoinGeckoHistory
+from grid_engine import grid_signal_matrix
+
+coingecko_history = CoinGeckoHistory()
 
 # Set page configuration
 st.set_page_config(
@@ -31,7 +39,7 @@ def fetch_top_crypto():
         "page": 1,
         "sparkline": "false"
     }
-    response = requests.get(url, params=params)
+    response = http_client.get(url, params=params)
     data = response.json()
     df = pd.DataFrame(data)
     df = df[['id', 'symbol', 'name']]
@@ -41,7 +49,7 @@ def fetch_top_crypto():
 # Function to fetch trending crypto assets
 def fetch_trending_crypto():
     url = "https://api.coingecko.com/api/v3/search/trending"
-    response = requests.get(url)
+    response = http_client.get(url)
     data = response.json()
     coins = data['coins']
     df = pd.DataFrame([coin['item'] for coin in coins])
@@ -59,7 +67,7 @@ def fetch_gainers_losers():
         "page": 1,
         "sparkline": "false"
     }
-    response = requests.get(url, params=params)
+    response = http_client.get(url, params=params)
     data = response.json()
     df = pd.DataFrame(data)
     df = df[['id', 'symbol', 'name']]
@@ -68,53 +76,35 @@ def fetch_gainers_losers():
 
 # Function to fetch price data
 def fetch_price_data(coin_id, days=365):
-    url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-    params = {
-        "vs_currency": "usd",
-        "days": days,
-        "interval": "daily"
-    }
-    response = requests.get(url, params=params)
-    data = response.json()
-    prices = data['prices']
-    df = pd.DataFrame(prices, columns=['timestamp', 'price'])
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-    df.set_index('timestamp', inplace=True)
-    return df
+    # Real OHLC candles from the shared on-disk CoinGecko cache; 'price' is the close
+    df = coingecko_history.ohlcv(coin_id, days)
+    return df.assign(price=df['close'])
 
 # Function to run grid strategy backtest
 def run_grid_strategy(price_data, grid_levels, grid_spacing, tp_pct, sl_pct, initial_capital=10000):
-    # Calculate grid levels
-    start_price = price_data['price'].iloc[0]
-    grid_prices = []
-    
-    # Create grid levels above and below start price
-    for i in range(-grid_levels, grid_levels + 1):
-        grid_price = start_price * (1 + grid_spacing * i)
-        grid_prices.append(grid_price)
-    
-    # Create entry signals
-    entries = pd.DataFrame(index=price_data.index, columns=range(len(grid_prices)))
-    exits = pd.DataFrame(index=price_data.index, columns=range(len(grid_prices)))
-    
-    # Generate entry and exit signals for each grid level
-    for i, grid_price in enumerate(grid_prices):
-        # Entry signal: price crosses grid level
-        entries[i] = (price_data['price'] <= grid_price) & (price_data['price'].shift(1) > grid_price)
-        
-        # Exit signals: TP or SL
-        tp_price = grid_price * (1 + tp_pct)
-        sl_price = grid_price * (1 - sl_pct)
-        
-        exits[i] = (price_data['price'] >= tp_price) | (price_data['price'] <= sl_price)
-    
-    # Create portfolio
+    """Backtest one configuration, or many at once when any parameter is a list/array.
+
+    Parameters are broadcast against each other (e.g. from np.meshgrid). Every
+    (configuration, grid level) is one signal column; the levels of a
+    configuration share ``initial_capital`` in one group, each level trading
+    an equal slice of it.
+    """
+    entries, exits, columns = grid_signal_matrix(
+        price_data['price'].to_numpy(), price_data['high'].to_numpy(), price_data['low'].to_numpy(),
+        price_data['price'].iloc[0], grid_levels, grid_spacing, tp_pct, sl_pct)
+    level_value = initial_capital / (2 * columns.get_level_values('grid_levels').to_numpy() + 1)
+
+    # One batched simulation for every configuration
     pf = vbt.Portfolio.from_signals(
         close=price_data['price'],
-        entries=entries,
-        exits=exits,
+        entries=pd.DataFrame(entries, index=price_data.index, columns=columns),
+        exits=pd.DataFrame(exits, index=price_data.index, columns=columns),
+        size=level_value,
+        size_type='value',
         init_cash=initial_capital,
-        freq='D'
+        cash_sharing=True,
+        group_by=['grid_levels', 'grid_spacing', 'tp_pct', 'sl_pct'],
+        freq=price_data.index.to_series().diff().median()
     )
     
     return pf
@@ -199,7 +189,7 @@ def main():
         with st.spinner(f"Fetching price data for {asset_id}..."):
             try:
                 price_data = fetch_price_data(asset_id, days)
-                st.success(f"Fetched {len(price_data)} days of price data!")
+                st.success(f"Fetched {len(price_data)} candles of price data!")
             except Exception as e:
                 st.error(f"Error fetching price data: {e}")
                 return
@@ -0,0 +1,147 @@
+"""Compiled grid-strategy kernels.
+
+The grid backtests used to walk every bar in Python (``close.iloc[i]``),
+looping over every level and every open entry. The kernels here do the same
+walk in Numba over plain NumPy arrays: positions are tracked as a count per
+grid level (every entry at a level shares its TP/SL prices), so each bar
+costs O(levels) with no allocation.
+
+``grid_signals`` reproduces app5's single-position signals;
+``grid_level_orders`` keeps an independent, separately sized position per
+level and emits orders for ``vbt.Portfolio.from_orders``;
+``grid_level_portfolio`` runs them on one shared cash pool.
+``grid_signal_matrix`` needs no per-bar state and is plain NumPy
+broadcasting over (bars, configurations x levels).
+
+    from grid_engine import grid_signals
+    entries, exits = grid_signals(close.to_numpy(), levels, max_positions, tp_pct, sl_pct)
+"""
+import numpy as np
+import pandas as pd
+import vectorbt as vbt
+from numba import njit
+
+
+@njit(cache=True)
+def grid_signals_nb(close, levels, max_positions, tp_pct, sl_pct):
+    """Entry/exit signal arrays for a cross-below grid with per-entry TP/SL.
+
+    On each bar at most one entry is opened: at the first level (in ``levels``
+    order) that price crossed downwards, while fewer than ``max_positions``
+    entries are open. Every open entry whose TP or SL is touched by the
+    close is then closed; the bar gets an exit signal if any was.
+    """
+    n = close.shape[0]
+    n_levels = levels.shape[0]
+    entries = np.zeros(n, dtype=np.bool_)
+    exits = np.zeros(n, dtype=np.bool_)
+    open_at = np.zeros(n_levels, dtype=np.int64)
+    tp_price = levels * (1 + tp_pct)
+    sl_price = levels * (1 - sl_pct)
+    n_open = 0
+    for i in range(1, n):
+        price = close[i]
+        prev_price = close[i - 1]
+        if n_open < max_positions:
+            for j in range(n_levels):
+                if prev_price >= levels[j] > price:
+                    entries[i] = True
+                    open_at[j] += 1
+                    n_open += 1
+                    break
+        if n_open == 0:
+            continue
+        for j in range(n_levels):
+            if open_at[j] > 0 and (price >= tp_price[j] or price <= sl_price[j]):
+                exits[i] = True
+                n_open -= open_at[j]
+                open_at[j] = 0
+    return entries, exits
+
+
+def grid_signals(close, levels, max_positions, tp_pct, sl_pct):
+    """Python-facing wrapper: coerces inputs and runs ``grid_signals_nb``."""
+    return grid_signals_nb(np.ascontiguousarray(close, dtype=np.float64),
+                           np.ascontiguousarray(levels, dtype=np.float64),
+                           int(max_positions), float(tp_pct), float(sl_pct))
+
+
+@njit(cache=True)
+def grid_level_orders_nb(close, levels, tp_pct, sl_pct, level_value):
+    """Order sizes (units) per bar and grid level for independent per-level positions.
+
+    Level ``j`` opens a long of ``level_value[j]`` (cash) when the close is at
+    or below ``levels[j]`` and it has no position, and closes exactly that
+    position when the close reaches the level's TP or SL. Returns an (n,
+    levels) matrix: positive units on entries, negative on exits, NaN where
+    there is no order. Meant for ``vbt.Portfolio.from_orders`` with one
+    column per level and ``direction='longonly'``: an exit is the size the
+    entry asked for, which is more than was filled if the entry ran short of
+    cash, and must not open a short (see ``grid_level_portfolio``).
+    """
+    n = close.shape[0]
+    n_levels = levels.shape[0]
+    size = np.full((n, n_levels), np.nan)
+    held = np.zeros(n_levels)
+    tp_price = levels * (1 + tp_pct)
+    sl_price = levels * (1 - sl_pct)
+    for i in range(n):
+        price = close[i]
+        for j in range(n_levels):
+            if held[j] == 0.0:
+                if price <= levels[j]:
+                    held[j] = level_value[j] / price
+                    size[i, j] = held[j]
+            elif price >= tp_price[j] or price <= sl_price[j]:
+                size[i, j] = -held[j]
+                held[j] = 0.0
+    return size
+
+
+def grid_level_orders(close, levels, tp_pct, sl_pct, level_value):
+    """Python-facing wrapper; ``level_value`` is cash per level (scalar or one per level)."""
+    levels = np.ascontiguousarray(levels, dtype=np.float64)
+    level_value = np.broadcast_to(np.asarray(level_value, dtype=np.float64), levels.shape).copy()
+    return grid_level_orders_nb(np.ascontiguousarray(close, dtype=np.float64), levels,
+                                float(tp_pct), float(sl_pct), level_value)
+
+
+def grid_level_portfolio(close, levels, tp_pct, sl_pct, level_value, init_cash):
+    """``grid_level_orders`` as one long-only portfolio, a column per level sharing ``init_cash``.
+
+    Entries the shared cash can't cover fill partly; long-only exits then
+    sell what the level actually holds instead of going short.
+    """
+    sizes = grid_level_orders(close.to_numpy(), levels, tp_pct, sl_pct, level_value)
+    sizes = pd.DataFrame(sizes, index=close.index, columns=pd.RangeIndex(len(levels), name='grid_level'))
+    return vbt.Portfolio.from_orders(close, size=sizes, size_type='amount', direction='longonly',
+                                     init_cash=init_cash, cash_sharing=True, group_by=True)
+
+
+def grid_signal_matrix(price, high, low, start_price, n_levels, spacing, tp_pct, sl_pct):
+    """Cross-below grid entries and intrabar TP/SL exits for many configurations at once.
+
+    ``n_levels``, ``spacing``, ``tp_pct`` and ``sl_pct`` are scalars or
+    arrays broadcast against each other; every resulting configuration gets
+    the levels ``start_price * (1 + spacing * i)`` for ``i`` in
+    ``[-n_levels, n_levels]``. Returns boolean ``(bars, columns)`` entry and
+    exit arrays plus a column MultiIndex (configuration params + ``level``),
+    with one column per (configuration, level).
+    """
+    n_levels, spacing, tp_pct, sl_pct = (np.ravel(a) for a in np.broadcast_arrays(n_levels, spacing, tp_pct, sl_pct))
+    n_levels = n_levels.astype(np.int64)
+    width = 2 * n_levels + 1
+    config = np.repeat(np.arange(len(width)), width)
+    # Level offsets -L..L for each configuration, laid out back to back
+    level = np.arange(width.sum()) - np.repeat(np.cumsum(width) - width, width) - n_levels[config]
+    grid_price = start_price * (1 + spacing[config] * level)
+
+    price = np.asarray(price, dtype=np.float64)[:, None]
+    prev = np.vstack([np.full((1, 1), np.nan), price[:-1]])
+    entries = (price <= grid_price) & (prev > grid_price)
+    exits = ((np.asarray(high, dtype=np.float64)[:, None] >= grid_price * (1 + tp_pct[config])) |
+             (np.asarray(low, dtype=np.float64)[:, None] <= grid_price * (1 - sl_pct[config])))
+    columns = pd.MultiIndex.from_arrays(
+        [n_levels[config], spacing[config], tp_pct[config], sl_pct[config], level],
+        names=['grid_levels', 'grid_spacing', 'tp_pct', 'sl_pct', 'level'])
+    return entries, exits, columns
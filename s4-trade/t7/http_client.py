@@ -0,0 +1,263 @@
+"""Shared HTTP client for the market-data APIs (CoinGecko, Binance, Dexscreener, Moralis).
+
+One ``requests.Session`` with keep-alive connection pools is shared by every
+caller in the process, and each host gets its own token bucket so separate
+scripts/pages stop tripping each other's rate limits. 429/418/5xx responses
+and connection errors are retried with jittered exponential backoff
+(``Retry-After`` pauses the whole host).
+
+GET responses are cached on disk, shared across processes and restarts. The
+TTL is chosen per endpoint from ``CACHE_TTLS``; an expired entry carrying an
+``ETag``/``Last-Modified`` is revalidated with a conditional request, and a
+304 just renews it. The cache is bounded: entries not written or renewed for
+``CACHE_MAX_AGE`` are deleted, then the least recently renewed ones until it
+fits in ``CACHE_MAX_BYTES`` (checked at most every ``PRUNE_INTERVAL``
+seconds per client, on write). Responses are plain ``requests.Response`` objects, so
+call sites only swap ``requests.get`` for ``http_client.get``:
+
+    import http_client
+    resp = http_client.get("https://api.coingecko.com/api/v3/search/trending")
+"""
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'HTTP_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'http_cache'),
+)
+
+# Requests per second and burst size per host (public/free tier limits, with headroom)
+HOST_LIMITS = {
+    'api.coingecko.com': (0.4, 5),  # ~30 calls/min
+    'www.coingecko.com': (0.4, 3),
+    'api.binance.com': (10.0, 20),
+    'api.dexscreener.com': (4.0, 10),  # 300 calls/min
+    'deep-index.moralis.io': (10.0, 20),
+}
+DEFAULT_LIMIT = (5.0, 10)
+
+# (host, path regex, ttl seconds); first match wins, no match means not cached
+CACHE_TTLS = [
+    ('api.coingecko.com', r'/search/trending', 10 * 60),
+    ('api.coingecko.com', r'/coins/markets', 5 * 60),
+    ('www.coingecko.com', r'.*', 10 * 60),
+    ('api.dexscreener.com', r'/latest/dex/search', 5 * 60),
+    ('api.dexscreener.com', r'/chart', 60),
+    ('deep-index.moralis.io', r'/tokens', 5 * 60),
+]
+
+RETRY_STATUSES = {418, 429, 500, 502, 503, 504}
+
+CACHE_MAX_BYTES = 256 << 20
+CACHE_MAX_AGE = 7 * 24 * 60 * 60
+PRUNE_INTERVAL = 10 * 60
+
+
+class TokenBucket:
+    """Thread-safe token bucket; ``acquire`` blocks until a request may be sent."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Take the token now (possibly going negative) so waiters queue up fairly
+            self.tokens -= 1
+            wait = max(self.blocked_until - now, -self.tokens / self.rate if self.tokens < 0 else 0.0)
+        if wait > 0:
+            time.sleep(wait)
+
+    def block(self, seconds):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class HttpClient:
+    """Pooled, rate-limited, retrying GET client with a disk response cache."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, host_limits=None, cache_ttls=None,
+                 max_retries=4, timeout=15, pool_size=16, cache_max_bytes=CACHE_MAX_BYTES,
+                 cache_max_age=CACHE_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_max_age = cache_max_age
+        self._pruned = 0.0
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        self.cache_ttls = [(h, re.compile(p), ttl) for h, p, ttl in (CACHE_TTLS if cache_ttls is None else cache_ttls)]
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.stats = {'requests': 0, 'retries': 0, 'cache_hits': 0, 'revalidated': 0}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(*self.host_limits.get(host, DEFAULT_LIMIT))
+            return self._buckets[host]
+
+    def ttl_for(self, url):
+        parts = urlsplit(url)
+        for host, pattern, ttl in self.cache_ttls:
+            if parts.hostname == host and pattern.search(parts.path):
+                return ttl
+        return 0
+
+    def get(self, url, params=None, headers=None, ttl=None, timeout=None, **kwargs):
+        """GET ``url``; served from the disk cache while fresh (``ttl`` overrides the endpoint TTL)."""
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        ttl = self.ttl_for(full_url) if ttl is None else ttl
+        headers = dict(headers or {})
+        path = self._cache_path(full_url, headers) if ttl > 0 else None
+        entry = self._read_cache(path) if path else None
+        if entry is not None and time.time() - entry['stored_at'] < ttl:
+            self.stats['cache_hits'] += 1
+            return _to_response(entry, full_url)
+
+        if entry is not None:
+            # Expired: ask the server whether our copy is still current
+            if entry['headers'].get('etag'):
+                headers['If-None-Match'] = entry['headers']['etag']
+            if entry['headers'].get('last-modified'):
+                headers['If-Modified-Since'] = entry['headers']['last-modified']
+
+        response = self._send(full_url, headers, timeout or self.timeout, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.stats['revalidated'] += 1
+            entry['stored_at'] = time.time()
+            self._write_cache(path, entry)
+            return _to_response(entry, full_url)
+        if path and response.status_code == 200:
+            self._write_cache(path, {
+                'url': full_url,
+                'status': response.status_code,
+                'headers': {k.lower(): v for k, v in response.headers.items()
+                            if k.lower() in ('content-type', 'etag', 'last-modified')},
+                'encoding': response.encoding,
+                'content': base64.b64encode(response.content).decode('ascii'),
+                'stored_at': time.time(),
+            })
+        return response
+
+    def _send(self, url, headers, timeout, **kwargs):
+        bucket = self.bucket(urlsplit(url).hostname)
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            self.stats['requests'] += 1
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                self.stats['retries'] += 1
+                time.sleep(backoff(attempt))
+                continue
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            self.stats['retries'] += 1
+            retry_after = response.headers.get('retry-after')
+            if retry_after is not None and retry_after.isdigit():
+                bucket.block(float(retry_after))
+            time.sleep(backoff(attempt))
+
+    def _cache_path(self, url, headers):
+        key = hashlib.sha256(json.dumps([url, sorted(headers.items())]).encode()).hexdigest()
+        return os.path.join(self.cache_dir, urlsplit(url).hostname or 'local', key + '.json')
+
+    @staticmethod
+    def _read_cache(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, path, entry):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        if time.monotonic() - self._pruned > PRUNE_INTERVAL or not self._pruned:
+            self.prune_cache()
+
+    def prune_cache(self):
+        """Delete entries older than ``cache_max_age``, then the oldest until under ``cache_max_bytes``."""
+        self._pruned = time.monotonic()
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # Pruned or replaced by another process
+                files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        cutoff = time.time() - self.cache_max_age
+        for mtime, size, path in files:
+            if mtime >= cutoff and total <= self.cache_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def backoff(attempt, base=0.5, cap=30.0):
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _to_response(entry, url):
+    response = requests.Response()
+    response.status_code = entry['status']
+    response._content = base64.b64decode(entry['content'])
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.encoding = entry.get('encoding')
+    response.url = url
+    response.from_cache = True
+    return response
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_client():
+    """The process-wide shared client."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HttpClient()
+        return _default
+
+
+def get(url, **kwargs):
+    return default_client().get(url, **kwargs)
@@ -0,0 +1,146 @@
+"""Memoized vectorbt indicator runs.
+
+``vbt.MA.run``, ``vbt.RSI.run``, ``vbt.BBANDS.run`` and ``vbt.MACD.run`` were
+recomputed from scratch on every call, even for a series and window already
+computed earlier in the sweep, by another strategy or in the previous run.
+``IndicatorCache.run`` keys each result by (content hash of the inputs,
+indicator, parameters) and keeps it in a bounded in-memory LRU, plus, with
+a ``directory``, on disk (vectorbt's own ``dumps``/``loads``), so a
+repeated sweep or a Streamlit rerun skips the computation entirely.
+
+The key hashes the input values and index, not the object identity, so an
+equal copy of a series hits and a series with one changed bar misses.
+Cached results are shared between callers and must not be modified.
+
+``cached_run`` uses a process-wide cache that survives Streamlit reruns
+(modules are not re-imported) and persists to ``$INDICATOR_CACHE_DIR`` if
+that is set.
+
+    from indicator_cache import cached_run
+    fast = cached_run(vbt.MA, close, window=10)
+    bb = cached_run(vbt.BBANDS, close, window=20, alpha=2)
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import vectorbt as vbt
+
+
+def _freeze(value):
+    """Hashable, order-stable representation of a parameter value."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, range, np.ndarray, pd.Index)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _update(h, values):
+    values = np.asarray(values)
+    if values.dtype == object:
+        values = pd.util.hash_pandas_object(pd.Index(values.ravel()), index=False).to_numpy()
+    values = np.ascontiguousarray(values)
+    h.update(f"{values.dtype.str}{values.shape}".encode())
+    h.update(values.reshape(-1).view(np.uint8))
+
+
+def data_hash(data):
+    """Content hash of an array, Series or DataFrame: values, index, columns and name."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(type(data).__name__.encode())
+    _update(h, data)
+    if isinstance(data, (pd.Series, pd.DataFrame)):
+        _update(h, data.index)
+        h.update(str(data.index.dtype).encode())
+        h.update(repr(data.name if isinstance(data, pd.Series) else list(data.columns)).encode())
+    return h.hexdigest()
+
+
+class IndicatorCache:
+    """LRU of indicator results keyed by (input content, indicator, params), optionally backed by a directory."""
+
+    def __init__(self, maxsize=128, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, indicator, inputs, params):
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{vbt.__version__}|{indicator.__module__}.{indicator.__qualname__}|".encode())
+        for data in inputs:
+            h.update(data_hash(data).encode())
+        h.update(repr(_freeze(params)).encode())
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def run(self, indicator, *inputs, **params):
+        """``indicator.run(*inputs, **params)``, computed at most once per key."""
+        key = self.key(indicator, inputs, params)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        result = self._load(indicator, key)
+        if result is None:
+            result = indicator.run(*inputs, **params)
+            self.misses += 1
+            self._save(result, key)
+        else:
+            self.disk_hits += 1
+        with self._lock:
+            self._entries[key] = result
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def _load(self, indicator, key):
+        if not self.directory or not os.path.exists(self.path(key)):
+            return None
+        try:
+            with open(self.path(key), 'rb') as f:
+                return indicator.loads(f.read())
+        except Exception:
+            return None  # unreadable entry: recompute and overwrite it
+
+    def _save(self, result, key):
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(result.dumps())
+            os.replace(tmp, self.path(key))
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def clear(self):
+        """Drop the in-memory entries (the disk tier is kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+default_cache = IndicatorCache(directory=os.environ.get('INDICATOR_CACHE_DIR') or None)
+
+
+def cached_run(indicator, *inputs, **params):
+    """``indicator.run(*inputs, **params)`` through the process-wide ``default_cache``."""
+    return default_cache.run(indicator, *inputs, **params)
@@ -0,0 +1,226 @@
+"""Vectorized and compiled technical indicators.
+
+The sol4h strategy scripts computed indicators bar by bar in Python
+(``obv.iloc[i] = obv.iloc[i-1] + volume.iloc[i]``) or through
+``groupby(...).apply(lambda ...)``. The functions here take plain arrays
+(Series work too) and return NumPy arrays aligned with their input, so any
+strategy function can wrap them back into a Series with its own index.
+Rolling windows follow pandas' ``rolling(window)`` convention: the first
+``window - 1`` values are NaN.
+
+Benchmarks against the previous implementations: ``python bench_indicators.py``.
+
+    from indicators import obv, session_vwap, day_sessions, band_width
+    obv_line = pd.Series(obv(close, volume), index=close.index)
+    vwap = pd.Series(session_vwap(high, low, close, volume, day_sessions(close.index)), index=close.index)
+"""
+import numpy as np
+from numba import njit
+
+
+def _array(x):
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def obv(close, volume):
+    """On-balance volume: +volume on up closes, -volume otherwise, starting at 0."""
+    close, volume = _array(close), _array(volume)
+    signed = np.where(close[1:] > close[:-1], volume[1:], -volume[1:])
+    out = np.empty(close.shape[0])
+    out[:1] = 0.0
+    np.cumsum(signed, out=out[1:])
+    return out
+
+
+def day_sessions(index):
+    """Integer session label per bar: the UTC (or naive) calendar day of a DatetimeIndex."""
+    return np.asarray(index, dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+
+@njit(cache=True)
+def _session_vwap_nb(price, volume, session):
+    out = np.empty(price.shape[0])
+    pv = 0.0
+    vol = 0.0
+    for i in range(price.shape[0]):
+        if i == 0 or session[i] != session[i - 1]:
+            pv = 0.0
+            vol = 0.0
+        pv += price[i] * volume[i]
+        vol += volume[i]
+        out[i] = pv / vol if vol > 0 else np.nan
+    return out
+
+
+def session_vwap(high, low, close, volume, session):
+    """VWAP of the typical price anchored at the start of each session.
+
+    ``session`` holds one label per bar (e.g. ``day_sessions(index)``); the
+    running sums restart whenever it changes. Each bar only sees its own
+    session's bars up to and including itself, so there is no look-ahead.
+    """
+    typical = (_array(high) + _array(low) + _array(close)) / 3
+    return _session_vwap_nb(typical, _array(volume), np.ascontiguousarray(session, dtype=np.int64))
+
+
+@njit(cache=True)
+def _rolling_extreme_nb(x, window, maximum):
+    """Sliding max/min with a monotonic deque of indices (ring buffer): O(n) for any window."""
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    dq = np.empty(window + 1, dtype=np.int64)
+    size = window + 1
+    head = 0
+    count = 0
+    for i in range(n):
+        # Drop indices that are no better than x[i]; they can never be the extreme again
+        while count > 0:
+            last = dq[(head + count - 1) % size]
+            if (x[last] <= x[i]) if maximum else (x[last] >= x[i]):
+                count -= 1
+            else:
+                break
+        dq[(head + count) % size] = i
+        count += 1
+        if dq[head] <= i - window:
+            head = (head + 1) % size
+            count -= 1
+        if i >= window - 1:
+            out[i] = x[dq[head]]
+    return out
+
+
+def rolling_max(x, window):
+    return _rolling_extreme_nb(_array(x), int(window), True)
+
+
+def rolling_min(x, window):
+    return _rolling_extreme_nb(_array(x), int(window), False)
+
+
+@njit(cache=True)
+def _rolling_extrema_nb(x, windows):
+    """Rolling max and min for every window length in one pass over ``x``.
+
+    Keeps a max deque and a min deque per window. Rows of the (windows,
+    n + 1) outputs are one window each, with a leading NaN so a view
+    starting one element earlier reads the previous bar's value.
+    """
+    n = x.shape[0]
+    n_windows = windows.shape[0]
+    size = windows.max() + 1
+    out_max = np.full((n_windows, n + 1), np.nan)
+    out_min = np.full((n_windows, n + 1), np.nan)
+    dq_max = np.empty((n_windows, size), dtype=np.int64)
+    dq_min = np.empty((n_windows, size), dtype=np.int64)
+    head_max = np.zeros(n_windows, dtype=np.int64)
+    head_min = np.zeros(n_windows, dtype=np.int64)
+    count_max = np.zeros(n_windows, dtype=np.int64)
+    count_min = np.zeros(n_windows, dtype=np.int64)
+    for i in range(n):
+        for w in range(n_windows):
+            window = windows[w]
+            while count_max[w] > 0 and x[dq_max[w, (head_max[w] + count_max[w] - 1) % size]] <= x[i]:
+                count_max[w] -= 1
+            dq_max[w, (head_max[w] + count_max[w]) % size] = i
+            count_max[w] += 1
+            if dq_max[w, head_max[w]] <= i - window:
+                head_max[w] = (head_max[w] + 1) % size
+                count_max[w] -= 1
+            while count_min[w] > 0 and x[dq_min[w, (head_min[w] + count_min[w] - 1) % size]] >= x[i]:
+                count_min[w] -= 1
+            dq_min[w, (head_min[w] + count_min[w]) % size] = i
+            count_min[w] += 1
+            if dq_min[w, head_min[w]] <= i - window:
+                head_min[w] = (head_min[w] + 1) % size
+                count_min[w] -= 1
+            if i >= window - 1:
+                out_max[w, i + 1] = x[dq_max[w, head_max[w]]]
+                out_min[w, i + 1] = x[dq_min[w, head_min[w]]]
+    return out_max, out_min
+
+
+class RollingExtrema:
+    """Rolling max/min of one series for several window lengths, computed once.
+
+    Lookups return views into the precomputed arrays, so slicing a sample
+    window out of the full series costs no copy. ``shift=1`` gives the
+    previous bar's value, like pandas' ``.shift(1)``.
+
+        channels = RollingExtrema(close, [20, 50, 100])
+        upper = channels.max(50, start, start + 500, shift=1)
+    """
+
+    def __init__(self, x, windows):
+        self.windows = tuple(sorted({int(w) for w in windows}))
+        self.n = len(x)
+        self._row = {w: i for i, w in enumerate(self.windows)}
+        self._max, self._min = _rolling_extrema_nb(_array(x), np.array(self.windows, dtype=np.int64))
+
+    @classmethod
+    def from_tables(cls, windows, max_table, min_table):
+        """Wrap tables built elsewhere (e.g. shared with worker processes) without recomputing or copying."""
+        self = cls.__new__(cls)
+        self.windows = tuple(int(w) for w in windows)
+        self.n = max_table.shape[1] - 1
+        self._row = {w: i for i, w in enumerate(self.windows)}
+        self._max, self._min = max_table, min_table
+        return self
+
+    @property
+    def tables(self):
+        """``{'windows', 'max', 'min'}`` arrays that ``from_tables`` accepts."""
+        return {'windows': np.array(self.windows, dtype=np.int64), 'max': self._max, 'min': self._min}
+
+    def _view(self, table, window, start, stop, shift):
+        if shift not in (0, 1):
+            raise ValueError("shift must be 0 or 1")
+        stop = self.n if stop is None else stop
+        return table[self._row[window], start + 1 - shift:stop + 1 - shift]
+
+    def max(self, window, start=0, stop=None, shift=0):
+        return self._view(self._max, window, start, stop, shift)
+
+    def min(self, window, start=0, stop=None, shift=0):
+        return self._view(self._min, window, start, stop, shift)
+
+
+@njit(cache=True)
+def _rolling_mean_std_nb(x, window):
+    """Rolling mean and sample std (ddof=1) with a sliding Welford update."""
+    n = x.shape[0]
+    mean_out = np.full(n, np.nan)
+    std_out = np.full(n, np.nan)
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        if i < window:
+            delta = x[i] - mean
+            mean += delta / (i + 1)
+            m2 += delta * (x[i] - mean)
+        else:
+            old = x[i - window]
+            new_mean = mean + (x[i] - old) / window
+            m2 += (x[i] - old) * (x[i] - new_mean + old - mean)
+            mean = new_mean
+        if i >= window - 1:
+            mean_out[i] = mean
+            std_out[i] = np.sqrt(max(m2, 0.0) / (window - 1)) if window > 1 else np.nan
+    return mean_out, std_out
+
+
+def rolling_mean_std(x, window):
+    """Rolling mean and sample standard deviation, as ``rolling(window).mean()/.std()``."""
+    return _rolling_mean_std_nb(_array(x), int(window))
+
+
+def bollinger_bands(close, window=20, k=2.0):
+    """(middle, upper, lower) Bollinger bands: SMA +/- ``k`` rolling standard deviations."""
+    middle, std = rolling_mean_std(close, window)
+    return middle, middle + k * std, middle - k * std
+
+
+def band_width(close, window=20, k=2.0):
+    """Normalized Bollinger band width, ``(upper - lower) / middle``."""
+    middle, upper, lower = bollinger_bands(close, window, k)
+    return (upper - lower) / middle
@@ -0,0 +1,197 @@
+"""Concurrent, weight-aware Binance kline downloader.
+
+The requested range is split into independent windows of ``limit`` candles,
+which are fetched concurrently over one pooled ``httpx.AsyncClient``. Instead
+of sleeping a fixed amount between pages, requests draw from a token bucket
+sized to the exchange's request-weight budget; the bucket is re-synced from
+the ``X-MBX-USED-WEIGHT-1M`` response header and paused on 429/418 using
+``Retry-After``. Pages are merged and de-duplicated by open time.
+
+    from kline_download import KlineDownloader
+    klines = KlineDownloader().download("SOLUSDT", "4h", start_ms, end_ms)
+"""
+import asyncio
+import random
+import time
+
+import httpx
+
+BINANCE_API_URL = "https://api.binance.com"
+KLINES_PATH = "/api/v3/klines"
+LIMIT = 1000  # Max klines per request (Binance limit)
+REQUEST_WEIGHT = 2  # Weight of one /klines request
+WEIGHT_LIMIT = 6000  # REQUEST_WEIGHT budget per minute
+USED_WEIGHT_HEADER = "x-mbx-used-weight-1m"
+
+INTERVAL_MS = {
+    '1s': 1000,
+    '1m': 60_000, '3m': 3 * 60_000, '5m': 5 * 60_000, '15m': 15 * 60_000, '30m': 30 * 60_000,
+    '1h': 3_600_000, '2h': 2 * 3_600_000, '4h': 4 * 3_600_000, '6h': 6 * 3_600_000,
+    '8h': 8 * 3_600_000, '12h': 12 * 3_600_000,
+    '1d': 86_400_000, '3d': 3 * 86_400_000, '1w': 7 * 86_400_000,
+}
+
+
+def interval_ms(interval):
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError:
+        raise ValueError(f"Unsupported interval for windowed downloads: {interval}") from None
+
+
+def split_windows(start_time, end_time, interval, limit=LIMIT):
+    """Split [start_time, end_time) into windows holding at most ``limit`` candles."""
+    span = interval_ms(interval) * limit
+    return [(s, min(s + span, end_time) - 1) for s in range(int(start_time), int(end_time), span)]
+
+
+class WeightBucket:
+    """Token bucket over the exchange's per-minute request weight."""
+
+    def __init__(self, capacity=WEIGHT_LIMIT, per=60.0, headroom=0.9):
+        self.limit = capacity
+        self.capacity = capacity * headroom
+        self.rate = self.capacity / per
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = None
+        self._loop = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, weight=REQUEST_WEIGHT):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # The bucket may outlive one asyncio.run(); locks can't cross loops
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = self.blocked_until - time.monotonic()
+                if wait <= 0 and self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                await asyncio.sleep(max(wait, (weight - self.tokens) / self.rate))
+
+    def observe(self, used_weight):
+        """Trust the server's count of weight already used this minute."""
+        self._refill()
+        self.tokens = min(self.tokens, self.capacity - used_weight)
+
+    def block(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class KlineDownloader:
+    """Download klines for arbitrary ranges with bounded concurrency.
+
+    Use as an async context manager to share one connection pool across many
+    ``fetch`` calls (e.g. several symbols); otherwise each call opens its own.
+    """
+
+    def __init__(self, base_url=BINANCE_API_URL, max_concurrency=8, limit=LIMIT,
+                 bucket=None, request_weight=REQUEST_WEIGHT, max_retries=5, timeout=30.0):
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.limit = limit
+        self.bucket = bucket or WeightBucket()
+        self.request_weight = request_weight
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.stats = {'requests': 0, 'retries': 0, 'candles': 0}
+        self._client = None
+
+    async def __aenter__(self):
+        self._client = self._make_client()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._client = None
+
+    def _make_client(self):
+        limits = httpx.Limits(max_connections=self.max_concurrency,
+                              max_keepalive_connections=self.max_concurrency)
+        return httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=self.timeout)
+
+    async def fetch(self, symbol, interval, start_time, end_time):
+        """Return raw klines with open time in [start_time, end_time), sorted and unique."""
+        windows = split_windows(start_time, end_time, interval, self.limit)
+        if self._client is None:
+            async with self:
+                pages = await self._fetch_windows(symbol, interval, windows)
+        else:
+            pages = await self._fetch_windows(symbol, interval, windows)
+
+        by_open_time = {}
+        for page in pages:
+            for kline in page:
+                by_open_time[kline[0]] = kline
+        klines = [by_open_time[t] for t in sorted(by_open_time)]
+        self.stats['candles'] += len(klines)
+        return klines
+
+    async def first_open_time(self, symbol, interval, start_time):
+        """Open time of the first kline at or after ``start_time`` (None if there is none).
+
+        Lets callers skip the empty range before a symbol was listed with a
+        single request instead of scanning it window by window.
+        """
+        if self._client is None:
+            async with self:
+                return await self.first_open_time(symbol, interval, start_time)
+        page = await self._request({"symbol": symbol, "interval": interval,
+                                    "startTime": int(start_time), "limit": 1})
+        return page[0][0] if page else None
+
+    def download(self, symbol, interval, start_time, end_time):
+        """Blocking wrapper around ``fetch`` for plain scripts."""
+        return asyncio.run(self.fetch(symbol, interval, start_time, end_time))
+
+    async def _fetch_windows(self, symbol, interval, windows):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(window):
+            async with semaphore:
+                return await self._fetch_window(symbol, interval, *window)
+
+        return await asyncio.gather(*(run(w) for w in windows))
+
+    async def _fetch_window(self, symbol, interval, start_time, end_time):
+        return await self._request({"symbol": symbol, "interval": interval, "startTime": start_time,
+                                    "endTime": end_time, "limit": self.limit})
+
+    async def _request(self, params):
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire(self.request_weight)
+            self.stats['requests'] += 1
+            try:
+                response = await self._client.get(KLINES_PATH, params=params)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+                self.stats['retries'] += 1
+                await asyncio.sleep(_backoff(attempt))
+                continue
+
+            used = response.headers.get(USED_WEIGHT_HEADER)
+            if used is not None:
+                self.bucket.observe(int(used))
+            if response.status_code in (418, 429):
+                # Rate limited (429) or IP banned (418): stop everyone until Retry-After
+                self.bucket.block(float(response.headers.get("retry-after", 60)))
+            elif response.status_code < 500:
+                response.raise_for_status()
+                return response.json()
+            if attempt == self.max_retries:
+                response.raise_for_status()
+            self.stats['retries'] += 1
+            await asyncio.sleep(_backoff(attempt))
+
+
+def _backoff(attempt, base=0.5, cap=30.0):
+    return random.uniform(0, min(cap, base * 2 ** attempt))
@@ -0,0 +1,85 @@
+"""Incremental Binance kline sync into the OHLCV store.
+
+The high-water mark for each (symbol, interval) is the open time of the newest
+candle already in the store. A sync re-requests klines starting at that open
+time, so the still-forming last candle is fetched again and replaced, and
+everything after it is appended. All pages of one sync are merged in memory
+and written with a single atomic ``OHLCVStore.append``.
+
+A daily refresh of 4h candles therefore costs one request instead of paging
+through the whole history again. Larger gaps (first backfills) can be handed
+to a ``kline_download.KlineDownloader`` to fetch all pages concurrently.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+import http_client
+from kline_download import interval_ms
+from ohlcv_store import COLUMNS
+
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
+LIMIT = 1000  # Max klines per request (Binance limit)
+
+
+def fetch_klines_page(symbol, interval, start_time, end_time=None, limit=LIMIT):
+    """Fetch one page of raw klines starting at ``start_time`` (ms)."""
+    params = {
+        "symbol": symbol,
+        "interval": interval,
+        "startTime": int(start_time),
+        "limit": limit,
+    }
+    if end_time is not None:
+        params["endTime"] = int(end_time)
+    response = http_client.get(BINANCE_KLINES_URL, params=params, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+def klines_to_frame(klines):
+    """Convert raw Binance kline rows into a store-ready OHLCV frame."""
+    if not klines:
+        return pd.DataFrame({col: np.empty(0) for col in COLUMNS})
+    raw = np.asarray([k[:6] for k in klines], dtype=np.float64)
+    return pd.DataFrame(raw, columns=list(COLUMNS)).astype({'timestamp': np.int64})
+
+
+def sync_klines(store, symbol, interval, start_time, end_time=None, source='binance',
+                fetch_page=fetch_klines_page, limit=LIMIT, downloader=None):
+    """Bring ``store`` up to date for one (symbol, interval).
+
+    ``start_time`` (ms) is only used when nothing is stored yet. When a
+    ``downloader`` is given and the gap spans more than one page, the gap is
+    fetched concurrently through it. Returns a dict with the number of
+    requests made, candles received and rows stored.
+    """
+    last = store.last_timestamp(source, symbol, interval)
+    since = last if last is not None else int(start_time)
+
+    pages = []
+    requests_made = 0
+    until = end_time if end_time is not None else int(time.time() * 1000)
+    if downloader is not None and until - since > limit * interval_ms(interval):
+        before = downloader.stats['requests']
+        pages = downloader.download(symbol, interval, since, until)
+        requests_made = downloader.stats['requests'] - before
+        since = until
+    while since < until:
+        page = fetch_page(symbol, interval, since, end_time, limit)
+        requests_made += 1
+        if not page:
+            break
+        pages.extend(page)
+        if len(page) < limit:
+            break
+        since = page[-1][6] + 1  # Next page starts after the last kline's close time
+
+    if pages:
+        rows = store.append(source, symbol, interval, klines_to_frame(pages))
+    elif last is not None:
+        rows = len(store.matrix(source, symbol, interval))
+    else:
+        rows = 0
+    return {'requests': requests_made, 'candles': len(pages), 'rows': rows}
@@ -0,0 +1,246 @@
+"""Columnar on-disk store for OHLCV candles.
+
+Candles are kept per (source, symbol, interval) as a single row-major
+float64 ``.npy`` matrix with the columns ``timestamp, open, high, low, close,
+volume`` (timestamps are epoch milliseconds, exactly representable in
+float64). Files are opened memory-mapped, so every column is a zero-copy
+(strided) view and all processes reading the same key share one copy of the
+data through the OS page cache. Row-major order lets ``append`` grow a file
+in place: new rows are written past the end and the row count in the
+``.npy`` header is bumped afterwards, so a backfill appending chunk after
+chunk writes each candle once instead of rewriting the whole history.
+
+Layout::
+
+    <root>/<source>/<symbol>/<interval>.npy
+
+Usage from a script directory (e.g. sol4h/)::
+
+    from ohlcv_store import load_data
+    data = load_data()  # drop-in for the old pd.read_csv() based loader
+"""
+import io
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+DEFAULT_ROOT = os.environ.get(
+    'OHLCV_STORE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ohlcv'),
+)
+
+
+class OHLCVStore:
+    """Memory-mapped candle store keyed by (source, symbol, interval)."""
+
+    def __init__(self, root=None):
+        self.root = root or DEFAULT_ROOT
+
+    def path(self, source, symbol, interval):
+        return os.path.join(self.root, source, symbol, f"{interval}.npy")
+
+    def exists(self, source, symbol, interval):
+        return os.path.exists(self.path(source, symbol, interval))
+
+    def keys(self, source=None):
+        """List stored (source, symbol, interval) keys."""
+        keys = []
+        if not os.path.isdir(self.root):
+            return keys
+        sources = [source] if source else sorted(os.listdir(self.root))
+        for src in sources:
+            src_dir = os.path.join(self.root, src)
+            if not os.path.isdir(src_dir):
+                continue
+            for symbol in sorted(os.listdir(src_dir)):
+                sym_dir = os.path.join(src_dir, symbol)
+                for name in sorted(os.listdir(sym_dir)):
+                    if name.endswith('.npy'):
+                        keys.append((src, symbol, name[:-4]))
+        return keys
+
+    # --------------------------
+    # Reading
+    # --------------------------
+    def matrix(self, source, symbol, interval):
+        """Return the raw (n, 6) memory-mapped matrix for a key."""
+        path = self.path(source, symbol, interval)
+        if not os.path.exists(path):
+            raise KeyError(f"No candles stored for {source}/{symbol}/{interval}")
+        return np.load(path, mmap_mode='r')
+
+    def arrays(self, source, symbol, interval):
+        """Return a dict of zero-copy column views (timestamp as float64 ms)."""
+        m = self.matrix(source, symbol, interval)
+        return {col: m[:, i] for i, col in enumerate(COLUMNS)}
+
+    def timestamps(self, source, symbol, interval):
+        """Return open times as an int64 array of epoch milliseconds."""
+        return self.matrix(source, symbol, interval)[:, 0].astype(np.int64)
+
+    def last_timestamp(self, source, symbol, interval):
+        """Open time (ms) of the newest stored candle, or None if empty."""
+        if not self.exists(source, symbol, interval):
+            return None
+        m = self.matrix(source, symbol, interval)
+        return int(m[-1, 0]) if len(m) else None
+
+    def load(self, source, symbol, interval, start=None, end=None):
+        """Load candles as a DataFrame indexed by ``datetime``.
+
+        The OHLCV columns are read-only views onto the memory-mapped file;
+        only the index (and the int64 ``timestamp`` column) is materialized.
+        ``start``/``end`` are anything ``pd.Timestamp`` accepts and are
+        applied with a binary search before any data is touched.
+        """
+        m = self.matrix(source, symbol, interval)
+        ts = m[:, 0]
+        lo, hi = 0, len(m)
+        if start is not None:
+            lo = int(np.searchsorted(ts, _to_ms(start), side='left'))
+        if end is not None:
+            hi = int(np.searchsorted(ts, _to_ms(end), side='right'))
+        m = m[lo:hi]
+        timestamp = m[:, 0].astype(np.int64)
+        index = pd.DatetimeIndex(pd.to_datetime(timestamp, unit='ms'), name='datetime')
+        df = pd.DataFrame(m[:, 1:], index=index, columns=list(COLUMNS[1:]), copy=False)
+        df.insert(0, 'timestamp', timestamp)
+        return df
+
+    # --------------------------
+    # Writing
+    # --------------------------
+    def write(self, source, symbol, interval, candles):
+        """Replace all candles for a key (atomic rename)."""
+        m = _to_matrix(candles)
+        m = _dedupe_sorted(m)
+        self._save(self.path(source, symbol, interval), m)
+        return len(m)
+
+    def append(self, source, symbol, interval, candles):
+        """Merge new candles into a key and return the stored row count.
+
+        Rows whose open time is already stored are replaced by the new ones,
+        so re-sending the still-forming last candle simply overwrites it.
+        When the new candles only replace or extend the tail, they are written
+        in place and the header's row count is updated last, so readers see
+        either the old or the new row count. Any other overlap merges both
+        into a temp file that is renamed over the old one.
+        """
+        new = _dedupe_sorted(_to_matrix(candles))
+        path = self.path(source, symbol, interval)
+        if not os.path.exists(path):
+            self._save(path, new)
+            return len(new)
+        if not len(new):
+            return len(self.matrix(source, symbol, interval))
+        old = self.matrix(source, symbol, interval)
+        at = int(np.searchsorted(old[:, 0], new[0, 0]))
+        if np.isin(old[at:, 0], new[:, 0]).all() and _write_rows(path, at, new):
+            return at + len(new)
+        # Overlap inside the history: keep old rows not superseded by the new batch
+        keep = ~np.isin(old[:, 0], new[:, 0])
+        merged = np.concatenate([old[keep], new])
+        merged = merged[np.argsort(merged[:, 0], kind='stable')]
+        self._save(path, merged)
+        return len(merged)
+
+    def import_csv(self, path, source, symbol, interval):
+        """Import a CSV with timestamp/open/high/low/close/volume columns."""
+        df = pd.read_csv(path)
+        return self.write(source, symbol, interval, df)
+
+    def _save(self, path, m):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, np.ascontiguousarray(m, dtype=np.float64))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+
+def _write_rows(path, at, rows):
+    """Write ``rows`` over/after row ``at`` of a row-major float64 (n, 6) file; False if it can't grow in place."""
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        if version != (1, 0):
+            return False
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        offset = f.tell()
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(
+            header, {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False,
+                     'shape': (at + len(rows), len(COLUMNS))})
+        # Fortran files (older stores) and headers without room for the new count are rewritten instead
+        if fortran_order and shape[0] > 1 or dtype != np.float64 or len(header.getvalue()) != offset:
+            return False
+        f.seek(offset + at * len(COLUMNS) * dtype.itemsize)
+        f.write(np.ascontiguousarray(rows, dtype=np.float64).tobytes())
+        f.flush()
+        f.seek(0)
+        f.write(header.getvalue())
+    return True
+
+
+def _to_ms(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+def _to_matrix(candles):
+    """Coerce a DataFrame / dict of arrays / (n, 6) array into an (n, 6) matrix."""
+    if isinstance(candles, np.ndarray):
+        m = np.asarray(candles, dtype=np.float64)
+        if m.ndim != 2 or m.shape[1] != len(COLUMNS):
+            raise ValueError(f"Expected an (n, {len(COLUMNS)}) array, got {m.shape}")
+        return m
+    if isinstance(candles, pd.DataFrame):
+        df = candles
+        if 'timestamp' not in df.columns:
+            if not isinstance(df.index, pd.DatetimeIndex):
+                raise ValueError("DataFrame needs a 'timestamp' column or a DatetimeIndex")
+            df = df.assign(timestamp=df.index.asi8 // 1_000_000)
+        candles = {col: df[col].to_numpy() for col in COLUMNS}
+    m = np.empty((len(candles['timestamp']), len(COLUMNS)), dtype=np.float64, order='F')
+    for i, col in enumerate(COLUMNS):
+        m[:, i] = np.asarray(candles[col], dtype=np.float64)
+    return m
+
+
+def _dedupe_sorted(m):
+    """Sort by open time, keeping the last occurrence of duplicate timestamps."""
+    if not len(m):
+        return m
+    ts = m[:, 0]
+    if np.all(ts[1:] > ts[:-1]):
+        return m
+    order = np.argsort(ts, kind='stable')
+    m = m[order]
+    last = np.append(m[1:, 0] != m[:-1, 0], True)
+    return m[last]
+
+
+def load_data(csv_path='solana_4h_ohlc.csv', source='binance', symbol='SOLUSDT',
+              interval='4h', store=None):
+    """Drop-in replacement for the sol4h ``load_data()`` helpers.
+
+    Returns the same frame the scripts built with ``pd.read_csv`` +
+    ``pd.to_datetime`` (``datetime`` index; timestamp/open/high/low/close/volume
+    columns) but memory-mapped from the store. The CSV is imported once, and
+    again only when it is newer than the stored copy.
+    """
+    store = store or OHLCVStore()
+    path = store.path(source, symbol, interval)
+    if os.path.exists(csv_path) and (
+        not os.path.exists(path) or os.path.getmtime(csv_path) > os.path.getmtime(path)
+    ):
+        store.import_csv(csv_path, source, symbol, interval)
+    return store.load(source, symbol, interval)
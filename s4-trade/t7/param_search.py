@@ -0,0 +1,171 @@
+"""Adaptive parameter search over sample windows.
+
+The sol4h sweeps evaluate every configuration of a hand-written grid on
+every sample window, so each new dimension multiplies the runtime.
+``successive_halving`` spends a fixed budget of backtests instead: it starts
+many configurations on a few windows, keeps the best ``1 / eta`` by score,
+gives the survivors ``eta`` times as many windows and repeats until the
+survivors have seen every window. Windows are always a prefix of the same
+seeded list, so configurations are compared on identical data, and results
+from earlier rungs are reused rather than recomputed.
+
+``evaluate(configs, windows)`` runs the backtests and returns one row of
+metrics per (config, window), indexed by ``(param, sample)`` positions into
+the two lists -- the layout of ``robustness.sample_metrics``. ``score`` maps
+per-config mean metrics to a score (higher is better); ``excess_return_score``
+is the sol4h scripts' formula.
+
+    from param_search import excess_return_score, successive_halving
+    space = {'fast_ma': (3, 30), 'slow_ma': (20, 200), 'sl_stop': [0.02, 0.05, 0.1]}
+    found = successive_halving(evaluate, space, windows, budget=2000, score=excess_return_score(bh_return),
+                               constraint=lambda p: p['fast_ma'] < p['slow_ma'])
+    found.leaderboard.head()
+"""
+import itertools
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+SearchResult = namedtuple('SearchResult', ['leaderboard', 'results', 'backtests'])
+
+METRICS = ['total_return', 'max_drawdown', 'sharpe_ratio', 'win_rate', 'total_trades']
+
+
+def excess_return_score(benchmark_return=0.0):
+    """Score of the sol4h scripts: excess mean return over drawdown, weighted by win rate."""
+    def score(summary):
+        excess = summary['total_return'] - benchmark_return
+        return excess / (1 + summary['max_drawdown'].abs()) * summary['win_rate']
+    return score
+
+
+def _is_range(values):
+    return isinstance(values, tuple) and len(values) == 2
+
+
+def grid_configs(space, constraint=None):
+    """Every configuration of a space whose values are all lists (no ranges)."""
+    if any(_is_range(values) for values in space.values()):
+        raise ValueError("grid_configs needs discrete values for every parameter")
+    names = list(space)
+    configs = (dict(zip(names, combo)) for combo in itertools.product(*space.values()))
+    return [c for c in configs if constraint is None or constraint(c)]
+
+
+def sample_configs(space, n, rng, constraint=None, max_tries=100):
+    """``n`` distinct configurations drawn from ``space``.
+
+    Values are either a list of choices or a ``(low, high)`` tuple: integers
+    are drawn uniformly from ``low..high`` inclusive, floats from
+    ``[low, high)``. A fully discrete space no larger than ``n`` is
+    returned whole.
+    """
+    if not any(_is_range(values) for values in space.values()):
+        configs = grid_configs(space, constraint)
+        if len(configs) <= n:
+            return configs
+        return [configs[i] for i in sorted(rng.choice(len(configs), n, replace=False))]
+    configs, seen = [], set()
+    for _ in range(n * max_tries):
+        config = {}
+        for name, values in space.items():
+            if not _is_range(values):
+                config[name] = values[rng.integers(len(values))]
+            elif all(isinstance(v, (int, np.integer)) for v in values):
+                config[name] = int(rng.integers(values[0], values[1] + 1))
+            else:
+                config[name] = float(rng.uniform(*values))
+        key = tuple(config.values())
+        if key not in seen and (constraint is None or constraint(config)):
+            seen.add(key)
+            configs.append(config)
+            if len(configs) == n:
+                break
+    return configs
+
+
+def rungs(n_windows, min_windows=1, eta=3):
+    """Cumulative windows per rung: ``min_windows * eta**k``, ending at ``n_windows``."""
+    sizes = []
+    size = min_windows
+    while size < n_windows:
+        sizes.append(size)
+        size *= eta
+    return sizes + [n_windows]
+
+
+def halving_cost(n_configs, schedule, eta=3):
+    """Backtests successive halving spends when starting ``n_configs`` on ``schedule``."""
+    cost, alive, done = 0, n_configs, 0
+    for size in schedule:
+        cost += alive * (size - done)
+        done = size
+        alive = max(1, math.ceil(alive / eta))
+    return cost
+
+
+def successive_halving(evaluate, space, windows, budget, score=None, eta=3, min_windows=1, constraint=None,
+                       seed=0):
+    """Search ``space`` with at most ``budget`` backtests; returns a ``SearchResult``.
+
+    The number of starting configurations is the largest that fits the
+    budget. ``leaderboard`` has one row per configuration with its mean
+    metrics, the number of windows it was evaluated on and its score,
+    sorted so that the survivors of the last rung come first, best first.
+    ``results`` holds every (config, window) row that was computed.
+    """
+    score = score or excess_return_score()
+    windows = np.asarray(windows)
+    schedule = rungs(len(windows), min_windows, eta)
+    n_configs = 1
+    while halving_cost(n_configs + 1, schedule, eta) <= budget:
+        n_configs += 1
+    configs = sample_configs(space, n_configs, np.random.default_rng(seed), constraint)
+
+    alive = list(range(len(configs)))
+    frames, done = [], 0
+    for size in schedule:
+        part = evaluate([configs[i] for i in alive], windows[done:size])
+        part = part.reset_index()
+        part['config'] = np.asarray(alive)[part.pop('param').to_numpy()]
+        part['sample'] = part['sample'] + done
+        frames.append(part)
+        done = size
+        summary = _summarize(pd.concat(frames, ignore_index=True), score)
+        ranked = summary.loc[alive].sort_values('score', ascending=False, na_position='last')
+        alive = sorted(ranked.index[:max(1, math.ceil(len(alive) / eta))])
+
+    results = pd.concat(frames, ignore_index=True)
+    leaderboard = _summarize(results, score)
+    leaderboard.insert(0, 'params', [configs[i] for i in leaderboard.index])
+    leaderboard = leaderboard.sort_values(['windows', 'score'], ascending=False, na_position='last')
+    return SearchResult(leaderboard, results, len(results))
+
+
+def grid_search(evaluate, space, windows, score=None, constraint=None, batch_size=None):
+    """Exhaustive baseline: every grid configuration on every window.
+
+    ``batch_size`` caps the configurations per ``evaluate`` call to bound memory.
+    """
+    score = score or excess_return_score()
+    configs = grid_configs(space, constraint)
+    batch_size = batch_size or max(len(configs), 1)
+    frames = []
+    for first in range(0, len(configs), batch_size):
+        part = evaluate(configs[first:first + batch_size], np.asarray(windows)).reset_index()
+        part['config'] = part.pop('param') + first
+        frames.append(part)
+    results = pd.concat(frames, ignore_index=True)
+    leaderboard = _summarize(results, score)
+    leaderboard.insert(0, 'params', configs)
+    return SearchResult(leaderboard.sort_values('score', ascending=False, na_position='last'), results, len(results))
+
+
+def _summarize(results, score):
+    metrics = [m for m in METRICS if m in results]
+    summary = results.groupby('config')[metrics].mean()
+    summary['windows'] = results.groupby('config').size()
+    summary['score'] = score(summary)
+    return summary
@@ -0,0 +1,119 @@
+"""Derive coarser timeframes from stored base candles.
+
+``resample_ohlcv`` aggregates an OHLCV matrix into fixed-width buckets with
+``ufunc.reduceat`` (open=first, high=max, low=min, close=last, volume=sum),
+so there is no Python loop over bars or groups.
+
+``ResampleCache`` keeps every derived timeframe in its own memory-mapped
+store next to the base store. When new base candles arrive only the buckets
+from the last derived one onwards are recomputed; the whole timeframe is
+rebuilt only if rows before the previous high-water mark changed (e.g. a gap
+repair inserted candles, or history was rewritten).
+
+    cache = ResampleCache()
+    df = cache.get('binance', 'SOLUSDT', '1d')  # derived from the finest stored interval
+"""
+import json
+import os
+
+import numpy as np
+
+from kline_download import INTERVAL_MS, interval_ms
+from ohlcv_store import OHLCVStore
+
+# Binance/ISO weeks start on Monday; the Unix epoch was a Thursday
+ORIGIN_MS = {'1w': 4 * 86_400_000}
+
+
+def resample_ohlcv(m, target, origin=None):
+    """Aggregate an (n, 6) timestamp/OHLCV matrix into ``target`` buckets.
+
+    ``target`` is an interval string ('4h', '1d', ...) or a width in ms.
+    Rows must be sorted by timestamp. The last bucket may be incomplete.
+    """
+    step = interval_ms(target) if isinstance(target, str) else int(target)
+    if origin is None:
+        origin = ORIGIN_MS.get(target, 0) if isinstance(target, str) else 0
+    m = np.asarray(m)
+    if not len(m):
+        return np.empty((0, 6), dtype=np.float64)
+    ts = m[:, 0].astype(np.int64)
+    bucket = (ts - origin) // step
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(m)] - 1
+
+    out = np.empty((len(starts), 6), dtype=np.float64, order='F')
+    out[:, 0] = bucket[starts] * step + origin
+    out[:, 1] = m[starts, 1]
+    out[:, 2] = np.maximum.reduceat(m[:, 2], starts)
+    out[:, 3] = np.minimum.reduceat(m[:, 3], starts)
+    out[:, 4] = m[ends, 4]
+    out[:, 5] = np.add.reduceat(m[:, 5], starts)
+    return out
+
+
+def divides(base, target):
+    """True if ``target`` buckets are made of whole ``base`` candles."""
+    return interval_ms(target) % interval_ms(base) == 0 and \
+        (ORIGIN_MS.get(target, 0) - ORIGIN_MS.get(base, 0)) % interval_ms(base) == 0
+
+
+class ResampleCache:
+    """Cached, incrementally refreshed higher timeframes over an ``OHLCVStore``."""
+
+    def __init__(self, store=None, root=None):
+        self.store = store or OHLCVStore()
+        self.derived = OHLCVStore(root or os.path.join(os.path.dirname(os.path.abspath(self.store.root)), 'resampled'))
+
+    def finest_base(self, source, symbol, interval):
+        """Finest stored interval that ``interval`` can be built from."""
+        stored = [i for s, sym, i in self.store.keys(source) if sym == symbol and i in INTERVAL_MS]
+        candidates = sorted((i for i in stored if divides(i, interval)), key=interval_ms)
+        if not candidates:
+            raise KeyError(f"No stored base candles for {source}/{symbol} that divide {interval}")
+        return candidates[0]
+
+    def get(self, source, symbol, interval, base=None, start=None, end=None):
+        """Return ``interval`` candles as a DataFrame (same layout as ``OHLCVStore.load``)."""
+        base = base or self.finest_base(source, symbol, interval)
+        if base == interval:
+            return self.store.load(source, symbol, interval, start, end)
+        key = self.refresh(source, symbol, interval, base)
+        return self.derived.load(*key, start=start, end=end)
+
+    def refresh(self, source, symbol, interval, base):
+        """Bring the derived timeframe up to date with its base; returns its store key."""
+        key = (source, symbol, f"{interval}_from_{base}")
+        base_path = self.store.path(source, symbol, base)
+        meta_path = self.derived.path(*key)[:-4] + '.json'
+        meta = None
+        if os.path.exists(meta_path) and self.derived.exists(*key):
+            with open(meta_path) as f:
+                meta = json.load(f)
+
+        mtime = os.path.getmtime(base_path)
+        if meta is not None and meta['base_mtime'] == mtime:
+            return key
+
+        m = self.store.matrix(source, symbol, base)
+        ts = m[:, 0]
+        if meta is not None and np.searchsorted(ts, meta['base_last'], side='right') == meta['base_rows'] \
+                and _checksum(m[:max(meta['base_rows'] - 1, 0)]) == meta['base_sum']:
+            # Only appended (or replaced the forming candle): redo buckets from the last derived one
+            last_bucket = self.derived.last_timestamp(*key)
+            lo = 0 if last_bucket is None else int(np.searchsorted(ts, last_bucket, side='left'))
+            self.derived.append(*key, resample_ohlcv(m[lo:], interval))
+        else:
+            self.derived.write(*key, resample_ohlcv(m, interval))
+
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        with open(meta_path, 'w') as f:
+            json.dump({'base_mtime': mtime, 'base_rows': len(m),
+                       'base_last': float(ts[-1]) if len(ts) else 0.0,
+                       'base_sum': _checksum(m[:len(m) - 1])}, f)
+        return key
+
+
+def _checksum(m):
+    # Column sums of the settled rows (all but the forming candle); one vectorized pass
+    return m.sum(axis=0).tolist()
@@ -0,0 +1,221 @@
+"""Append-only SQLite store of sweep results, so sweeps only compute what is missing.
+
+The sol4h sweeps overwrote their CSVs on every run (older results survived
+only as hand-made copies in ``sol4h/old/``) and recomputed every cell even
+when one grid value had been added. Here every result is one row keyed by
+
+    (dataset, code, strategy, params, window_start, window_length)
+
+where ``dataset`` is the content hash of the price series
+(``dataset_version``), ``code`` a hash of the source of the functions that
+produce the metrics (``code_hash``), ``params`` canonical JSON and the
+window the bar range that was backtested. Rows are never updated: a key is
+written once, by the run that first computed it, and each row points at its
+``runs`` entry (start time, host, git commit, command line, library
+versions). Changing the data or the strategy code changes the key, so stale
+results are never served.
+
+``cached_sweep`` runs ``sweep_runner.run_sweep`` on the tasks whose keys are
+not stored yet, appends each finished chunk in its own transaction (an
+interrupted sweep resumes where it stopped) and returns every task's
+metrics, stored or fresh.
+
+    from results_store import ResultsStore, cached_sweep, code_hash, dataset_version, result_key
+    store = ResultsStore('backtest_results.sqlite')
+    keys = [result_key(dataset_version(price), code_hash(evaluate), 'SMA', p, start, 500) for p, start in cells]
+    results = cached_sweep(store, evaluate, tasks, keys, {'close': close})
+"""
+import hashlib
+import inspect
+import json
+import os
+import platform
+import socket
+import sqlite3
+import subprocess
+import sys
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from indicator_cache import data_hash
+from sweep_runner import run_sweep
+
+# Columns ``fetch``/``cached_sweep`` add next to the metrics
+RUN_COLUMNS = ['run_id', 'computed_at', 'run_started_at', 'run_host', 'run_git_commit', 'run_command', 'run_versions']
+
+ResultKey = namedtuple('ResultKey', ['dataset', 'code', 'strategy', 'params', 'window_start', 'window_length'])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    host TEXT,
+    git_commit TEXT,
+    command TEXT,
+    versions TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    dataset TEXT NOT NULL,
+    code TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    params TEXT NOT NULL,
+    window_start INTEGER NOT NULL,
+    window_length INTEGER NOT NULL,
+    metrics TEXT NOT NULL,
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    computed_at TEXT NOT NULL,
+    PRIMARY KEY (dataset, code, strategy, params, window_start, window_length)
+) WITHOUT ROWID;
+"""
+
+
+def dataset_version(data):
+    """Content hash of the price data a sweep runs on."""
+    return data_hash(data)
+
+
+def code_hash(*objects):
+    """Hash of the source code of the given functions/classes."""
+    h = hashlib.blake2b(digest_size=16)
+    for obj in objects:
+        h.update(inspect.getsource(obj).encode())
+    return h.hexdigest()
+
+
+def canonical_params(params):
+    """Params as JSON with sorted keys; JSON strings are re-encoded the same way."""
+    if isinstance(params, str):
+        params = json.loads(params)
+    return json.dumps(params, sort_keys=True, default=_json_default)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, timeout=5,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_metadata():
+    """Metadata recorded with every run that appends results."""
+    versions = {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__}
+    vbt = sys.modules.get('vectorbt')
+    if vbt is not None:
+        versions['vectorbt'] = vbt.__version__
+    return {'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'host': socket.gethostname(),
+            'git_commit': _git_commit(), 'command': ' '.join(sys.argv), 'versions': json.dumps(versions)}
+
+
+def result_key(dataset, code, strategy, params, window_start, window_length):
+    """``ResultKey`` with canonical params and plain-int window bounds."""
+    return ResultKey(dataset, code, strategy, canonical_params(params), int(window_start), int(window_length))
+
+
+class ResultsStore:
+    """Append-only results keyed by ``ResultKey``."""
+
+    def __init__(self, path):
+        self.path = path
+        self.run = run_metadata()  # inserted into runs with this store's first append
+        self.run_id = None
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def _stored(self, keys, columns):
+        """{key: row} for the stored rows among ``keys``."""
+        wanted = set(keys)
+        rows = {}
+        for dataset, code in {(k.dataset, k.code) for k in wanted}:
+            cursor = self.conn.execute(
+                f"SELECT strategy, params, window_start, window_length, {columns} FROM results "
+                "LEFT JOIN runs USING (run_id) WHERE dataset = ? AND code = ?", (dataset, code))
+            for strategy, params, start, length, *values in cursor:
+                key = ResultKey(dataset, code, strategy, params, start, length)
+                if key in wanted:
+                    rows[key] = values
+        return rows
+
+    def missing(self, keys):
+        """Positions of the keys that have no stored result."""
+        stored = self._stored(keys, 'run_id')
+        return [i for i, key in enumerate(keys) if key not in stored]
+
+    def append(self, keys, metrics):
+        """Store ``metrics[i]`` (a dict) under ``keys[i]``; keys already stored are left untouched."""
+        with self.conn:
+            if self.run_id is None:
+                self.run_id = self.conn.execute(
+                    f"INSERT INTO runs ({', '.join(self.run)}) VALUES ({', '.join('?' * len(self.run))})",
+                    list(self.run.values())).lastrowid
+            now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(*key, json.dumps(m, default=_json_default), self.run_id, now) for key, m in zip(keys, metrics)])
+
+    def fetch(self, keys):
+        """Stored metrics plus ``run_id``, ``computed_at`` and the run's metadata, one row per key (NaN if missing)."""
+        stored = self._stored(keys, 'metrics, run_id, computed_at, started_at, host, git_commit, command, versions')
+        rows = []
+        for key in keys:
+            if key not in stored:
+                rows.append({})
+                continue
+            metrics, *meta = stored[key]
+            rows.append({**json.loads(metrics), **dict(zip(RUN_COLUMNS, meta))})
+        return pd.DataFrame(rows, index=pd.RangeIndex(len(keys)))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def cached_sweep(store, func, tasks, keys, arrays, **kwargs):
+    """``run_sweep`` over the tasks whose key is not in ``store`` yet; returns rows for every task.
+
+    ``tasks`` is a list of parameter dicts, run as given (tuple or list
+    values are not expanded), and ``keys[i]`` the ``ResultKey`` of
+    ``tasks[i]``. Fresh results are appended chunk by chunk; failed tasks
+    are not stored (they are retried next time) and keep their ``error``.
+    Each returned row holds ``task`` (position in ``tasks``), the task's
+    parameters, its metrics, its run metadata, ``cached`` and ``error``.
+    """
+    if len(tasks) != len(keys):
+        raise ValueError(f"{len(tasks)} tasks for {len(keys)} keys")
+    todo = store.missing(keys)
+    errors = {}
+
+    def append(rows):
+        done = [row for row in rows if row['error'] is None]
+        store.append([keys[todo[row['task']]] for row in done],
+                     [{name: row[name] for name in row if name not in tasks[todo[row['task']]]
+                       and name not in ('task', 'error')} for row in done])
+        errors.update({todo[row['task']]: row['error'] for row in rows if row['error'] is not None})
+
+    if todo:
+        run_sweep(func, [tasks[i] for i in todo], arrays, on_rows=append, expanded=True, **kwargs)
+    results = store.fetch(keys)
+    fresh = set(todo)
+    head = pd.DataFrame(tasks, index=results.index)
+    head.insert(0, 'task', range(len(tasks)))
+    out = pd.concat([head, results.drop(columns=[c for c in head if c in results])], axis=1)
+    out['cached'] = [i not in fresh for i in range(len(tasks))]
+    out['error'] = [errors.get(i) for i in range(len(tasks))]
+    return out
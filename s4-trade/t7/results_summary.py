@@ -0,0 +1,168 @@
+"""Streaming group-by summaries of backtest result files.
+
+sol4h/analyze_backtest.py read the whole results CSV into per-key Python
+lists, averaged them in pure Python and sorted every group for the top 5.
+``summarize`` streams a CSV, a Parquet file, a directory of Parquet files
+or a ``results_store`` SQLite file in fixed-size chunks, parses them with
+pyarrow and reduces each chunk
+to per-group sums and counts with Arrow's hash aggregation, so memory grows
+with the number of (strategy, params) groups, never with the number of rows.
+NaN metrics are skipped, as in pandas' ``groupby().mean()``. A SQLite store
+is read with ``fetchmany``, its metrics JSON expanded into columns one batch
+at a time; every stored row counts, whatever its dataset or code version
+(group by ``code`` to tell them apart).
+
+Scores are pluggable: a name from ``SCORES``, any ``summary -> Series``
+function, or a ``DataFrame.eval`` expression over the mean metrics.
+``top_k`` picks the best groups with a bounded heap instead of a full sort.
+
+    from results_summary import summarize, top_k
+    summary = summarize('backtest_results.sqlite')
+    best = top_k(summary, 'total_return / (1 + abs(max_drawdown)) * win_rate', k=5)
+"""
+import csv
+import heapq
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from param_search import excess_return_score
+from results_store import ResultKey
+
+METRICS = ['total_return', 'max_drawdown', 'sharpe_ratio', 'win_rate', 'total_trades']
+GROUP_BY = ['strategy', 'params']
+BATCH_ROWS = 1 << 20  # Parquet rows per chunk
+BLOCK_BYTES = 32 << 20  # CSV bytes per chunk
+SQLITE_ROWS = 1 << 16  # SQLite rows per chunk (their metrics JSON is parsed in Python)
+# Partial aggregates are merged once this many are pending
+MERGE_EVERY = 32
+
+SCORES = {
+    # The sol4h composite: mean return over drawdown, weighted by win rate
+    'composite': excess_return_score(0.0),
+    'sharpe': lambda summary: summary['sharpe_ratio'],
+    'return': lambda summary: summary['total_return'],
+    'return_over_drawdown': lambda summary: summary['total_return'] / (1 + summary['max_drawdown'].abs()),
+}
+
+
+def _csv_tables(path, columns, by, block_bytes):
+    """Tables parsed from ``block_bytes`` slices of a CSV cut at line ends (one record per line)."""
+    with open(path, 'rb') as f:
+        header = next(csv.reader([f.readline().decode()]))
+        read_options = pv.ReadOptions(column_names=header, use_threads=False)
+        convert_options = pv.ConvertOptions(
+            include_columns=columns, column_types={name: pa.dictionary(pa.int32(), pa.string()) for name in by})
+        rest = b''
+        while True:
+            block = f.read(block_bytes)
+            data = rest + block
+            if not data.strip():
+                return
+            cut = data.rfind(b'\n') + 1 if block else len(data)
+            rest = data[cut:]
+            if cut:
+                yield pv.read_csv(pa.py_buffer(data[:cut]), read_options=read_options,
+                                  convert_options=convert_options)
+
+
+def _sqlite_tables(path, columns, batch_rows):
+    """Tables from the ``results`` table of a ``results_store`` file; key columns as stored, the rest from metrics."""
+    keys = [name for name in columns if name in ResultKey._fields]
+    metrics = [name for name in columns if name not in ResultKey._fields]
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        cursor = conn.execute(f"SELECT {', '.join(keys + ['metrics'])} FROM results")
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                return
+            values = list(zip(*rows))
+            parsed = [json.loads(m) for m in values[-1]]
+            table = {name: pa.array(values[i]) for i, name in enumerate(keys)}
+            table.update({name: pa.array([m.get(name) for m in parsed], pa.float64()) for name in metrics})
+            yield pa.table(table).select(columns)
+    finally:
+        conn.close()
+
+
+def iter_tables(path, columns, by, batch_rows=BATCH_ROWS, block_bytes=BLOCK_BYTES):
+    """Tables of ``columns`` from a CSV file, a Parquet file or directory or a SQLite store, a chunk at a time."""
+    if path.endswith('.csv'):
+        yield from _csv_tables(path, columns, by, block_bytes)
+        return
+    if path.endswith('.sqlite'):
+        yield from _sqlite_tables(path, columns, min(batch_rows, SQLITE_ROWS))
+        return
+    if os.path.isdir(path):
+        batches = ds.dataset(path, format='parquet').to_batches(columns=columns, batch_size=batch_rows,
+                                                                 batch_readahead=1, fragment_readahead=1)
+    else:
+        batches = pq.ParquetFile(path).iter_batches(batch_size=batch_rows, columns=columns)
+    for batch in batches:
+        yield pa.Table.from_batches([batch])
+
+
+def _partial(table, by, metrics):
+    columns = {name: table[name] for name in by}
+    for name in metrics:
+        values = pc.cast(table[name], pa.float64())
+        columns[name] = pc.if_else(pc.is_nan(values), pa.scalar(None, pa.float64()), values)
+    aggregations = [(name, op) for name in metrics for op in ('sum', 'count')] + [([], 'count_all')]
+    table = pa.table(columns).unify_dictionaries().group_by(by).aggregate(aggregations)
+    # Dictionary-encoded keys differ per chunk; plain strings merge across chunks
+    for name in by:
+        if pa.types.is_dictionary(table[name].type):
+            table = table.set_column(table.column_names.index(name), name, table[name].cast(pa.string()))
+    return table
+
+
+def _merge(partials, by, metrics):
+    aggregations = [(f'{name}_{op}', 'sum') for name in metrics for op in ('sum', 'count')] + [('count_all', 'sum')]
+    table = pa.concat_tables(partials).group_by(by).aggregate(aggregations)
+    return table.rename_columns([name if name in by else name[:-len('_sum')] for name in table.column_names])
+
+
+def summarize(path, metrics=None, by=None, batch_rows=BATCH_ROWS, block_bytes=BLOCK_BYTES):
+    """Per-group mean of each metric plus ``samples`` (row count), in bounded memory."""
+    metrics = list(metrics or METRICS)
+    by = list(by or GROUP_BY)
+    partials = []
+    for table in iter_tables(path, by + metrics, by, batch_rows, block_bytes):
+        partials.append(_partial(table, by, metrics))
+        if len(partials) >= MERGE_EVERY:
+            partials = [_merge(partials, by, metrics)]
+    if not partials:
+        return pd.DataFrame(columns=by + metrics + ['samples'])
+    merged = _merge(partials, by, metrics).to_pandas()
+    summary = merged[by].copy()
+    for name in metrics:
+        count = merged[f'{name}_count']
+        summary[name] = merged[f'{name}_sum'].where(count > 0) / count
+    summary['samples'] = merged['count_all'].astype(np.int64)
+    return summary
+
+
+def score_summary(summary, score='composite'):
+    """Score per group: a ``SCORES`` name, a function of the summary, or a ``DataFrame.eval`` expression."""
+    if callable(score):
+        return pd.Series(np.asarray(score(summary), dtype=float), index=summary.index)
+    if score in SCORES:
+        return pd.Series(np.asarray(SCORES[score](summary), dtype=float), index=summary.index)
+    return pd.Series(np.asarray(summary.eval(score), dtype=float), index=summary.index)
+
+
+def top_k(summary, score='composite', k=5):
+    """The ``k`` best-scoring groups, best first, with a ``score`` column; NaN scores never qualify."""
+    scores = score_summary(summary, score)
+    values = scores.to_numpy()
+    best = heapq.nlargest(k, (i for i in range(len(values)) if not np.isnan(values[i])), key=values.__getitem__)
+    return summary.iloc[best].assign(score=values[best]).reset_index(drop=True)
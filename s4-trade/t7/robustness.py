@@ -0,0 +1,74 @@
+"""Batched robustness sampling over fixed random windows.
+
+sol4h/batch_backtest.py used to draw a fresh random window for every
+(parameter set, sample) pair, recompute the indicators on each slice and run
+one portfolio per pair. Here the windows are drawn once from a seeded
+generator and shared by every parameter set, signals are computed once on the
+full series by the caller, and every (parameter set, window) pair becomes a
+column of a single vectorbt portfolio.
+
+Columns are laid out parameter-major under a ``(param, sample)``
+MultiIndex; the portfolio's index is the bar offset inside the window, since
+each column covers different dates.
+
+    from robustness import draw_windows, sample_portfolio, sample_metrics
+    starts = draw_windows(len(price), window=500, n_samples=10, seed=42)
+    pf = sample_portfolio(price, entries, exits, starts, 500, sl_stop=[0.05, 0.03], tp_stop=0.05,
+                          init_cash=10000, fees=0.001, freq='4h')
+    metrics = sample_metrics(pf)   # one row per (param, sample)
+"""
+import numpy as np
+import pandas as pd
+import vectorbt as vbt
+
+
+def draw_windows(n_bars, window, n_samples, seed=None):
+    """Start offsets of ``n_samples`` windows of ``window`` bars, uniform over the series."""
+    if window > n_bars:
+        raise ValueError(f"window of {window} bars is longer than the series ({n_bars} bars)")
+    return np.random.default_rng(seed).integers(0, n_bars - window + 1, n_samples)
+
+
+def take_windows(values, starts, window):
+    """(window, len(starts), ...) stack of ``values[start:start + window]`` for each start."""
+    return np.asarray(values)[np.asarray(starts)[None, :] + np.arange(window)[:, None]]
+
+
+def sample_portfolio(price, entries, exits, starts, window, sl_stop=None, tp_stop=None, **kwargs):
+    """One portfolio with a column per (parameter set, window).
+
+    ``entries``/``exits`` are ``(bars, params)`` signals computed on the full
+    ``price`` series; ``sl_stop``/``tp_stop`` are scalars or one value per
+    parameter set. Extra keyword arguments go to ``Portfolio.from_signals``.
+    """
+    entries = np.asarray(entries, dtype=bool).reshape(len(price), -1)
+    exits = np.asarray(exits, dtype=bool).reshape(len(price), -1)
+    n_params, n_samples = entries.shape[1], len(starts)
+    columns = pd.MultiIndex.from_product([range(n_params), range(n_samples)], names=['param', 'sample'])
+    index = pd.RangeIndex(window, name='bar')
+
+    def by_column(values):
+        # (window, samples, params) -> (window, params * samples), parameter-major
+        return take_windows(values, starts, window).transpose(0, 2, 1).reshape(window, -1)
+
+    stops = {name: np.repeat(np.broadcast_to(np.asarray(stop, dtype=float), n_params), n_samples)[None]
+             for name, stop in (('sl_stop', sl_stop), ('tp_stop', tp_stop)) if stop is not None}
+    close = take_windows(np.asarray(price, dtype=float), starts, window)
+    return vbt.Portfolio.from_signals(
+        pd.DataFrame(np.tile(close, n_params), index=index, columns=columns),
+        pd.DataFrame(by_column(entries), index=index, columns=columns),
+        pd.DataFrame(by_column(exits), index=index, columns=columns),
+        **stops,
+        **kwargs
+    )
+
+
+def sample_metrics(pf):
+    """Per-column total return, max drawdown, Sharpe ratio, win rate and trade count."""
+    return pd.DataFrame({
+        'total_return': pf.total_return(),
+        'max_drawdown': pf.max_drawdown(),
+        'sharpe_ratio': pf.sharpe_ratio(),
+        'win_rate': pf.trades.win_rate(),
+        'total_trades': pf.trades.count(),
+    })
@@ -1,55 +1,42 @@
-import csv
-import json
-from collections import defaultdict
-
-# Read the CSV file
-data = defaultdict(lambda: {'total_return': [], 'max_drawdown': [], 'sharpe_ratio': [], 'win_rate': [], 'total_trades': []})
-
-with open('/home/vuos/code/p1/s4-trade/t7/sol4h/backtest_results.csv', 'r') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        key = (row['strategy'], row['params'])
-        data[key]['total_return'].append(float(row['total_return']))
-        data[key]['max_drawdown'].append(float(row['max_drawdown']))
-        data[key]['sharpe_ratio'].append(float(row['sharpe_ratio']))
-        data[key]['win_rate'].append(float(row['win_rate']))
-        data[key]['total_trades'].append(int(row['total_trades']))
-
-# Compute averages and scores
-results = []
-for (strategy, params), values in data.items():
-    avg_return = sum(values['total_return']) / len(values['total_return'])
-    avg_drawdown = sum(values['max_drawdown']) / len(values['max_drawdown'])
-    avg_sharpe = sum(values['sharpe_ratio']) / len(values['sharpe_ratio'])
-    avg_win_rate = sum(values['win_rate']) / len(values['win_rate'])
-    avg_trades = sum(values['total_trades']) / len(values['total_trades'])
-    score = (avg_return / (1 + abs(avg_drawdown))) * avg_win_rate
-    results.append({
-        'strategy': strategy,
-        'params': params,
-        'avg_return': avg_return,
-        'avg_drawdown': avg_drawdown,
-        'avg_sharpe': avg_sharpe,
-        'avg_win_rate': avg_win_rate,
-        'avg_trades': avg_trades,
-        'score': score
-    })
-
-# Sort by score descending
-results.sort(key=lambda x: x['score'], reverse=True)
-
-# Top 5
-top5 = results[:5]
-
-print("Top 5 param sets by composite score:")
-for i, r in enumerate(top5, 1):
-    print(f"{i}. Strategy: {r['strategy']}, Params: {r['params']}")
-    print(f"   Avg Return: {r['avg_return']:.4f}, Avg Drawdown: {r['avg_drawdown']:.4f}, Avg Sharpe: {r['avg_sharpe']:.4f}, Avg Win Rate: {r['avg_win_rate']:.4f}, Avg Trades: {r['avg_trades']:.1f}, Score: {r['score']:.4f}")
-    print()
-
-# Best recommendation
-best = top5[0]
-print(f"Recommended best strategy and params for robustness and risk management:")
-print(f"Strategy: {best['strategy']}")
-print(f"Params: {best['params']}")
-print(f"Reason: Highest composite score ({best['score']:.4f}), balancing return, drawdown, and win rate.")
\ No newline at end of file
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from results_summary import SCORES, summarize, top_k  # streaming group-by over CSV/Parquet/SQLite results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank the param sets of a backtest results file.")
+    parser.add_argument('path', nargs='?',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backtest_results.sqlite'),
+                        help="results CSV, Parquet file, directory of Parquet files or results_store .sqlite file")
+    parser.add_argument('--score', default='composite',
+                        help=f"one of {', '.join(SCORES)}, or an expression over the mean metrics, "
+                             f"e.g. 'total_return / (1 + abs(max_drawdown))'")
+    parser.add_argument('--top', type=int, default=5, help="number of param sets to list")
+    args = parser.parse_args(argv)
+
+    # Per (strategy, params) means, aggregated chunk by chunk
+    summary = summarize(args.path)
+    top = top_k(summary, args.score, args.top)
+    if top.empty:
+        print(f"No scored param sets in {args.path}")
+        return
+
+    print(f"Top {args.top} param sets by {args.score} score:")
+    for i, r in enumerate(top.itertuples(), 1):
+        print(f"{i}. Strategy: {r.strategy}, Params: {r.params}")
+        print(f"   Avg Return: {r.total_return:.4f}, Avg Drawdown: {r.max_drawdown:.4f}, Avg Sharpe: {r.sharpe_ratio:.4f}, Avg Win Rate: {r.win_rate:.4f}, Avg Trades: {r.total_trades:.1f}, Score: {r.score:.4f}")
+        print()
+
+    # Best recommendation
+    best = top.iloc[0]
+    print(f"Recommended best strategy and params for robustness and risk management:")
+    print(f"Strategy: {best['strategy']}")
+    print(f"Params: {best['params']}")
+    print(f"Reason: Highest {args.score} score ({best['score']:.4f}), balancing return, drawdown, and win rate.")
+
+
+if __name__ == '__main__':
+    main()
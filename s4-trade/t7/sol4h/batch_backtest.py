@@ -1,22 +1,21 @@
+import argparse
+import os
+import sys
 import pandas as pd
 import vectorbt as vbt
 import numpy as np
 from datetime import datetime
 import json
-import random
 
 # Load data
-def load_data():
-    df = pd.read_csv('solana_4h_ohlc.csv')
-    df['datetime'] = pd.to_datetime(df['datetime'])
-    df.set_index('datetime', inplace=True)
-    return df
-
-data = load_data()
-price = data['close']
-
-# Use random subsets for robustness testing
-random.seed(42)  # For reproducibility
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ohlcv_store import load_data  # memory-mapped columnar copy of solana_4h_ohlc.csv
+from indicator_cache import cached_run  # memoized vbt indicator runs (set INDICATOR_CACHE_DIR to keep them on disk)
+from param_search import excess_return_score, successive_halving
+from results_store import RUN_COLUMNS, ResultsStore, cached_sweep, code_hash, dataset_version, result_key
+from robustness import draw_windows, sample_metrics, sample_portfolio
+from sweep_runner import param_grid
+from walk_forward import walk_forward
 
 # Parameters to test
 sl_options = [0.02, 0.05, 0.1]
@@ -34,171 +33,291 @@ strategies = [
     }
 ]
 
-results = []
-
 num_samples = 10  # More samples for robustness
-
-for strategy in strategies:
-    strat_type = strategy['type']
-    for param_set in strategy['params']:
-        for sample in range(num_samples):
-            try:
-                # Random subset: 500 candles
-                start_idx = random.randint(0, len(price) - 500)
-                sample_price = price.iloc[start_idx:start_idx + 500]
-
-                if strat_type == 'SMA Crossover':
-                    fast_ma = param_set['fast_ma']
-                    slow_ma = param_set['slow_ma']
-                    fast_ma_series = vbt.MA.run(sample_price, window=fast_ma)
-                    slow_ma_series = vbt.MA.run(sample_price, window=slow_ma)
-                    entries = fast_ma_series.ma_above(slow_ma_series)
-                    exits = fast_ma_series.ma_below(slow_ma_series)
-
-                elif strat_type == 'RSI':
-                    rsi_period = param_set['rsi_period']
-                    rsi_oversold = param_set['rsi_oversold']
-                    rsi_overbought = param_set['rsi_overbought']
-                    rsi_indicator = vbt.RSI.run(sample_price, window=rsi_period)
-                    entries = rsi_indicator.rsi_below(rsi_oversold)
-                    exits = rsi_indicator.rsi_above(rsi_overbought)
-
-                elif strat_type == 'Bollinger Bands':
-                    bb_period = param_set['bb_period']
-                    bb_std = param_set['bb_std']
-                    bb_exit_threshold = param_set['bb_exit_threshold']
-                    bb_indicator = vbt.BBANDS.run(sample_price, window=bb_period, nbdevup=bb_std, nbdevdn=bb_std)
-                    entries = sample_price < bb_indicator.lower
-                    exits = sample_price > bb_indicator.upper * (1 + bb_exit_threshold)
-
-                sl = param_set.get('sl_stop', 0.05)
-                tp = param_set.get('tp_stop', 0.10)
-
-                # Create portfolio
-                pf = vbt.Portfolio.from_signals(
-                    sample_price,
-                    entries,
-                    exits,
-                    init_cash=10000,
-                    fees=0.001,
-                    sl_stop=sl,
-                    tp_stop=tp,
-                    freq='4h'
-                )
-
-                # Collect metrics
-                result = {
-                    'strategy': strat_type,
-                    'params': json.dumps(param_set),
-                    'sample': sample,
-                    'total_return': pf.total_return(),
-                    'max_drawdown': pf.max_drawdown(),
-                    'sharpe_ratio': pf.sharpe_ratio(),
-                    'win_rate': pf.trades.win_rate(),
-                    'total_trades': len(pf.trades.records)
-                }
-                results.append(result)
-                print(f"Completed {strat_type} with params {param_set}, sample {sample}")
-
-            except Exception as e:
-                print(f"Error with {strat_type} {param_set}, sample {sample}: {e}")
-
-# Buy and hold benchmark
-bh_pf = vbt.Portfolio.from_holding(price, init_cash=10000, freq='4h')
-bh_return = bh_pf.total_return()
-bh_drawdown = bh_pf.max_drawdown()
-print(f"Buy and Hold Return: {bh_return:.2%}")
-print(f"Buy and Hold Drawdown: {bh_drawdown:.2%}")
-
-# Analyze results
-results_df = pd.DataFrame(results)
-
-# Group by strategy and params, average metrics
-grouped = results_df.groupby(['strategy', 'params']).agg({
-    'total_return': 'mean',
-    'max_drawdown': 'mean',
-    'sharpe_ratio': 'mean',
-    'win_rate': 'mean',
-    'total_trades': 'mean'
-}).reset_index()
-
-# Calculate score relative to buy and hold
-grouped['excess_return'] = grouped['total_return'] - bh_return
-grouped['score'] = (grouped['excess_return'] / (1 + grouped['max_drawdown'].abs())) * grouped['win_rate']
-
-# Find best
-best = grouped.loc[grouped['score'].idxmax()]
-print(f"Best strategy: {best['strategy']}")
-print(f"Best params: {best['params']}")
-print(f"Avg Return: {best['total_return']:.2%} (BH: {bh_return:.2%})")
-print(f"Avg Drawdown: {best['max_drawdown']:.2%} (BH: {bh_drawdown:.2%})")
-print(f"Avg Win Rate: {best['win_rate']:.2%}")
-print(f"Excess Return: {best['excess_return']:.2%}")
-print(f"Score: {best['score']:.4f}")
-print(f"Data range: {price.index.min()} to {price.index.max()}")
-
-# Save to CSV
-results_df.to_csv('backtest_results.csv', index=False)
-grouped.to_csv('backtest_summary.csv', index=False)
-print("Results saved to backtest_results.csv and backtest_summary.csv")
-
-# Generate single HTML report for best
-import json
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-
-best_params = json.loads(best['params'])
-strat_type = best['strategy']
-
-# Run on full data for plotting
-if strat_type == 'SMA Crossover':
-    fast_ma = best_params['fast_ma']
-    slow_ma = best_params['slow_ma']
-    fast_ma_series = vbt.MA.run(price, window=fast_ma)
-    slow_ma_series = vbt.MA.run(price, window=slow_ma)
-    entries = fast_ma_series.ma_above(slow_ma_series)
-    exits = fast_ma_series.ma_below(slow_ma_series)
-
-sl = best_params.get('sl_stop', 0.05)
-tp = best_params.get('tp_stop', 0.05)
-
-pf = vbt.Portfolio.from_signals(
-    price,
-    entries,
-    exits,
-    init_cash=10000,
-    fees=0.001,
-    sl_stop=sl,
-    tp_stop=tp,
-    freq='4h'
-)
-
-# Create subplots
-fig = make_subplots(
-    rows=3, cols=1,
-    subplot_titles=('Portfolio Value', 'Drawdown', 'Trades'),
-    shared_xaxes=True
-)
-
-# Portfolio value
-value_trace = go.Scatter(x=pf.value().index, y=pf.value().values, mode='lines', name='Portfolio Value')
-fig.add_trace(value_trace, row=1, col=1)
-
-# Drawdown
-drawdown_trace = go.Scatter(x=pf.drawdown().index, y=pf.drawdown().values, mode='lines', name='Drawdown', fill='tozeroy')
-fig.add_trace(drawdown_trace, row=2, col=1)
-
-# Trades
-trades_df = pf.trades.records_readable
-if not trades_df.empty:
-    trades_trace = go.Scatter(x=trades_df.index, y=trades_df['Return'], mode='markers', name='Trades',
-                              marker=dict(color=trades_df['Return'].apply(lambda x: 'green' if x > 0 else 'red')))
-    fig.add_trace(trades_trace, row=3, col=1)
-
-# Add title with params
-title = f"Best Strategy: {strat_type}<br>Params: {best['params']}<br>Return: {best['total_return']:.2%} (BH: {bh_return:.2%}), Drawdown: {best['max_drawdown']:.2%} (BH: {bh_drawdown:.2%}), Win Rate: {best['win_rate']:.2%}, Score: {best['score']:.4f}<br>Data: {price.index.min()} to {price.index.max()}"
-
-fig.update_layout(title=title, height=900)
-
-fig.write_html('backtest_report.html')
-print("Report saved to backtest_report.html")
\ No newline at end of file
+window = 500  # Candles per sample
+
+# One task per (strategy, param set, sample)
+grid = [{'strategy': strategy['type'], 'params': [json.dumps(p) for p in strategy['params']],
+         'sample': range(num_samples)} for strategy in strategies]
+
+# --search halving: parameter ranges instead of hand-picked sets, searched within a backtest budget
+search_strategy = 'SMA Crossover'
+search_space = {'fast_ma': (3, 30), 'slow_ma': (20, 200), 'sl_stop': sl_options, 'tp_stop': tp_options}
+search_samples = 27  # Windows the surviving configurations are scored on
+
+# --walk-forward: candle counts of each train fold and of the out-of-sample fold after it
+train_bars = 1500
+test_bars = 250
+
+
+def strategy_signals(strat_type, params, price):
+    """(bars, params) entry/exit arrays, each indicator run once on the full series for all params."""
+    if strat_type == 'SMA Crossover':
+        windows = sorted({p[k] for p in params for k in ('fast_ma', 'slow_ma')})
+        ma = cached_run(vbt.MA, price, window=windows).ma.to_numpy().reshape(len(price), -1)
+        col = {w: i for i, w in enumerate(windows)}
+        fast = ma[:, [col[p['fast_ma']] for p in params]]
+        slow = ma[:, [col[p['slow_ma']] for p in params]]
+        return fast > slow, fast < slow
+    if strat_type == 'RSI':
+        periods = sorted({p['rsi_period'] for p in params})
+        rsi = cached_run(vbt.RSI, price, window=periods).rsi.to_numpy().reshape(len(price), -1)
+        rsi = rsi[:, [periods.index(p['rsi_period']) for p in params]]
+        return (rsi < np.array([p['rsi_oversold'] for p in params]),
+                rsi > np.array([p['rsi_overbought'] for p in params]))
+    if strat_type == 'Bollinger Bands':
+        bb = cached_run(vbt.BBANDS, price, window=[p['bb_period'] for p in params],
+                        alpha=[p['bb_std'] for p in params])
+        close = price.to_numpy()[:, None]
+        threshold = np.array([p['bb_exit_threshold'] for p in params])
+        lower = bb.lower.to_numpy().reshape(len(price), -1)
+        upper = bb.upper.to_numpy().reshape(len(price), -1)
+        return close < lower, close > upper * (1 + threshold)
+    raise ValueError(f"Unknown strategy type: {strat_type}")
+
+
+def evaluate_params(strat_type, param_sets, price, starts):
+    """Metrics per (param set, window), every pair a column of one portfolio over the given windows."""
+    entries, exits = strategy_signals(strat_type, param_sets, price)
+    pf = sample_portfolio(
+        price,
+        entries,
+        exits,
+        starts,
+        window,
+        sl_stop=[p.get('sl_stop', 0.05) for p in param_sets],
+        tp_stop=[p.get('tp_stop', 0.10) for p in param_sets],
+        init_cash=10000,
+        fees=0.001,
+        freq='4h'
+    )
+    return sample_metrics(pf)
+
+
+def evaluate_chunk(chunk, arrays, rngs):
+    """Metrics for a chunk of tasks; runs in a worker process.
+
+    The param sets and samples of each strategy in the chunk are evaluated
+    as the columns of one portfolio over the shared windows.
+    """
+    price = pd.Series(arrays['close'])
+    starts = arrays['starts']
+    metrics = [None] * len(chunk)
+    by_strategy = {}
+    for i, task in enumerate(chunk):
+        by_strategy.setdefault(task['strategy'], []).append(i)
+    for strat_type, rows in by_strategy.items():
+        params = list(dict.fromkeys(chunk[i]['params'] for i in rows))
+        samples = sorted({chunk[i]['sample'] for i in rows})
+        table = evaluate_params(strat_type, [json.loads(p) for p in params], price, starts[samples]).to_dict('index')
+        for i in rows:
+            metrics[i] = table[(params.index(chunk[i]['params']), samples.index(chunk[i]['sample']))]
+    return metrics
+
+
+def search_results(price, bh_return, budget):
+    """Successive halving over ``search_space``; rows shaped like the grid sweep's results."""
+    starts = draw_windows(len(price), window, search_samples, seed=42)
+    found = successive_halving(
+        lambda configs, windows: evaluate_params(search_strategy, configs, price, windows),
+        search_space, starts, budget, score=excess_return_score(bh_return),
+        constraint=lambda p: p['fast_ma'] < p['slow_ma'], seed=42
+    )
+    print(f"Successive halving: {found.backtests} backtests, {len(found.leaderboard)} configurations tried")
+    results = found.results
+    results_df = pd.DataFrame({
+        'strategy': search_strategy,
+        'params': found.leaderboard['params'].map(json.dumps).reindex(results['config']).to_numpy(),
+        'sample': results['sample'],
+    })
+    results_df['start'] = price.index[starts[results['sample']]]
+    return pd.concat([results_df, results.drop(columns=['config', 'sample'])], axis=1), search_samples
+
+
+def grid_results(price):
+    """Every (strategy, params, sample) task of ``grid`` through the process pool."""
+    # Use the same random windows for every parameter set, drawn once for reproducibility
+    starts = draw_windows(len(price), window, num_samples, seed=42)
+
+    # Results are keyed by data, code, params and window; only cells not in the store run on the pool
+    tasks = param_grid(grid)
+    dataset = dataset_version(price)
+    code = code_hash(strategy_signals, evaluate_params, sample_portfolio, sample_metrics)
+    keys = [result_key(dataset, code, t['strategy'], t['params'], starts[t['sample']], window) for t in tasks]
+    with ResultsStore('backtest_results.sqlite') as store:
+        results_df = cached_sweep(store, evaluate_chunk, tasks, keys,
+                                  {'close': price.to_numpy(dtype=float), 'starts': starts}, batched=True)
+    print(f"Backtests: {(~results_df['cached']).sum()} computed, {results_df['cached'].sum()} "
+          f"from backtest_results.sqlite")
+    for row in results_df[results_df['error'].notna()].itertuples():
+        print(f"Error with {row.strategy} {row.params}, sample {row.sample}: {row.error}")
+    results_df = results_df[results_df['error'].isna()].drop(columns=['task', 'cached', 'error', *RUN_COLUMNS])
+    results_df.insert(3, 'start', price.index[starts[results_df['sample']]])
+    return results_df, num_samples
+
+
+def walk_forward_report(price, bh_return, train, test, anchored):
+    """Re-pick the best param set on every train fold and trade it on the next test fold only."""
+    configs, entries, exits = [], [], []
+    for strategy in strategies:
+        signals = strategy_signals(strategy['type'], strategy['params'], price)
+        entries.append(signals[0])
+        exits.append(signals[1])
+        configs.extend({'strategy': strategy['type'], **p} for p in strategy['params'])
+    wf = walk_forward(
+        price,
+        np.hstack(entries),
+        np.hstack(exits),
+        configs,
+        train,
+        test,
+        anchored=anchored,
+        sl_stop=[c.get('sl_stop', 0.05) for c in configs],
+        tp_stop=[c.get('tp_stop', 0.10) for c in configs],
+        init_cash=10000,
+        fees=0.001,
+        freq='4h',
+        progress=True
+    )
+    folds = wf.folds.assign(params=wf.folds['params'].map(json.dumps))
+    oos_bh = price[wf.equity.index[-1]] / price[wf.equity.index[0]] - 1
+    print(folds[['fold', 'test_first', 'test_last', 'params', 'train_score', 'test_total_return']].to_string(index=False))
+    print(f"Walk-forward folds: {len(folds)} ({'anchored' if anchored else 'rolling'} {train}-candle train, "
+          f"{test}-candle test)")
+    print(f"Out-of-sample Return: {wf.equity.iloc[-1] / 10000 - 1:.2%} (BH over the same span: {oos_bh:.2%}, "
+          f"full series: {bh_return:.2%})")
+    print(f"Out-of-sample Drawdown: {(wf.equity / wf.equity.cummax() - 1).min():.2%}")
+    folds.to_csv('walk_forward_folds.csv', index=False)
+    wf.equity.to_csv('walk_forward_equity.csv')
+    print("Results saved to walk_forward_folds.csv and walk_forward_equity.csv")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--search', choices=['grid', 'halving'], default='grid',
+                        help="grid: every hand-picked param set; halving: successive halving over search_space")
+    parser.add_argument('--budget', type=int, default=3000, help="backtests allowed for --search halving")
+    parser.add_argument('--walk-forward', action='store_true',
+                        help="out-of-sample walk-forward over the hand-picked param sets instead of a sweep")
+    parser.add_argument('--train', type=int, default=train_bars, help="candles per walk-forward train fold")
+    parser.add_argument('--test', type=int, default=test_bars, help="candles per walk-forward test fold")
+    parser.add_argument('--anchored', action='store_true', help="train folds all start at the first candle")
+    args = parser.parse_args(argv)
+
+    data = load_data()
+    price = data['close']
+
+    # Buy and hold benchmark
+    bh_pf = vbt.Portfolio.from_holding(price, init_cash=10000, freq='4h')
+    bh_return = bh_pf.total_return()
+    bh_drawdown = bh_pf.max_drawdown()
+    print(f"Buy and Hold Return: {bh_return:.2%}")
+    print(f"Buy and Hold Drawdown: {bh_drawdown:.2%}")
+
+    if args.walk_forward:
+        walk_forward_report(price, bh_return, args.train, args.test, args.anchored)
+        return
+
+    if args.search == 'halving':
+        results_df, samples = search_results(price, bh_return, args.budget)
+    else:
+        results_df, samples = grid_results(price)
+
+    # Analyze results
+
+    # Group by strategy and params, average metrics
+    grouped = results_df.groupby(['strategy', 'params']).agg({
+        'total_return': 'mean',
+        'max_drawdown': 'mean',
+        'sharpe_ratio': 'mean',
+        'win_rate': 'mean',
+        'total_trades': 'mean',
+        'sample': 'count'
+    }).reset_index().rename(columns={'sample': 'samples'})
+    # Only configurations scored on every window compete (halving stops the rest early)
+    grouped = grouped[grouped['samples'] == samples].drop(columns='samples').reset_index(drop=True)
+
+    # Calculate score relative to buy and hold
+    grouped['excess_return'] = grouped['total_return'] - bh_return
+    grouped['score'] = (grouped['excess_return'] / (1 + grouped['max_drawdown'].abs())) * grouped['win_rate']
+
+    # Find best
+    best = grouped.loc[grouped['score'].idxmax()]
+    print(f"Best strategy: {best['strategy']}")
+    print(f"Best params: {best['params']}")
+    print(f"Avg Return: {best['total_return']:.2%} (BH: {bh_return:.2%})")
+    print(f"Avg Drawdown: {best['max_drawdown']:.2%} (BH: {bh_drawdown:.2%})")
+    print(f"Avg Win Rate: {best['win_rate']:.2%}")
+    print(f"Excess Return: {best['excess_return']:.2%}")
+    print(f"Score: {best['score']:.4f}")
+    print(f"Data range: {price.index.min()} to {price.index.max()}")
+
+    # Save to CSV
+    results_df.to_csv('backtest_results.csv', index=False)
+    grouped.to_csv('backtest_summary.csv', index=False)
+    print("Results saved to backtest_results.csv and backtest_summary.csv")
+
+    # Generate single HTML report for best
+    import json
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    best_params = json.loads(best['params'])
+    strat_type = best['strategy']
+
+    # Run on full data for plotting
+    if strat_type == 'SMA Crossover':
+        fast_ma = best_params['fast_ma']
+        slow_ma = best_params['slow_ma']
+        fast_ma_series = cached_run(vbt.MA, price, window=fast_ma)
+        slow_ma_series = cached_run(vbt.MA, price, window=slow_ma)
+        entries = fast_ma_series.ma_above(slow_ma_series)
+        exits = fast_ma_series.ma_below(slow_ma_series)
+
+    sl = best_params.get('sl_stop', 0.05)
+    tp = best_params.get('tp_stop', 0.05)
+
+    pf = vbt.Portfolio.from_signals(
+        price,
+        entries,
+        exits,
+        init_cash=10000,
+        fees=0.001,
+        sl_stop=sl,
+        tp_stop=tp,
+        freq='4h'
+    )
+
+    # Create subplots
+    fig = make_subplots(
+        rows=3, cols=1,
+        subplot_titles=('Portfolio Value', 'Drawdown', 'Trades'),
+        shared_xaxes=True
+    )
+
+    # Portfolio value
+    value_trace = go.Scatter(x=pf.value().index, y=pf.value().values, mode='lines', name='Portfolio Value')
+    fig.add_trace(value_trace, row=1, col=1)
+
+    # Drawdown
+    drawdown_trace = go.Scatter(x=pf.drawdown().index, y=pf.drawdown().values, mode='lines', name='Drawdown', fill='tozeroy')
+    fig.add_trace(drawdown_trace, row=2, col=1)
+
+    # Trades
+    trades_df = pf.trades.records_readable
+    if not trades_df.empty:
+        trades_trace = go.Scatter(x=trades_df.index, y=trades_df['Return'], mode='markers', name='Trades',
+                                  marker=dict(color=trades_df['Return'].apply(lambda x: 'green' if x > 0 else 'red')))
+        fig.add_trace(trades_trace, row=3, col=1)
+
+    # Add title with params
+    title = f"Best Strategy: {strat_type}<br>Params: {best['params']}<br>Return: {best['total_return']:.2%} (BH: {bh_return:.2%}), Drawdown: {best['max_drawdown']:.2%} (BH: {bh_drawdown:.2%}), Win Rate: {best['win_rate']:.2%}, Score: {best['score']:.4f}<br>Data: {price.index.min()} to {price.index.max()}"
+
+    fig.update_layout(title=title, height=900)
+
+    fig.write_html('backtest_report.html')
+    print("Report saved to backtest_report.html")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,186 +1,245 @@
+import argparse
+import os
+import sys
 import pandas as pd
 import vectorbt as vbt
 import numpy as np
 from datetime import datetime
 import json
-import random
 
 # Load data
-def load_data():
-    df = pd.read_csv('solana_4h_ohlc.csv')
-    df['datetime'] = pd.to_datetime(df['datetime'])
-    df.set_index('datetime', inplace=True)
-    return df
-
-data = load_data()
-price = data['close']
-
-# Use random subsets for robustness testing
-random.seed(42)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ohlcv_store import load_data  # memory-mapped columnar copy of solana_4h_ohlc.csv
+from indicators import RollingExtrema
+from param_search import excess_return_score, successive_halving
+from results_store import RUN_COLUMNS, ResultsStore, cached_sweep, code_hash, dataset_version, result_key
+from robustness import draw_windows, sample_metrics, sample_portfolio
+from sweep_runner import param_grid
 
 # Parameters to test
 channel_lengths = [20, 50, 100]
 trailing_pcts = [0.05, 0.1, 0.2]
 
-strategies = [
-    {
-        'type': 'Channel Breakout',
-        'params': [
-            {'channel_length': cl, 'trailing_pct': tp}
-            for cl in channel_lengths
-            for tp in trailing_pcts
-        ]
-    }
-]
-
-results = []
-
+strategy_name = 'Channel Breakout'
 num_samples = 10
-
-for strategy in strategies:
-    strat_type = strategy['type']
-    for param_set in strategy['params']:
-        for sample in range(num_samples):
-            try:
-                # Random subset: 500 candles
-                start_idx = random.randint(0, len(price) - 500)
-                sample_price = price.iloc[start_idx:start_idx + 500]
-
-                channel_length = param_set['channel_length']
-                trailing_pct = param_set['trailing_pct']
-
-                # Calculate channel
-                upper_channel = sample_price.rolling(window=channel_length).max().shift(1)
-                lower_channel = sample_price.rolling(window=channel_length).min().shift(1)
-
-                # Entry: break upper channel
-                entries = sample_price > upper_channel
-
-                # Exit: trailing stop
-                exits = pd.Series(False, index=sample_price.index)
-
-                # Create portfolio
-                pf = vbt.Portfolio.from_signals(
-                    sample_price,
-                    entries,
-                    exits,
-                    init_cash=10000,
-                    fees=0.001,
-                    sl_trail=trailing_pct,
-                    freq='4h'
-                )
-
-                # Collect metrics
-                result = {
-                    'strategy': strat_type,
-                    'params': json.dumps(param_set),
-                    'sample': sample,
-                    'total_return': pf.total_return(),
-                    'max_drawdown': pf.max_drawdown(),
-                    'sharpe_ratio': pf.sharpe_ratio(),
-                    'win_rate': pf.trades.win_rate(),
-                    'total_trades': len(pf.trades.records)
-                }
-                results.append(result)
-                print(f"Completed {strat_type} with params {param_set}, sample {sample}")
-
-            except Exception as e:
-                print(f"Error with {strat_type} {param_set}, sample {sample}: {e}")
-
-# Buy and hold benchmark
-bh_pf = vbt.Portfolio.from_holding(price, init_cash=10000, freq='4h')
-bh_return = bh_pf.total_return()
-bh_drawdown = bh_pf.max_drawdown()
-print(f"Buy and Hold Return: {bh_return:.2%}")
-print(f"Buy and Hold Drawdown: {bh_drawdown:.2%}")
-
-# Analyze results
-results_df = pd.DataFrame(results)
-
-# Group by strategy and params, average metrics
-grouped = results_df.groupby(['strategy', 'params']).agg({
-    'total_return': 'mean',
-    'max_drawdown': 'mean',
-    'sharpe_ratio': 'mean',
-    'win_rate': 'mean',
-    'total_trades': 'mean'
-}).reset_index()
-
-# Filter out params with no trades
-grouped = grouped[grouped['total_trades'] > 0]
-
-# Calculate score relative to buy and hold
-grouped['excess_return'] = grouped['total_return'] - bh_return
-grouped['score'] = (grouped['excess_return'] / (1 + grouped['max_drawdown'].abs())) * grouped['win_rate']
-
-# Find best
-best = grouped.loc[grouped['score'].idxmax()]
-print(f"Best strategy: {best['strategy']}")
-print(f"Best params: {best['params']}")
-print(f"Avg Return: {best['total_return']:.2%} (BH: {bh_return:.2%})")
-print(f"Avg Drawdown: {best['max_drawdown']:.2%} (BH: {bh_drawdown:.2%})")
-print(f"Avg Win Rate: {best['win_rate']:.2%}")
-print(f"Excess Return: {best['excess_return']:.2%}")
-print(f"Score: {best['score']:.4f}")
-print(f"Data range: {price.index.min()} to {price.index.max()}")
-
-# Save to CSV
-results_df.to_csv('channel_results.csv', index=False)
-grouped.to_csv('channel_summary.csv', index=False)
-print("Results saved to channel_results.csv and channel_summary.csv")
-
-# Generate single HTML report for best
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-
-best_params = json.loads(best['params'])
-strat_type = best['strategy']
-
-# Run on full data for plotting
-channel_length = best_params['channel_length']
-trailing_pct = best_params['trailing_pct']
-
-upper_channel = price.rolling(window=channel_length).max()
-lower_channel = price.rolling(window=channel_length).min()
-entries = price > upper_channel.shift(1)
-exits = pd.Series(False, index=price.index)
-
-pf = vbt.Portfolio.from_signals(
-    price,
-    entries,
-    exits,
-    init_cash=10000,
-    fees=0.001,
-    sl_trail=trailing_pct,
-    freq='4h'
-)
-
-# Create subplots
-fig = make_subplots(
-    rows=3, cols=1,
-    subplot_titles=('Portfolio Value', 'Drawdown', 'Trades'),
-    shared_xaxes=True
-)
-
-# Portfolio value
-value_trace = go.Scatter(x=pf.value().index, y=pf.value().values, mode='lines', name='Portfolio Value')
-fig.add_trace(value_trace, row=1, col=1)
-
-# Drawdown
-drawdown_trace = go.Scatter(x=pf.drawdown().index, y=pf.drawdown().values, mode='lines', name='Drawdown', fill='tozeroy')
-fig.add_trace(drawdown_trace, row=2, col=1)
-
-# Trades
-trades_df = pf.trades.records_readable
-if not trades_df.empty:
-    trades_trace = go.Scatter(x=trades_df.index, y=trades_df['Return'], mode='markers', name='Trades',
-                              marker=dict(color=trades_df['Return'].apply(lambda x: 'green' if x > 0 else 'red')))
-    fig.add_trace(trades_trace, row=3, col=1)
-
-# Add title with params
-title = f"Best Strategy: {strat_type}<br>Params: {best['params']}<br>Return: {best['total_return']:.2%} (BH: {bh_return:.2%}), Drawdown: {best['max_drawdown']:.2%} (BH: {bh_drawdown:.2%}), Win Rate: {best['win_rate']:.2%}, Score: {best['score']:.4f}<br>Data: {price.index.min()} to {price.index.max()}"
-
-fig.update_layout(title=title, height=900)
-
-fig.write_html('channel_report.html')
-print("Report saved to channel_report.html")
\ No newline at end of file
+grid = {
+    'channel_length': channel_lengths,
+    'trailing_pct': trailing_pcts,
+    'sample': range(num_samples),
+}
+
+sample_length = 500  # Random subset: 500 candles
+
+# --search halving: ranges instead of the hand-picked lists, searched within a backtest budget
+search_space = {'channel_length': (10, 200), 'trailing_pct': (0.02, 0.3)}
+search_samples = 27  # Windows the surviving configurations are scored on
+
+
+def run_channel_sample(params, arrays, rng):
+    """Backtest one (channel length, trailing %) pair on its sample's window; runs in a worker process."""
+    # Channels are views into the shared tables, not recomputed per task
+    channels = RollingExtrema.from_tables(arrays['channel_windows'], arrays['channel_max'], arrays['channel_min'])
+    start_idx = int(arrays['starts'][params['sample']])
+    config = {'channel_length': params['channel_length'], 'trailing_pct': params['trailing_pct']}
+    metrics = evaluate_channels([config], pd.Series(arrays['close']), [start_idx], channels)
+    return {'start': start_idx, **metrics.iloc[0].to_dict()}
+
+
+def evaluate_channels(configs, price, starts, channels=None):
+    """Metrics per (config, window), every pair a column of one portfolio over the given windows.
+
+    ``channels`` is a ``RollingExtrema`` of ``price`` covering every channel
+    length in ``configs``; by default one is computed for them.
+    """
+    if channels is None:
+        channels = RollingExtrema(price, sorted({c['channel_length'] for c in configs}))
+    close = price.to_numpy(dtype=float)
+
+    # Entry: break the upper channel over the previous channel_length bars
+    entries = np.column_stack([close > channels.max(c['channel_length'], shift=1) for c in configs])
+
+    # Exit: trailing stop only
+    pf = sample_portfolio(
+        price,
+        entries,
+        np.zeros_like(entries),
+        starts,
+        sample_length,
+        sl_stop=[c['trailing_pct'] for c in configs],
+        sl_trail=True,
+        init_cash=10000,
+        fees=0.001,
+        freq='4h'
+    )
+    return sample_metrics(pf)
+
+
+def search_results(price, bh_return, budget):
+    """Successive halving over ``search_space``; rows shaped like the grid sweep's results."""
+    starts = draw_windows(len(price), sample_length, search_samples, seed=42)
+    found = successive_halving(
+        lambda configs, windows: evaluate_channels(configs, price, windows),
+        search_space, starts, budget, score=excess_return_score(bh_return), seed=42
+    )
+    print(f"Successive halving: {found.backtests} backtests, {len(found.leaderboard)} configurations tried")
+    results = found.results
+    results_df = pd.DataFrame({
+        'strategy': strategy_name,
+        'params': found.leaderboard['params'].map(json.dumps).reindex(results['config']).to_numpy(),
+        'sample': results['sample'],
+    })
+    results_df['start'] = price.index[starts[results['sample']]]
+    return pd.concat([results_df, results.drop(columns=['config', 'sample'])], axis=1), search_samples
+
+
+def grid_results(price):
+    """Every (channel length, trailing %, sample) task of ``grid`` through the process pool."""
+    # Rolling max/min for every channel length, computed once on the full series and
+    # shared with the workers; samples take zero-copy slices of them
+    tables = RollingExtrema(price, channel_lengths).tables
+    # Sample windows are drawn once and shared by every param pair, so stored results stay valid as the grid grows
+    starts = draw_windows(len(price), sample_length, num_samples, seed=42)
+    arrays = {'close': price.to_numpy(dtype=float), 'starts': starts, 'channel_windows': tables['windows'],
+              'channel_max': tables['max'], 'channel_min': tables['min']}
+
+    # (param, sample) pairs missing from channel_results.sqlite run on the process pool
+    tasks = param_grid(grid)
+    dataset = dataset_version(price)
+    code = code_hash(run_channel_sample, evaluate_channels, RollingExtrema, sample_portfolio, sample_metrics)
+    keys = [result_key(dataset, code, strategy_name, {'channel_length': t['channel_length'],
+                                                      'trailing_pct': t['trailing_pct']},
+                       starts[t['sample']], sample_length) for t in tasks]
+    with ResultsStore('channel_results.sqlite') as store:
+        results_df = cached_sweep(store, run_channel_sample, tasks, keys, arrays)
+    print(f"Backtests: {(~results_df['cached']).sum()} computed, {results_df['cached'].sum()} "
+          f"from channel_results.sqlite")
+    for row in results_df[results_df['error'].notna()].itertuples():
+        print(f"Error with {strategy_name} channel_length={row.channel_length} "
+              f"trailing_pct={row.trailing_pct}, sample {row.sample}: {row.error}")
+    results_df = results_df[results_df['error'].isna()].drop(columns=['cached', *RUN_COLUMNS])
+    results_df.insert(0, 'strategy', strategy_name)
+    results_df.insert(1, 'params', [json.dumps({'channel_length': int(cl), 'trailing_pct': float(tp)})
+                                    for cl, tp in zip(results_df['channel_length'], results_df['trailing_pct'])])
+    results_df['start'] = price.index[results_df['start'].astype(int)]
+    return results_df.drop(columns=['task', 'channel_length', 'trailing_pct', 'error']), num_samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--search', choices=['grid', 'halving'], default='grid',
+                        help="grid: channel_lengths x trailing_pcts; halving: successive halving over search_space")
+    parser.add_argument('--budget', type=int, default=3000, help="backtests allowed for --search halving")
+    args = parser.parse_args(argv)
+
+    data = load_data()
+    price = data['close']
+
+    # Buy and hold benchmark
+    bh_pf = vbt.Portfolio.from_holding(price, init_cash=10000, freq='4h')
+    bh_return = bh_pf.total_return()
+    bh_drawdown = bh_pf.max_drawdown()
+    print(f"Buy and Hold Return: {bh_return:.2%}")
+    print(f"Buy and Hold Drawdown: {bh_drawdown:.2%}")
+
+    if args.search == 'halving':
+        results_df, samples = search_results(price, bh_return, args.budget)
+    else:
+        results_df, samples = grid_results(price)
+
+    # Analyze results
+    # Group by strategy and params, average metrics
+    grouped = results_df.groupby(['strategy', 'params']).agg({
+        'total_return': 'mean',
+        'max_drawdown': 'mean',
+        'sharpe_ratio': 'mean',
+        'win_rate': 'mean',
+        'total_trades': 'mean',
+        'sample': 'count'
+    }).reset_index().rename(columns={'sample': 'samples'})
+    # Only configurations scored on every window compete (halving stops the rest early)
+    grouped = grouped[grouped['samples'] == samples].drop(columns='samples').reset_index(drop=True)
+
+    # Filter out params with no trades
+    grouped = grouped[grouped['total_trades'] > 0]
+
+    # Calculate score relative to buy and hold
+    grouped['excess_return'] = grouped['total_return'] - bh_return
+    grouped['score'] = (grouped['excess_return'] / (1 + grouped['max_drawdown'].abs())) * grouped['win_rate']
+
+    # Find best
+    best = grouped.loc[grouped['score'].idxmax()]
+    print(f"Best strategy: {best['strategy']}")
+    print(f"Best params: {best['params']}")
+    print(f"Avg Return: {best['total_return']:.2%} (BH: {bh_return:.2%})")
+    print(f"Avg Drawdown: {best['max_drawdown']:.2%} (BH: {bh_drawdown:.2%})")
+    print(f"Avg Win Rate: {best['win_rate']:.2%}")
+    print(f"Excess Return: {best['excess_return']:.2%}")
+    print(f"Score: {best['score']:.4f}")
+    print(f"Data range: {price.index.min()} to {price.index.max()}")
+
+    # Save to CSV
+    results_df.to_csv('channel_results.csv', index=False)
+    grouped.to_csv('channel_summary.csv', index=False)
+    print("Results saved to channel_results.csv and channel_summary.csv")
+
+    # Generate single HTML report for best
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    best_params = json.loads(best['params'])
+    strat_type = best['strategy']
+
+    # Run on full data for plotting
+    channel_length = best_params['channel_length']
+    trailing_pct = best_params['trailing_pct']
+
+    channels = RollingExtrema(price, [channel_length])
+    upper_channel = channels.max(channel_length, shift=1)
+    lower_channel = channels.min(channel_length, shift=1)
+    entries = pd.Series(price.to_numpy() > upper_channel, index=price.index)
+    exits = pd.Series(False, index=price.index)
+
+    pf = vbt.Portfolio.from_signals(
+        price,
+        entries,
+        exits,
+        init_cash=10000,
+        fees=0.001,
+        sl_stop=trailing_pct,
+        sl_trail=True,
+        freq='4h'
+    )
+
+    # Create subplots
+    fig = make_subplots(
+        rows=3, cols=1,
+        subplot_titles=('Portfolio Value', 'Drawdown', 'Trades'),
+        shared_xaxes=True
+    )
+
+    # Portfolio value
+    value_trace = go.Scatter(x=pf.value().index, y=pf.value().values, mode='lines', name='Portfolio Value')
+    fig.add_trace(value_trace, row=1, col=1)
+
+    # Drawdown
+    drawdown_trace = go.Scatter(x=pf.drawdown().index, y=pf.drawdown().values, mode='lines', name='Drawdown', fill='tozeroy')
+    fig.add_trace(drawdown_trace, row=2, col=1)
+
+    # Trades
+    trades_df = pf.trades.records_readable
+    if not trades_df.empty:
+        trades_trace = go.Scatter(x=trades_df.index, y=trades_df['Return'], mode='markers', name='Trades',
+                                  marker=dict(color=trades_df['Return'].apply(lambda x: 'green' if x > 0 else 'red')))
+        fig.add_trace(trades_trace, row=3, col=1)
+
+    # Add title with params
+    title = f"Best Strategy: {strat_type}<br>Params: {best['params']}<br>Return: {best['total_return']:.2%} (BH: {bh_return:.2%}), Drawdown: {best['max_drawdown']:.2%} (BH: {bh_drawdown:.2%}), Win Rate: {best['win_rate']:.2%}, Score: {best['score']:.4f}<br>Data: {price.index.min()} to {price.index.max()}"
+
+    fig.update_layout(title=title, height=900)
+
+    fig.write_html('channel_report.html')
+    print("Report saved to channel_report.html")
+
+
+if __name__ == '__main__':
+    main()
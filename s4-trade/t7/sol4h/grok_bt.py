@@ -1,14 +1,19 @@
+import os
+import sys
 import streamlit as st
 import vectorbt as vbt
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
-# Load the data
+# Load the data (memory-mapped from the shared OHLCV store, no per-worker copy)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import ohlcv_store  # memory-mapped columnar copy of solana_4h_ohlc.csv
+from indicator_cache import cached_run  # memoized vbt indicator runs (set INDICATOR_CACHE_DIR to keep them on disk)
+
 @st.cache_data
 def load_data():
-    df = pd.read_csv('solana_4h_ohlc.csv', parse_dates=['timestamp'], index_col='timestamp')
-    return df
+    return ohlcv_store.load_data()
 
 data = load_data()
 close = data['close']
@@ -38,8 +43,8 @@ if strategy == 'Moving Average Crossover':
 
     # Run manual backtest
     if st.button('Run Backtest'):
-        fast_ma = vbt.MA.run(close, window=fast_period)
-        slow_ma = vbt.MA.run(close, window=slow_period)
+        fast_ma = cached_run(vbt.MA, close, window=fast_period)
+        slow_ma = cached_run(vbt.MA, close, window=slow_period)
         entries = fast_ma.ma_crossed_above(slow_ma)
         exits = fast_ma.ma_crossed_below(slow_ma)
         
@@ -113,7 +118,7 @@ elif strategy == 'RSI Mean Reversion':
 
     # Run manual backtest
     if st.button('Run Backtest'):
-        rsi = vbt.RSI.run(close, window=rsi_period)
+        rsi = cached_run(vbt.RSI, close, window=rsi_period)
         entries = rsi.rsi_crossed_below(rsi_lower)
         exits = rsi.rsi_crossed_above(rsi_upper)
         
@@ -156,7 +161,7 @@ elif strategy == 'RSI Mean Reversion':
         lowers = list(np.arange(lower_min, lower_max + 1, lower_step))      # Convert to list
         uppers = list(np.arange(upper_min, upper_max + 1, upper_step))      # Convert to list   
              
-        rsi_ind = vbt.RSI.run(close, window=periods)
+        rsi_ind = cached_run(vbt.RSI, close, window=periods)
         param_product = vbt.ParamProduct([lowers, uppers], keys=['lower', 'upper'])
         
         entries = rsi_ind.rsi_crossed_below(param_product.lower).vbt.broadcast_to(rsi_ind.rsi)
@@ -182,7 +187,7 @@ elif strategy == 'Bollinger Bands':
 
     # Run manual backtest
     if st.button('Run Backtest'):
-        bb = vbt.BBANDS.run(close, window=bb_period, alpha=bb_std)
+        bb = cached_run(vbt.BBANDS, close, window=bb_period, alpha=bb_std)
         entries = close.vbt.crossed_below(bb.lower)
         exits = close.vbt.crossed_above(bb.upper)
         
@@ -220,7 +225,7 @@ elif strategy == 'Bollinger Bands':
         periods = list(np.arange(period_min, period_max + 1, period_step))  # Convert to list
         stds = list(np.arange(std_min, std_max + std_step, std_step))      # Convert to list       
          
-        bb = vbt.BBANDS.run(close, window=periods, alpha=stds)
+        bb = cached_run(vbt.BBANDS, close, window=periods, alpha=stds)
         entries = close.vbt.crossed_below(bb.lower)
         exits = close.vbt.crossed_above(bb.upper)
         
@@ -1,3 +1,5 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
 import vectorbt as vbt
@@ -12,13 +14,14 @@ st.set_page_config(page_title="Solana Backtesting Dashboard", layout="wide")
 st.title("🚀 Solana 4H Backtesting Dashboard")
 st.markdown("Backtesting trading strategies on Solana OHLC data using VectorBT")
 
-# Load data
+# Load data (memory-mapped from the shared OHLCV store, no per-worker copy)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import ohlcv_store  # memory-mapped columnar copy of solana_4h_ohlc.csv
+from indicator_cache import cached_run  # memoized vbt indicator runs (set INDICATOR_CACHE_DIR to keep them on disk)
+
 @st.cache_data
 def load_data():
-    df = pd.read_csv('solana_4h_ohlc.csv')
-    df['datetime'] = pd.to_datetime(df['datetime'])
-    df.set_index('datetime', inplace=True)
-    return df
+    return ohlcv_store.load_data()
 
 try:
     data = load_data()
@@ -108,25 +111,25 @@ try:
 
                 # Define strategy
                 if strategy_type == "SMA Crossover":
-                    fast_ma_series = vbt.MA.run(price, window=fast_ma)
-                    slow_ma_series = vbt.MA.run(price, window=slow_ma)
+                    fast_ma_series = cached_run(vbt.MA, price, window=fast_ma)
+                    slow_ma_series = cached_run(vbt.MA, price, window=slow_ma)
 
                     # Generate signals
                     entries = fast_ma_series.ma_above(slow_ma_series)
                     exits = fast_ma_series.ma_below(slow_ma_series)
 
                 elif strategy_type == "RSI":
-                    rsi_indicator = vbt.RSI.run(price, window=rsi_period)
+                    rsi_indicator = cached_run(vbt.RSI, price, window=rsi_period)
                     entries = rsi_indicator.rsi_below(rsi_oversold)
                     exits = rsi_indicator.rsi_above(rsi_overbought)
 
                 elif strategy_type == "Bollinger Bands":
-                    bb_indicator = vbt.BBANDS.run(price, window=bb_period, nbdevup=bb_std, nbdevdn=bb_std)
+                    bb_indicator = cached_run(vbt.BBANDS, price, window=bb_period, alpha=bb_std)
                     entries = price < bb_indicator.lower
                     exits = price > bb_indicator.upper * (1 + bb_exit_threshold)
 
                 elif strategy_type == "MACD":
-                    macd_indicator = vbt.MACD.run(price, fast_window=macd_fast, slow_window=macd_slow, signal_window=macd_signal)
+                    macd_indicator = cached_run(vbt.MACD, price, fast_window=macd_fast, slow_window=macd_slow, signal_window=macd_signal)
                     entries = macd_indicator.histogram_above(0)
                     exits = macd_indicator.histogram_below(macd_exit_threshold)
 
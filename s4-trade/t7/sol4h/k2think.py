@@ -1,11 +1,15 @@
+import os
+import sys
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import vectorbt as vbt
 import openai
 import traceback
 from streamlit.components.v1 import html
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from yf_candles import load_yf_candles  # cached, resampled from stored 1h candles
+
 st.set_page_config(page_title="Solana OHLCV Chat App", layout="wide")
 
 # Initialize session state variables
@@ -80,7 +84,7 @@ if st.session_state.params_hash != current_params_hash:
 # Fetch and process OHLCV data
 ticker = "SOL-USD"
 try:
-    raw_data = yf.Ticker(ticker).history(interval="4h", start=start_ts, end=end_ts)
+    raw_data = load_yf_candles(ticker, "4h", start=start_ts, end=end_ts)
     if raw_data.empty:
         st.error(f"No data found for {ticker} between {start_date} and {end_date}")
     else:
@@ -1,3 +1,5 @@
+import os
+import sys
 import pandas as pd
 import vectorbt as vbt
 import numpy as np
@@ -6,18 +8,25 @@ import matplotlib.pyplot as plt
 # --------------------------
 # Helper Functions: Cross Detection
 # --------------------------
+def _previous(x):
+    return x.shift(1) if isinstance(x, pd.Series) else x  # scalar levels (e.g. RSI 30) do not move
+
 def cross_above(a, b):
     """Returns True when 'a' crosses above 'b' (current a > b, previous a <= previous b)."""
-    return (a > b) & (a.shift(1) <= b.shift(1))
+    return (a > b) & (_previous(a) <= _previous(b))
 
 def cross_below(a, b):
     """Returns True when 'a' crosses below 'b' (current a < b, previous a >= previous b)."""
-    return (a < b) & (a.shift(1) >= b.shift(1))
+    return (a < b) & (_previous(a) >= _previous(b))
 
 # --------------------------
 # Load Data
 # --------------------------
-data = pd.read_csv('solana_4h_ohlc.csv', parse_dates=['datetime'], index_col='datetime')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ohlcv_store import load_data  # memory-mapped columnar copy of solana_4h_ohlc.csv
+from indicator_cache import cached_run  # memoized vbt indicator runs (set INDICATOR_CACHE_DIR to keep them on disk)
+from indicators import bollinger_bands, day_sessions, obv, session_vwap
+data = load_data()
 close = data['close'].astype(float)  # Ensure numeric
 high = data['high'].astype(float)
 low = data['low'].astype(float)
@@ -27,9 +36,9 @@ volume = data['volume'].astype(float)
 # Strategy 1: EMA 50/200 Crossover
 # --------------------------
 def ma_crossover_strategy(close):
-    # Compute EMA using .ma() accessor with ma_type='ema'
-    ema50 = close.vbt.ma(window=50, ma_type='ema')
-    ema200 = close.vbt.ma(window=200, ma_type='ema')
+    # Compute EMA with vbt.MA (ewm=True)
+    ema50 = cached_run(vbt.MA, close, window=50, ewm=True).ma
+    ema200 = cached_run(vbt.MA, close, window=200, ewm=True).ma
     entries = cross_above(ema50, ema200)
     exits = cross_below(ema50, ema200)
     return entries.astype(bool), exits.astype(bool)
@@ -38,7 +47,7 @@ def ma_crossover_strategy(close):
 # Strategy 2: RSI Mean Reversion (RSI 14)
 # --------------------------
 def rsi_mean_reversion_strategy(close):
-    rsi = close.vbt.rsi(window=14)  # RSI via accessor
+    rsi = cached_run(vbt.RSI, close, window=14).rsi
     entries = cross_below(rsi, 30)
     exits = cross_above(rsi, 70)
     return entries.astype(bool), exits.astype(bool)
@@ -47,14 +56,11 @@ def rsi_mean_reversion_strategy(close):
 # Strategy 3: Bollinger Bands Squeeze
 # --------------------------
 def bollinger_squeeze_strategy(close):
-    # Compute SMA using .ma() accessor with ma_type='sma'
-    sma20 = close.vbt.ma(window=20, ma_type='sma')
-    std20 = close.rolling(window=20).std()
-    upper_band = sma20 + 2 * std20
-    lower_band = sma20 - 2 * std20
+    sma20, upper_band, lower_band = (pd.Series(band, index=close.index)
+                                     for band in bollinger_bands(close, window=20, k=2))
     band_width = (upper_band - lower_band) / sma20  # Normalized width
     squeeze = band_width < 0.02  # Squeeze condition
-    squeeze_ended = (~squeeze) & squeeze.shift(1)  # Squeeze just ended
+    squeeze_ended = (~squeeze) & squeeze.shift(1, fill_value=False)  # Squeeze just ended
     entries = squeeze_ended & cross_above(close, upper_band)
     exits = cross_below(close, sma20)
     return entries.astype(bool), exits.astype(bool)
@@ -63,8 +69,9 @@ def bollinger_squeeze_strategy(close):
 # Strategy 4: MACD Momentum
 # --------------------------
 def macd_momentum_strategy(close):
-    # MACD via accessor (returns macd_line, signal_line, hist)
-    macd_line, signal_line, _ = close.vbt.macd(fast=12, slow=26, signal=9)
+    # MACD with exponential averages, as the classic 12/26/9 definition
+    macd = cached_run(vbt.MACD, close, fast_window=12, slow_window=26, signal_window=9, macd_ewm=True, signal_ewm=True)
+    macd_line, signal_line = macd.macd, macd.signal
     entries = cross_above(macd_line, signal_line)
     exits = cross_below(macd_line, signal_line)
     return entries.astype(bool), exits.astype(bool)
@@ -73,18 +80,16 @@ def macd_momentum_strategy(close):
 # Strategy 5: VWAP Breakout (Daily)
 # --------------------------
 def vwap_breakout_strategy(close, high, low, volume):
-    typical_price = (high + low + close) / 3
-    # Compute daily VWAP
-    daily_vwap = typical_price.groupby(typical_price.index.date).apply(
-        lambda x: (x * volume.loc[x.index]).sum() / x.sum()
-    ).rename('daily_vwap').reindex(typical_price.index, method='ffill')  # Align with 4h data
+    # Daily VWAP, anchored at each day's first bar
+    daily_vwap = pd.Series(session_vwap(high, low, close, volume, day_sessions(close.index)),
+                           index=close.index, name='daily_vwap')
     
     # Daily average volume
     daily_avg_vol = volume.groupby(volume.index.date).transform('mean').rename('daily_avg_vol')
     
     # Entries: Close > VWAP and volume > daily avg (first entry per day)
     entries = (close > daily_vwap) & (volume > daily_avg_vol)
-    entries = entries & (~entries.shift(1))  # Avoid duplicate entries
+    entries = entries & (~entries.shift(1, fill_value=False))  # Avoid duplicate entries
     
     # Exits: Close < VWAP
     exits = close < daily_vwap
@@ -95,20 +100,14 @@ def vwap_breakout_strategy(close, high, low, volume):
 # --------------------------
 def obv_volume_strategy(close, volume):
     # Compute OBV (On-Balance Volume)
-    obv = pd.Series(0, index=close.index, name='obv')
-    obv.iloc[0] = 0
-    for i in range(1, len(close)):
-        if close.iloc[i] > close.iloc[i-1]:
-            obv.iloc[i] = obv.iloc[i-1] + volume.iloc[i]
-        else:
-            obv.iloc[i] = obv.iloc[i-1] - volume.iloc[i]
+    obv_line = pd.Series(obv(close, volume), index=close.index, name='obv')
     
-    # Compute OBV SMA using .ma() accessor
-    obv_sma = obv.vbt.ma(window=20, ma_type='sma')
+    # Compute OBV SMA
+    obv_sma = cached_run(vbt.MA, obv_line, window=20).ma
     
     # Entries/Exits: OBV crosses above/below SMA
-    entries = cross_above(obv, obv_sma)
-    exits = cross_below(obv, obv_sma)
+    entries = cross_above(obv_line, obv_sma)
+    exits = cross_below(obv_line, obv_sma)
     return entries.astype(bool), exits.astype(bool)
 
 # --------------------------
@@ -1,69 +1,40 @@
-import requests
+import os
+import sys
 from datetime import datetime, timedelta
-import time
-import csv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ohlcv_store import OHLCVStore
+from kline_sync import sync_klines
+from kline_download import KlineDownloader
+from candle_gaps import GapIndex
 
 # Configuration
 symbol = "SOLUSDT"  # Trading pair (Solana/USD); adjust for other pairs (e.g., SOLBTC)
 interval = "4h"    # Candlestick interval (4 hours)
-limit = 1000       # Max entries per request (Binance limit)
-days_back = 5 * 365  # Approx 5 years in days
+days_back = 5 * 365  # Approx 5 years in days (only used for the first, full download)
 
 # Calculate timestamps (milliseconds)
-end_time = int(datetime.now().timestamp() * 1000)
 start_time = int((datetime.now() - timedelta(days=days_back)).timestamp() * 1000)
 
-# Fetch data in chunks
-all_klines = []
-while True:
-    # Construct API URL
-    url = f"https://api.binance.com/api/v3/klines?symbol={symbol}&interval={interval}&startTime={start_time}&limit={limit}&endTime={end_time}"
-    
-    # Make request with delay to avoid rate limits
-    response = requests.get(url)
-    time.sleep(0.5)  # Adjust based on API rate limits (Binance allows 1200 requests/min)
-    
-    if response.status_code != 200:
-        print(f"Error fetching data: Status code {response.status_code}")
-        break
-    
-    klines = response.json()
-    if not klines:
-        print("No more data available.")
-        break
-    
-    all_klines.extend(klines)
-    
-    # Update start_time to the last fetched kline's open time + interval (4h in ms)
-    last_open_time = klines[-1][0]
-    start_time = last_open_time + (4 * 60 * 60 * 1000)
-    
-    # Check if we've reached the end time
-    if start_time >= end_time:
-        break
+# Sync: only candles newer than the last stored one are requested. The first
+# run backfills from start_time with concurrent, weight-paced requests; later
+# runs usually need a single request.
+store = OHLCVStore()
+if not store.exists('binance', symbol, interval) and os.path.exists('solana_4h_ohlc.csv'):
+    store.import_csv('solana_4h_ohlc.csv', 'binance', symbol, interval)  # Seed from the existing export
+stats = sync_klines(store, symbol, interval, start_time, downloader=KlineDownloader())
+print(f"Synced {symbol} {interval}: {stats['candles']} candles in {stats['requests']} request(s), {stats['rows']} stored")
 
-# Process and save to CSV
-ohlcvs = []
-for kline in all_klines:
-    timestamp = kline[0]
-    dt = datetime.utcfromtimestamp(timestamp / 1000).strftime('%Y-%m-%d %H:%M:%S')
-    ohlcv = {
-        "timestamp": timestamp,
-        "datetime": dt,
-        "open": kline[1],
-        "high": kline[2],
-        "low": kline[3],
-        "close": kline[4],
-        "volume": kline[5]
-    }
-    ohlcvs.append(ohlcv)
+# Re-fetch only the holes (exchange outages, interrupted runs) instead of assuming contiguous data
+gap_index = GapIndex(store)
+if len(gap_index.scan('binance', symbol, interval)):
+    print(f"Gap repair: {gap_index.repair_sync('binance', symbol, interval)}")
 
-# Write to CSV
-with open('solana_4h_ohlc.csv', 'w', newline='') as csvfile:
-    fieldnames = ["timestamp", "datetime", "open", "high", "low", "close", "volume"]
-    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-    writer.writeheader()
-    for row in ohlcvs:
-        writer.writerow(row)
+# Export to CSV for tools that still read the flat file
+df = store.load('binance', symbol, interval)
+df = df.reset_index()
+df['datetime'] = df['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
+df = df[["timestamp", "datetime", "open", "high", "low", "close", "volume"]]
+df.to_csv('solana_4h_ohlc.csv', index=False, float_format='%.8f')
 
-print(f"Successfully saved {len(ohlcvs)} 4-hour OHLCV entries to solana_4h_ohlc.csv")
+print(f"Successfully saved {len(df)} 4-hour OHLCV entries to solana_4h_ohlc.csv")
@@ -0,0 +1,74 @@
+"""Take-profit x risk/reward sweeps as a single vectorbt simulation.
+
+app3 used to call ``vbt.Portfolio.from_signals`` once per (TP, RR) pair in
+nested loops and summarize each portfolio separately. ``run_stop_sweep``
+broadcasts ``tp_stop``/``sl_stop`` across a ``(tp_pct, rr)`` column index so
+the whole grid is one simulation, and ``sweep_summary`` derives every
+column's statistics from the combined trade records with one groupby.
+
+    from stop_sweep import run_stop_sweep, sweep_summary
+    pf = run_stop_sweep(df['Close'], long_entries, short_entries, tp_pct=[1, 2, 3], rr=[1, 1.5, 2], freq='1h')
+    summary, trades = sweep_summary(pf, df['High'], df['Low'])
+"""
+import numpy as np
+import pandas as pd
+import vectorbt as vbt
+
+from trade_analytics import trade_excursions
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+def stop_grid(tp_pct, rr):
+    """Column index of every (tp_pct, rr) pair, TP-major."""
+    return pd.MultiIndex.from_product([np.asarray(tp_pct, dtype=float), np.asarray(rr, dtype=float)],
+                                      names=['tp_pct', 'rr'])
+
+
+def run_stop_sweep(close, entries, short_entries, tp_pct, rr, init_cash=10000, **kwargs):
+    """One portfolio with a column per (TP %, RR); the SL % of a column is ``tp_pct / rr``."""
+    columns = stop_grid(tp_pct, rr)
+    tp = columns.get_level_values('tp_pct').to_numpy()
+    sl = tp / columns.get_level_values('rr').to_numpy()
+    return vbt.Portfolio.from_signals(
+        close=close,
+        entries=entries,
+        short_entries=short_entries,
+        tp_stop=(tp / 100)[None],
+        sl_stop=(sl / 100)[None],
+        init_cash=init_cash,
+        accumulate=False,
+        broadcast_kwargs=dict(columns_from=columns),
+        **kwargs
+    )
+
+
+def sweep_summary(pf, high, low):
+    """Per-column results table and the trade records (with excursions) of a sweep portfolio.
+
+    The table is indexed like ``pf.wrapper.columns`` and holds the SL, win
+    rate, annualized return, MAE statistics of winners and losers and the
+    trade count. Statistics of columns without trades (or without winners or
+    losers) are NaN; the win rate of a column without trades is 0.
+    """
+    columns = pf.wrapper.columns
+    trades = pf.trades.records.copy()
+    for name, values in trade_excursions(high, low, trades['entry_idx'], trades['exit_idx'],
+                                         trades['entry_price'], trades['direction']).items():
+        trades[name] = values
+
+    summary = pd.DataFrame(index=columns)
+    summary['sl_pct'] = columns.get_level_values('tp_pct') / columns.get_level_values('rr')
+    summary['win_rate'] = pf.trades.win_rate().fillna(0).to_numpy() * 100
+    index = pf.wrapper.index
+    years = (index[-1] - index[0]).total_seconds() / SECONDS_PER_YEAR
+    total_return = pf.total_return().to_numpy()
+    summary['ann_return'] = ((1 + total_return) ** (1 / years) - 1) * 100 if years > 0 else 0.0
+
+    position = np.arange(len(columns))
+    for label, mask in (('winners', trades['return'] > 0), ('losers', trades['return'] <= 0)):
+        stats = trades.loc[mask].groupby('col')['mae'].agg(['mean', 'min', 'max', 'std']).reindex(position)
+        for stat in stats:
+            summary[f'{stat}_mae_{label}'] = stats[stat].to_numpy()
+    summary['trades'] = np.bincount(trades['col'], minlength=len(columns))
+    return summary, trades
@@ -0,0 +1,238 @@
+"""Process-pool parameter sweeps over shared price arrays.
+
+The sol4h sweep scripts ran every (strategy, params, sample) combination
+serially and printed a line per run. ``run_sweep`` expands a declarative
+grid into tasks, hands chunks of tasks to a process pool and streams each
+finished chunk into a Parquet file (one row group per chunk), with a tqdm
+progress bar and ETA.
+
+Price arrays are copied once into ``multiprocessing.shared_memory`` blocks;
+workers attach to them at start-up, so only parameter dicts are pickled per
+chunk. Every task gets its own generator seeded from ``(seed, task index)``,
+so results do not depend on worker count, chunking or completion order.
+
+The task function must be importable by the workers (module level, and
+scripts need an ``if __name__ == '__main__':`` guard). It is called as
+``func(params, arrays, rng)`` and returns a dict of scalar metrics, or with
+``batched=True`` as ``func(param_list, arrays, rngs)`` returning one dict per
+parameter set, so a chunk can run as one vectorized backtest.
+
+    from sweep_runner import run_sweep
+    results = run_sweep(evaluate, {'window': [10, 20, 50], 'sample': range(100)},
+                        {'close': close}, out='results.parquet', workers=8)
+"""
+import itertools
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from tqdm import tqdm
+
+CHUNKS_PER_WORKER = 8
+
+# Arrays visible to task functions in this process (set by the pool initializer)
+_ARRAYS = {}
+_BLOCKS = []
+
+
+def param_grid(grid):
+    """Expand a grid into a list of parameter dicts.
+
+    ``grid`` is a dict of name -> values (Cartesian product, first name
+    varying slowest; scalar values are fixed) or a list of such dicts whose
+    expansions are concatenated. List, tuple, range and array values are
+    always expanded, so only dicts of scalars pass through unchanged; give
+    ``run_sweep`` an already expanded task list with ``expanded=True``.
+    """
+    params = []
+    for spec in ([grid] if isinstance(grid, dict) else grid):
+        names = list(spec)
+        values = [v if isinstance(v, (list, tuple, range, np.ndarray)) else [v] for v in spec.values()]
+        params.extend(dict(zip(names, combo)) for combo in itertools.product(*values))
+    return params
+
+
+def task_rng(seed, task):
+    """Generator for task number ``task`` of a sweep seeded with ``seed``."""
+    return np.random.default_rng([seed, task])
+
+
+class SharedArrays:
+    """Named arrays copied into shared memory; unlinked when closed."""
+
+    def __init__(self, arrays):
+        self.spec = {}
+        self._blocks = []
+        try:
+            for name, values in arrays.items():
+                values = np.ascontiguousarray(values)
+                block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                self._blocks.append(block)
+                np.ndarray(values.shape, values.dtype, buffer=block.buf)[...] = values
+                self.spec[name] = (block.name, values.shape, values.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(spec):
+    """Read-only views of a ``SharedArrays.spec`` plus the blocks that must stay referenced.
+
+    Pool workers share the parent's resource tracker whatever the start
+    method, so attaching does not hand ownership of the blocks to them.
+    """
+    arrays, blocks = {}, []
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        view = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+        view.flags.writeable = False
+        arrays[name] = view
+    return arrays, blocks
+
+
+def _read_only(values):
+    view = np.asarray(values).view()
+    view.flags.writeable = False
+    return view
+
+
+def _init_worker(spec):
+    arrays, blocks = attach(spec)
+    _ARRAYS.clear()
+    _ARRAYS.update(arrays)
+    _BLOCKS[:] = blocks
+
+
+def _run_chunk(func, seed, batched, first, chunk):
+    """Rows (task, params, metrics, error) for tasks ``first..first + len(chunk)``."""
+    tasks = range(first, first + len(chunk))
+    rngs = [task_rng(seed, task) for task in tasks]
+    if batched:
+        try:
+            outcomes = [(metrics, None) for metrics in func(chunk, _ARRAYS, rngs)]
+        except Exception as e:
+            outcomes = [({}, repr(e))] * len(chunk)
+    else:
+        outcomes = []
+        for params, rng in zip(chunk, rngs):
+            try:
+                outcomes.append((func(params, _ARRAYS, rng), None))
+            except Exception as e:
+                outcomes.append(({}, repr(e)))
+    return [{'task': task, **params, **metrics, 'error': error}
+            for task, params, (metrics, error) in zip(tasks, chunk, outcomes)]
+
+
+class _ParquetStream:
+    """Appends row batches to a Parquet file; the schema comes from the first batch with a successful row."""
+
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+        self.pending = []
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self.tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        os.close(fd)
+
+    def write(self, rows, final=False):
+        self.pending.extend(rows)
+        if not self.pending or (self.writer is None and not final
+                                and all(row['error'] is not None for row in self.pending)):
+            return
+        frame = pd.DataFrame(self.pending)
+        self.pending = []
+        if self.writer is None:
+            schema = pa.Schema.from_pandas(frame, preserve_index=False)
+            schema = schema.set(schema.get_field_index('error'), pa.field('error', pa.string()))
+            self.writer = pq.ParquetWriter(self.tmp, schema)
+        schema = self.writer.schema
+        frame = frame.reindex(columns=schema.names)
+        self.writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+
+    def close(self):
+        self.write([], final=True)
+        if self.writer is not None:
+            self.writer.close()
+            os.replace(self.tmp, self.path)
+        else:
+            os.remove(self.tmp)
+
+    def abort(self):
+        if self.writer is not None:
+            self.writer.close()
+        os.remove(self.tmp)
+
+
+def run_sweep(func, grid, arrays, out=None, workers=None, chunk_size=None, seed=0, batched=False,
+              progress=True, mp_context=None, on_rows=None, expanded=False):
+    """Run ``func`` over every parameter set of ``grid``; returns the results ordered by task.
+
+    Each row holds the task index, the parameters, the returned metrics and
+    ``error`` (the exception repr if the task raised, else None). With
+    ``out`` the rows are also streamed to a Parquet file as chunks finish,
+    and ``on_rows(rows)`` is called in this process with each finished
+    chunk's rows. ``workers=1`` runs in-process without shared memory. Task
+    functions always see read-only arrays. With ``expanded=True`` ``grid`` is
+    taken as the list of parameter dicts itself, one task each, so tuple or
+    list parameter values are not expanded again.
+    """
+    params = list(grid) if expanded else param_grid(grid)
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, math.ceil(len(params) / (workers * CHUNKS_PER_WORKER)))
+    chunks = [(first, params[first:first + chunk_size]) for first in range(0, len(params), chunk_size)]
+    stream = _ParquetStream(out) if out else None
+    rows = []
+
+    def collect(chunk_rows, bar):
+        rows.extend(chunk_rows)
+        if stream:
+            stream.write(chunk_rows)
+        if on_rows:
+            on_rows(chunk_rows)
+        bar.update(len(chunk_rows))
+
+    try:
+        with tqdm(total=len(params), unit='run', disable=not progress, smoothing=0.1) as bar:
+            if workers == 1:
+                saved = dict(_ARRAYS)
+                _ARRAYS.clear()
+                _ARRAYS.update({name: _read_only(values) for name, values in arrays.items()})
+                try:
+                    for first, chunk in chunks:
+                        collect(_run_chunk(func, seed, batched, first, chunk), bar)
+                finally:
+                    _ARRAYS.clear()
+                    _ARRAYS.update(saved)
+            else:
+                with SharedArrays(arrays) as shared, ProcessPoolExecutor(
+                        workers, mp_context=mp_context, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+                    futures = [pool.submit(_run_chunk, func, seed, batched, first, chunk) for first, chunk in chunks]
+                    for future in as_completed(futures):
+                        collect(future.result(), bar)
+    except BaseException:
+        if stream:
+            stream.abort()
+        raise
+    if stream:
+        stream.close()
+    return pd.DataFrame(rows).sort_values('task', ignore_index=True) if rows else pd.DataFrame()
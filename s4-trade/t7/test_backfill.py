@@ -0,0 +1,63 @@
+import asyncio
+
+from backfill import run_backfill
+from ohlcv_store import OHLCVStore
+
+H = 60 * 60 * 1000
+
+
+class FakeDownloader:
+    """Hourly candles from ``listed`` onwards; can fail once at a given start."""
+
+    def __init__(self, listed=0, fail_at=None):
+        self.listed = listed
+        self.fail_at = fail_at
+        self.stats = {'requests': 0}
+        self.fetched = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def first_open_time(self, symbol, interval, start_time):
+        self.stats['requests'] += 1
+        return max(start_time, self.listed)
+
+    async def fetch(self, symbol, interval, start_time, end_time):
+        self.stats['requests'] += 1
+        if start_time == self.fail_at:
+            self.fail_at = None
+            raise RuntimeError("banned")
+        self.fetched.append((symbol, start_time))
+        first = max(start_time, self.listed)
+        return [[t, 1, 2, 0.5, 1.5, 10] for t in range(first, end_time, H)]
+
+
+def test_backfill_resumes_from_checkpoint(tmp_path):
+    store = OHLCVStore(tmp_path)
+    downloader = FakeDownloader(fail_at=20 * H)
+    progress = asyncio.run(run_backfill(['SOLUSDT', 'BTCUSDT'], ['1h'], 0, 50 * H, store=store,
+                                        workers=2, downloader=downloader, chunk_candles=10))
+    assert progress.errors == 1
+    failed = [k for k in store.keys() if len(store.matrix(*k)) < 50]
+    assert len(failed) == 1
+
+    downloader.fetched.clear()
+    progress = asyncio.run(run_backfill(['SOLUSDT', 'BTCUSDT'], ['1h'], 0, 50 * H, store=store,
+                                        workers=2, downloader=downloader, chunk_candles=10))
+    assert progress.errors == 0
+    # Only the failed job's remaining chunks are fetched again
+    assert downloader.fetched == [(failed[0][1], t * H) for t in (20, 30, 40)]
+    for key in store.keys():
+        assert store.timestamps(*key).tolist() == [i * H for i in range(50)]
+
+
+def test_backfill_skips_range_before_listing(tmp_path):
+    store = OHLCVStore(tmp_path)
+    downloader = FakeDownloader(listed=35 * H)
+    asyncio.run(run_backfill(['NEWUSDT'], ['1h'], 0, 50 * H, store=store,
+                             downloader=downloader, chunk_candles=10))
+    assert [start for _, start in downloader.fetched] == [35 * H, 45 * H]
+    assert len(store.matrix('binance', 'NEWUSDT', '1h')) == 15
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from candle_gaps import GapIndex, find_gaps
+from ohlcv_store import OHLCVStore
+
+H = 60 * 60 * 1000
+
+
+def store_with(tmp_path, opens):
+    store = OHLCVStore(tmp_path)
+    opens = np.asarray(opens, dtype=np.int64)
+    ones = np.ones(len(opens))
+    store.write('binance', 'SOLUSDT', '1h', {'timestamp': opens, 'open': ones, 'high': ones,
+                                             'low': ones, 'close': ones, 'volume': ones})
+    return store
+
+
+def test_find_gaps_returns_missing_ranges():
+    ts = np.array([0, 1, 2, 5, 6, 9]) * H
+    gaps = find_gaps(ts, H, start=-2 * H, end=12 * H)
+    assert gaps.tolist() == [[-2 * H, 0], [3 * H, 5 * H], [7 * H, 9 * H], [10 * H, 12 * H]]
+
+
+def minute_opens_with_holes():
+    ts = np.arange(5_000_000, dtype=np.int64) * 60_000
+    return np.delete(ts, [10, 11, 4_000_000])
+
+
+def test_find_gaps_on_millions_of_candles():
+    gaps = find_gaps(minute_opens_with_holes(), 60_000)
+    assert gaps.tolist() == [[10 * 60_000, 12 * 60_000], [4_000_000 * 60_000, 4_000_001 * 60_000]]
+
+
+@pytest.mark.benchmark
+def test_find_gaps_scans_millions_quickly():
+    ts = minute_opens_with_holes()
+    started = time.perf_counter()
+    find_gaps(ts, 60_000)
+    assert time.perf_counter() - started < 0.5
+
+
+class OutageDownloader:
+    """Returns candles for every requested hour except those in ``outage``."""
+
+    def __init__(self, outage=()):
+        self.outage = set(outage)
+        self.calls = []
+
+    async def fetch(self, symbol, interval, start_time, end_time):
+        self.calls.append((start_time, end_time))
+        return [[t, 1, 1, 1, 1, 1] for t in range(start_time, end_time, H) if t // H not in self.outage]
+
+
+def test_repair_refetches_only_gaps_and_remembers_outages(tmp_path):
+    store = store_with(tmp_path, np.array([0, 1, 4, 5, 8]) * H)
+    index = GapIndex(store)
+    downloader = OutageDownloader(outage={6, 7})
+    stats = asyncio.run(index.repair(downloader, 'binance', 'SOLUSDT', '1h'))
+
+    assert downloader.calls == [(2 * H, 4 * H), (6 * H, 8 * H)]
+    assert stats == {'filled': 2, 'requested': 2, 'empty': 1}
+    assert store.timestamps('binance', 'SOLUSDT', '1h').tolist() == [i * H for i in (0, 1, 2, 3, 4, 5, 8)]
+    # The outage is reported but no longer scheduled for re-fetch
+    assert len(index.scan('binance', 'SOLUSDT', '1h')) == 0
+    report = GapIndex(store).coverage_report()
+    assert report.loc[0, 'missing'] == 2 and report.loc[0, 'known_outages'] == 1
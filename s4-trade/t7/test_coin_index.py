@@ -0,0 +1,92 @@
+import time
+
+import pytest
+import requests
+
+from coin_index import CoinIndex
+
+COINS = [
+    {'id': 'solana', 'symbol': 'sol', 'name': 'Solana'},
+    {'id': 'wrapped-solana', 'symbol': 'sol', 'name': 'Wrapped SOL'},
+    {'id': 'sol-token-scam', 'symbol': 'sol', 'name': 'SOL Token'},
+    {'id': 'ethereum', 'symbol': 'eth', 'name': 'Ethereum'},
+    {'id': 'pudgy-penguins', 'symbol': 'pengu', 'name': 'Pudgy Penguins'},
+]
+MARKETS = [{'id': 'ethereum', 'market_cap_rank': 2}, {'id': 'solana', 'market_cap_rank': 5},
+           {'id': 'wrapped-solana', 'market_cap_rank': 90}]
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        if url.endswith('/coins/list'):
+            return FakeResponse(COINS)
+        return FakeResponse(MARKETS if params['page'] == 1 else [])
+
+
+def test_resolves_by_symbol_name_rank_and_fuzzy_name(tmp_path):
+    session = FakeSession()
+    index = CoinIndex(str(tmp_path / 'index.json'), session=session)
+    assert index.resolve('Solana', 'SOL') == 'solana'
+    assert index.resolve('Wrapped SOL', 'SOL') == 'wrapped-solana'
+    assert index.resolve('Unknown name', 'SOL') == 'solana'  # highest market cap wins
+    assert index.resolve('Pudgy Penguin', '') == 'pudgy-penguins'
+    assert index.resolve('Nothing like it', 'XYZ') is None
+    calls = session.calls
+
+    ids = index.resolve_many([('Ethereum', 'ETH'), ('Solana', 'SOL')] * 1000)
+    assert ids == ['ethereum', 'solana'] * 1000
+    assert session.calls == calls
+
+
+@pytest.mark.benchmark
+def test_resolving_a_table_is_local_and_fast(tmp_path):
+    index = CoinIndex(str(tmp_path / 'index.json'), session=FakeSession())
+    index.resolve('Solana', 'SOL')
+    started = time.perf_counter()
+    index.resolve_many([('Ethereum', 'ETH'), ('Solana', 'SOL')] * 1000)
+    assert time.perf_counter() - started < 0.1
+
+
+def test_index_is_reused_from_disk_and_refreshed_in_background(tmp_path):
+    path = str(tmp_path / 'index.json')
+    CoinIndex(path, session=FakeSession()).refresh()
+
+    session = FakeSession()
+    index = CoinIndex(path, ttl=3600, session=session)
+    assert index.resolve('Ethereum', 'ETH') == 'ethereum'
+    assert session.calls == 0
+
+    index.ttl = 0
+    thread = index.refresh_in_background()
+    thread.join()
+    assert session.calls > 0 and index.resolve('Solana', 'SOL') == 'solana'
+
+
+class IndexDownSession:
+    """/coins/list is rate limited; /search answers except for one query."""
+
+    def get(self, url, params=None, timeout=None):
+        if not url.endswith('/search') or params['query'] == 'Broken BRK':
+            raise requests.HTTPError('429 Too Many Requests')
+        return FakeResponse({'coins': [{'id': 'solana'}] if 'Solana' in params['query'] else []})
+
+
+def test_rows_fall_back_to_search_when_the_index_cannot_be_built(tmp_path):
+    index = CoinIndex(str(tmp_path / 'index.json'), session=IndexDownSession())
+    ids = index.resolve_many([('Solana', 'SOL'), ('Broken', 'BRK'), ('Nothing', 'XYZ'), (float('nan'), 'X')])
+    assert ids == ['solana', None, None, None]
@@ -0,0 +1,99 @@
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+
+from coingecko_history import CoinGeckoHistory, daily_ohlcv, history_days, merge_ohlcv, ohlc_days
+from ohlcv_store import OHLCVStore
+
+D = 86_400_000
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Serves 4-day candles ending now with daily 24h volumes, and hourly ``market_chart/range`` samples."""
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, params))
+        if self.fail:
+            raise requests.ConnectionError("offline")
+        if url.endswith('/range'):
+            hours = np.arange(params['from'] // 3600 + 1, params['to'] // 3600 + 1) * 3_600_000
+            return FakeResponse({'prices': [[int(t), hourly_price(t)] for t in hours],
+                                 'total_volumes': [[int(t), 24.0] for t in hours]})
+        now = (int(time.time() * 1000) // D) * D
+        closes = now - np.arange(30)[::-1] * 4 * D
+        if url.endswith('/ohlc'):
+            return FakeResponse([[int(t), 1.0, 3.0, 0.5, 2.0] for t in closes])
+        days = now - np.arange(120)[::-1] * D
+        return FakeResponse({'prices': [], 'total_volumes': [[int(t), 10.0] for t in days]})
+
+
+def hourly_price(t):
+    return 100.0 + (t // 3_600_000) % 24  # Rises through each UTC day
+
+
+def test_ohlc_days_snaps_to_supported_values():
+    assert [ohlc_days(d) for d in (1, 3, 30, 31, 365, 730, 'max')] == [1, 7, 30, 90, 365, 'max', 'max']
+
+
+def test_merge_ohlcv_uses_open_times_and_scales_volume():
+    ohlc = [[4 * D, 1, 3, 0.5, 2], [8 * D, 2, 4, 1.5, 3], [8 * D, 2, 4, 1.5, 3]]
+    volumes = [[t * D, 10.0] for t in range(1, 9)] + [[20 * D, 99.0]]
+    m = merge_ohlcv(ohlc, volumes)
+    assert m[:, 0].tolist() == [0, 4 * D]
+    np.testing.assert_array_equal(m[:, 1:5], [[1, 3, 0.5, 2], [2, 4, 1.5, 3]])
+    # Four daily samples of 10/day inside each 4-day candle
+    np.testing.assert_allclose(m[:, 5], [40.0, 40.0])
+
+
+def test_daily_ohlcv_aggregates_samples_per_utc_day():
+    hours = np.arange(48) * 3_600_000
+    prices = [[t, hourly_price(t)] for t in hours] + [[0, 100.0]]
+    m = daily_ohlcv(prices, [[t, 10.0 + t // D] for t in hours])
+    np.testing.assert_array_equal(m, [[0, 100, 123, 100, 123, 10], [D, 100, 123, 100, 123, 11]])
+
+
+def test_long_histories_keep_daily_candles(tmp_path):
+    assert [history_days(d) for d in (7, 30, 31, 365, 730, 'max')] == [7, 30, 90, 450, 810, 'max']
+    session = FakeSession()
+    df = CoinGeckoHistory(OHLCVStore(tmp_path), session=session).ohlcv('solana', days=365)
+    assert [url.rsplit('/', 1)[1] for url, _ in session.calls] == ['range'] * 5
+    assert len(df) in (365, 366) and (df.index.to_series().diff().dropna() == pd.Timedelta(days=1)).all()
+    full_days = df.iloc[1:-1]
+    assert (full_days['open'] == 100).all() and (full_days['close'] == 123).all()
+    assert (full_days['high'] == 123).all() and (full_days['low'] == 100).all()
+    assert (full_days['volume'] == 24).all()
+
+
+def test_history_is_cached_on_disk_and_served_stale_when_offline(tmp_path):
+    session = FakeSession()
+    history = CoinGeckoHistory(OHLCVStore(tmp_path), ttl=3600, session=session)
+    df = history.ohlcv('solana', days=30)
+    assert len(session.calls) == 2
+    assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert (df['high'] > df['close']).all() and (df['low'] < df['close']).all()
+    assert df.index[0] >= pd.Timestamp.now(tz='UTC').tz_localize(None) - pd.Timedelta(days=31)
+
+    # A fresh instance (another process) reuses the same files
+    again = CoinGeckoHistory(OHLCVStore(tmp_path), ttl=3600, session=session).ohlcv('solana', days=20)
+    assert len(session.calls) == 2 and 0 < len(again) <= len(df)
+
+    session.fail = True
+    stale = CoinGeckoHistory(OHLCVStore(tmp_path), ttl=0, session=session).ohlcv('solana', days=30)
+    assert len(stale) == len(df)
@@ -0,0 +1,168 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import vectorbt as vbt
+
+from grid_engine import grid_level_orders, grid_level_portfolio, grid_signal_matrix, grid_signals
+
+
+def reference_grid_signals(close, grid_levels, num_grids, tp_pct, sl_pct):
+    """The original per-bar loop from app5.run_grid_backtest."""
+    entries = pd.Series(False, index=close.index)
+    exits = pd.Series(False, index=close.index)
+    position_entries = []
+    for i in range(1, len(close)):
+        price = close.iloc[i]
+        prev_price = close.iloc[i-1]
+        for level in grid_levels:
+            if len(position_entries) < num_grids and prev_price >= level > price:
+                entries.iloc[i] = True
+                position_entries.append(level)
+                break
+        new_active = []
+        for entry_price in position_entries:
+            tp_price = entry_price * (1 + tp_pct)
+            sl_price = entry_price * (1 - sl_pct)
+            if price >= tp_price or price <= sl_price:
+                exits.iloc[i] = True
+            else:
+                new_active.append(entry_price)
+        position_entries = new_active
+    return entries, exits
+
+
+def random_close(n, seed, vol=0.02):
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, vol, n))),
+                     index=pd.date_range('2020-01-01', periods=n, freq='h'))
+
+
+@pytest.mark.parametrize('seed,num_grids,spacing,tp,sl', [
+    (0, 5, 0.02, 0.05, 0.03),
+    (1, 3, 0.005, 0.01, 0.01),
+    (2, 20, 0.01, 0.2, 0.2),
+    (3, 8, 0.03, 0.001, 0.5),
+])
+def test_kernel_matches_original_loop(seed, num_grids, spacing, tp, sl):
+    close = random_close(2000, seed)
+    mean = close.mean()
+    levels = np.linspace(mean * (1 - spacing), mean * (1 + spacing * (num_grids - 1)), num_grids)
+    expected_entries, expected_exits = reference_grid_signals(close, levels, num_grids, tp, sl)
+    entries, exits = grid_signals(close.to_numpy(), levels, num_grids, tp, sl)
+    assert expected_entries.any() and expected_exits.any()
+    np.testing.assert_array_equal(entries, expected_entries.to_numpy())
+    np.testing.assert_array_equal(exits, expected_exits.to_numpy())
+
+
+@pytest.mark.benchmark
+def test_kernel_is_100x_faster_on_100k_bars():
+    close = random_close(100_000, seed=4, vol=0.005)
+    mean = close.mean()
+    levels = np.linspace(mean * 0.98, mean * (1 + 0.02 * 4), 5)
+    grid_signals(close.to_numpy()[:100], levels, 5, 0.05, 0.03)  # compile
+
+    started = time.perf_counter()
+    grid_signals(close.to_numpy(), levels, 5, 0.05, 0.03)
+    kernel = time.perf_counter() - started
+
+    # The original loop is linear in bars; time a 10k slice and scale up
+    started = time.perf_counter()
+    reference_grid_signals(close.iloc[:10_000], levels, 5, 0.05, 0.03)
+    reference = (time.perf_counter() - started) * 10
+    assert reference / kernel > 100
+
+
+def reference_level_orders(close, levels, tp_pct, sl_pct, level_value):
+    """Per-level bookkeeping of the grid/qwen.py loop, keeping each level's size."""
+    size = np.full((len(close), len(levels)), np.nan)
+    held = [0.0] * len(levels)
+    for i, px in enumerate(close):
+        for j, lvl in enumerate(levels):
+            if not held[j] and px <= lvl:
+                held[j] = level_value / px
+                size[i, j] = held[j]
+            elif held[j] and (px >= lvl * (1 + tp_pct) or px <= lvl * (1 - sl_pct)):
+                size[i, j] = -held[j]
+                held[j] = 0.0
+    return size
+
+
+def test_level_orders_match_reference_and_keep_positions_independent():
+    close = random_close(3000, seed=5)
+    levels = np.linspace(close.iloc[0] * 0.8, close.iloc[0] * 1.2, 10)
+    sizes = grid_level_orders(close.to_numpy(), levels, 0.02, 0.03, 1000.0)
+    np.testing.assert_allclose(sizes, reference_level_orders(close.to_numpy(), levels, 0.02, 0.03, 1000.0))
+
+    pf = vbt.Portfolio.from_orders(close, size=pd.DataFrame(sizes, index=close.index), size_type='amount',
+                                   init_cash=1e6, cash_sharing=True, group_by=True)
+    # Several levels are in the market at once, each trade closed at its own level's TP/SL
+    assert (pf.assets() > 0).sum(axis=1).max() > 1
+    assert pf.trades.closed.count().sum() == np.sum(sizes < 0)
+
+
+def test_cash_limited_entries_never_exit_into_a_short():
+    close = pd.Series([100.0, 95.0, 90.0, 85.0, 100.0, 110.0], index=pd.date_range('2024-01-01', periods=6, freq='h'))
+    levels = np.array([96.0, 91.0, 86.0])
+    # Cash for one and a half levels: the second entry fills partly, the third not at all
+    pf = grid_level_portfolio(close, levels, 0.1, 0.5, 1000.0, init_cash=1500.0)
+    assets = pf.assets()
+    assert (assets.iloc[2:4] > 0).sum(axis=1).tolist() == [2, 2]
+    assert (assets >= 0).all().all() and (assets.iloc[-1] == 0).all()
+    assert list(assets.columns) == [0, 1, 2] and assets.columns.name == 'grid_level'
+
+
+@pytest.mark.benchmark
+def test_level_orders_run_20_levels_over_a_year_of_minutes_quickly():
+    close = random_close(525_600, seed=6, vol=0.001).to_numpy()
+    levels = np.linspace(close[0] * 0.8, close[0] * 1.2, 20)
+    grid_level_orders(close[:100], levels, 0.02, 0.03, 500.0)  # compile
+    started = time.perf_counter()
+    grid_level_orders(close, levels, 0.02, 0.03, 500.0)
+    assert time.perf_counter() - started < 1.0
+
+
+def reference_signal_columns(price, high, low, grid_levels, grid_spacing, tp_pct, sl_pct):
+    """The original column-by-column build from grid/zai-glm.run_grid_strategy."""
+    start_price = price.iloc[0]
+    grid_prices = [start_price * (1 + grid_spacing * i) for i in range(-grid_levels, grid_levels + 1)]
+    entries = pd.DataFrame(index=price.index, columns=range(len(grid_prices)))
+    exits = pd.DataFrame(index=price.index, columns=range(len(grid_prices)))
+    for i, grid_price in enumerate(grid_prices):
+        entries[i] = (price <= grid_price) & (price.shift(1) > grid_price)
+        exits[i] = (high >= grid_price * (1 + tp_pct)) | (low <= grid_price * (1 - sl_pct))
+    return entries.astype(bool).to_numpy(), exits.astype(bool).to_numpy()
+
+
+def test_signal_matrix_matches_per_column_build_for_many_configs():
+    close = random_close(1500, seed=7, vol=0.005)
+    high, low = close * 1.002, close * 0.998
+    configs = [(2, 0.01, 0.005, 0.01), (5, 0.003, 0.01, 0.02), (1, 0.02, 0.02, 0.005)]
+    entries, exits, columns = grid_signal_matrix(close.to_numpy(), high.to_numpy(), low.to_numpy(), close.iloc[0],
+                                                 *zip(*configs))
+    assert entries.dtype == bool and entries.shape == (1500, 5 + 11 + 3)
+    assert columns.get_level_values('level').tolist()[:5] == [-2, -1, 0, 1, 2]
+    col = 0
+    for config in configs:
+        expected_entries, expected_exits = reference_signal_columns(close, high, low, *config)
+        width = expected_entries.shape[1]
+        np.testing.assert_array_equal(entries[:, col:col + width], expected_entries)
+        np.testing.assert_array_equal(exits[:, col:col + width], expected_exits)
+        col += width
+    assert expected_entries.any() and expected_exits.any()
+
+
+def test_signal_matrix_feeds_one_batched_simulation():
+    close = random_close(1000, seed=8, vol=0.005)
+    levels, spacing, tp, sl = np.meshgrid([2, 4], [0.005, 0.01, 0.02], [0.005, 0.01], [0.01, 0.02], indexing='ij')
+    entries, exits, columns = grid_signal_matrix(close.to_numpy(), close.to_numpy(), close.to_numpy(), close.iloc[0],
+                                                 levels, spacing, tp, sl)
+    pf = vbt.Portfolio.from_signals(close, pd.DataFrame(entries, close.index, columns),
+                                    pd.DataFrame(exits, close.index, columns), size=100.0, size_type='value',
+                                    init_cash=1000.0, cash_sharing=True,
+                                    group_by=['grid_levels', 'grid_spacing', 'tp_pct', 'sl_pct'])
+    returns = pf.total_return()
+    assert len(returns) == levels.size
+    assert returns.index.names == ['grid_levels', 'grid_spacing', 'tp_pct', 'sl_pct']
+    assert (pf.trades.count() > 0).any()
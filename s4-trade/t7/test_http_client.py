@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_client import HttpClient, TokenBucket
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    """/data answers with an ETag and honours If-None-Match; /flaky fails first."""
+
+    hits = []
+    failures = 0
+    version = 1
+
+    def do_GET(self):
+        StubAPI.hits.append((self.path, self.headers.get('If-None-Match')))
+        if self.path.startswith('/flaky') and StubAPI.failures:
+            StubAPI.failures -= 1
+            self.send_response(503 if StubAPI.failures % 2 else 429)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+        etag = f'"v{StubAPI.version}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps({'version': StubAPI.version, 'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    StubAPI.hits = []
+    StubAPI.failures = 0
+    StubAPI.version = 1
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubAPI)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def make_client(tmp_path, ttl):
+    return HttpClient(cache_dir=str(tmp_path), host_limits={'127.0.0.1': (1000.0, 100)},
+                      cache_ttls=[('127.0.0.1', r'/data', ttl)], max_retries=3)
+
+
+def test_responses_are_cached_across_clients_and_revalidated_with_etag(stub_url, tmp_path):
+    client = make_client(tmp_path, ttl=60)
+    first = client.get(stub_url + '/data', params={'q': 1})
+    assert first.json() == {'version': 1, 'path': '/data?q=1'}
+    # A second client (another process) is served from disk
+    again = make_client(tmp_path, ttl=60).get(stub_url + '/data', params={'q': 1})
+    assert again.json() == first.json() and again.from_cache
+    assert len(StubAPI.hits) == 1
+
+    # Expired entry: conditional request, 304 renews the cached body
+    expired = make_client(tmp_path, ttl=1e-9)
+    assert expired.get(stub_url + '/data', params={'q': 1}).json()['version'] == 1
+    assert StubAPI.hits[-1] == ('/data?q=1', '"v1"') and expired.stats['revalidated'] == 1
+
+    # Changed upstream: a full 200 replaces the entry
+    StubAPI.version = 2
+    assert expired.get(stub_url + '/data', params={'q': 1}).json()['version'] == 2
+
+    # Endpoints without a TTL rule are never cached
+    client.get(stub_url + '/other')
+    client.get(stub_url + '/other')
+    assert [p for p, _ in StubAPI.hits].count('/other') == 2
+
+
+def test_cache_is_pruned_by_age_and_size(stub_url, tmp_path):
+    client = HttpClient(cache_dir=str(tmp_path), host_limits={'127.0.0.1': (1000.0, 100)},
+                        cache_ttls=[('127.0.0.1', r'/data', 60)], cache_max_age=3600)
+    entries = {}
+    for q in range(5):
+        client.get(stub_url + '/data', params={'q': q})
+        entries[q] = next(p for p in tmp_path.rglob('*.json') if p not in entries.values())
+        # Entry 0 is two hours old, the others a few minutes, newest last
+        age = 7200 if q == 0 else 60 * (5 - q)
+        os.utime(entries[q], (time.time() - age, time.time() - age))
+
+    client.prune_cache()
+    assert not entries[0].exists() and all(entries[q].exists() for q in range(1, 5))
+
+    # Over the byte budget: the least recently renewed go first
+    client.cache_max_bytes = entries[3].stat().st_size + entries[4].stat().st_size
+    client.prune_cache()
+    assert [q for q in range(5) if entries[q].exists()] == [3, 4]
+    assert client.get(stub_url + '/data', params={'q': 0}).json()['path'] == '/data?q=0'
+
+
+def test_retries_rate_limits_and_server_errors(stub_url, tmp_path, monkeypatch):
+    monkeypatch.setattr('http_client.backoff', lambda attempt: 0.0)
+    StubAPI.failures = 3
+    client = make_client(tmp_path, ttl=0)
+    response = client.get(stub_url + '/flaky')
+    assert response.status_code == 200
+    assert client.stats['retries'] == 3 and len(StubAPI.hits) == 4
+
+    StubAPI.failures = 10
+    assert client.get(stub_url + '/flaky').status_code in (429, 503)
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    bucket = TokenBucket(rate=50.0, burst=5)
+    started = time.monotonic()
+    for _ in range(15):
+        bucket.acquire()
+    # 5 free, then 10 at 50/s
+    assert 0.15 < time.monotonic() - started < 0.5
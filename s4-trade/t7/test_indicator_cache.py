@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pandas as pd
+import vectorbt as vbt
+
+from indicator_cache import IndicatorCache, data_hash
+
+
+def random_close(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))),
+                     index=pd.date_range('2021-01-01', periods=n, freq='4h'), name='close')
+
+
+def test_hash_follows_content_not_identity():
+    close = random_close(1000, 0)
+    assert data_hash(close) == data_hash(close.copy())
+    changed = close.copy()
+    changed.iloc[500] += 1e-9
+    assert data_hash(changed) != data_hash(close)
+    assert data_hash(close.set_axis(close.index + pd.Timedelta('1h'))) != data_hash(close)
+    assert data_hash(close.rename('open')) != data_hash(close)
+    assert data_hash(close.to_numpy()) != data_hash(close)
+
+
+def test_hits_return_the_computed_result():
+    close = random_close(2000, 1)
+    cache = IndicatorCache()
+    for indicator, params in ((vbt.MA, dict(window=[10, 20])), (vbt.RSI, dict(window=14)),
+                              (vbt.BBANDS, dict(window=20, alpha=2.0)),
+                              (vbt.MACD, dict(fast_window=12, slow_window=26, signal_window=9))):
+        first = cache.run(indicator, close, **params)
+        assert cache.run(indicator, close.copy(), **params) is first
+        for name in indicator.output_names:
+            np.testing.assert_array_equal(getattr(first, name), getattr(indicator.run(close, **params), name))
+    assert (cache.hits, cache.misses) == (4, 4)
+
+    # Same windows as a NumPy array hit; other params or data miss
+    cache.run(vbt.MA, close, window=np.array([10, 20]))
+    cache.run(vbt.MA, close, window=[10, 20], ewm=True)
+    cache.run(vbt.MA, random_close(2000, 2), window=[10, 20])
+    assert (cache.hits, cache.misses) == (5, 6)
+
+
+def test_lru_evicts_least_recently_used():
+    close = random_close(500, 3)
+    cache = IndicatorCache(maxsize=2)
+    cache.run(vbt.MA, close, window=5)
+    cache.run(vbt.MA, close, window=10)
+    cache.run(vbt.MA, close, window=5)    # refresh 5
+    cache.run(vbt.MA, close, window=20)   # evicts 10
+    assert len(cache) == 2
+    cache.run(vbt.MA, close, window=5)
+    cache.run(vbt.MA, close, window=10)
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_disk_tier_serves_a_new_process(tmp_path):
+    close = random_close(3000, 4)
+    IndicatorCache(directory=str(tmp_path)).run(vbt.BBANDS, close, window=[20, 30], alpha=2.0)
+    assert len(os.listdir(tmp_path)) == 1
+
+    fresh = IndicatorCache(directory=str(tmp_path))
+    bb = fresh.run(vbt.BBANDS, close, window=[20, 30], alpha=2.0)
+    assert (fresh.disk_hits, fresh.misses) == (1, 0)
+    pd.testing.assert_frame_equal(bb.upper, vbt.BBANDS.run(close, window=[20, 30], alpha=2.0).upper)
+    assert bb.close_crossed_above(bb.upper).any().all()
+
+    # A corrupt file is recomputed and rewritten
+    path = os.path.join(tmp_path, os.listdir(tmp_path)[0])
+    with open(path, 'wb') as f:
+        f.write(b'not a pickle')
+    broken = IndicatorCache(directory=str(tmp_path))
+    broken.run(vbt.BBANDS, close, window=[20, 30], alpha=2.0)
+    assert broken.misses == 1
+    assert IndicatorCache(directory=str(tmp_path)).run(vbt.BBANDS, close, window=[20, 30], alpha=2.0) is not None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
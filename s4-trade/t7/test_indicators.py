@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import (RollingExtrema, band_width, bollinger_bands, day_sessions, obv, rolling_max, rolling_min,
+                        session_vwap)
+
+
+def reference_obv(close, volume):
+    """The original per-bar loop from sol4h/k2think_bt.obv_volume_strategy."""
+    out = pd.Series(0.0, index=close.index)
+    for i in range(1, len(close)):
+        if close.iloc[i] > close.iloc[i-1]:
+            out.iloc[i] = out.iloc[i-1] + volume.iloc[i]
+        else:
+            out.iloc[i] = out.iloc[i-1] - volume.iloc[i]
+    return out
+
+
+def random_ohlcv(n, seed, freq='4h'):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    close[5:8] = close[4]  # flat closes count as down bars
+    spread = close * rng.uniform(0, 0.01, n)
+    index = pd.date_range('2021-03-01 02:00', periods=n, freq=freq)
+    return pd.DataFrame({'high': close + spread, 'low': close - spread, 'close': close,
+                         'volume': rng.uniform(10, 1000, n)}, index=index)
+
+
+def test_obv_matches_original_loop():
+    df = random_ohlcv(2000, 0)
+    np.testing.assert_array_equal(obv(df['close'], df['volume']), reference_obv(df['close'], df['volume']).to_numpy())
+
+
+def test_session_vwap_restarts_every_day_without_look_ahead():
+    df = random_ohlcv(500, 1, freq='3h')
+    vwap = session_vwap(df['high'], df['low'], df['close'], df['volume'], day_sessions(df.index))
+    typical = (df['high'] + df['low'] + df['close']) / 3
+    day = df.index.date
+    expected = (typical * df['volume']).groupby(day).cumsum() / df['volume'].groupby(day).cumsum()
+    np.testing.assert_allclose(vwap, expected.to_numpy(), rtol=1e-12)
+    # First bar of each day is that bar's typical price
+    first = ~pd.Series(day).duplicated().to_numpy()
+    np.testing.assert_allclose(vwap[first], typical.to_numpy()[first])
+
+
+@pytest.mark.parametrize('window', [1, 3, 20, 250])
+def test_rolling_extrema_match_pandas(window):
+    x = random_ohlcv(3000, 2)['close']
+    x.iloc[100:140] = x.iloc[100]  # ties
+    np.testing.assert_array_equal(rolling_max(x, window), x.rolling(window).max().to_numpy())
+    np.testing.assert_array_equal(rolling_min(x, window), x.rolling(window).min().to_numpy())
+
+
+def test_rolling_extrema_cache_serves_every_length_as_views():
+    x = random_ohlcv(5000, 5)['close']
+    channels = RollingExtrema(x, [100, 20, 50, 20])
+    assert channels.windows == (20, 50, 100)
+    for window in channels.windows:
+        np.testing.assert_array_equal(channels.max(window), x.rolling(window).max().to_numpy())
+        np.testing.assert_array_equal(channels.min(window), x.rolling(window).min().to_numpy())
+        # A sample's previous-bar channel, as rolling(...).shift(1) on the full series
+        upper = channels.max(window, 1200, 1700, shift=1)
+        np.testing.assert_array_equal(upper, x.rolling(window).max().shift(1).to_numpy()[1200:1700])
+        assert upper.base is not None and np.shares_memory(upper, channels.max(window))
+    np.testing.assert_array_equal(channels.min(20, 0, 30, shift=1), x.rolling(20).min().shift(1).to_numpy()[:30])
+
+
+def test_bollinger_bands_and_width_match_pandas():
+    close = random_ohlcv(100_000, 3)['close']
+    sma, std = close.rolling(20).mean(), close.rolling(20).std()
+    middle, upper, lower = bollinger_bands(close, 20, 2)
+    np.testing.assert_allclose(middle, sma.to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(upper, (sma + 2 * std).to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(band_width(close, 20, 2), (4 * std / sma).to_numpy(), rtol=1e-7)
+
+
+@pytest.mark.benchmark
+def test_indicators_on_a_million_bars_are_fast():
+    df = random_ohlcv(1_000_000, 4, freq='min')
+    for f in (lambda: obv(df['close'], df['volume']), lambda: rolling_max(df['high'], 50),
+              lambda: session_vwap(df['high'], df['low'], df['close'], df['volume'], day_sessions(df.index)),
+              lambda: band_width(df['close'])):
+        f()  # compile
+        started = time.perf_counter()
+        f()
+        assert time.perf_counter() - started < 0.5
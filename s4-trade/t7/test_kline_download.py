@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from kline_download import KlineDownloader, WeightBucket, split_windows
+
+H = 60 * 60 * 1000
+
+
+class StubBinance(BaseHTTPRequestHandler):
+    """Minimal /api/v3/klines: one candle per hour, weight header, optional 429s."""
+
+    requests = []
+    rate_limited = 0
+
+    def do_GET(self):
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        for key in ('startTime', 'endTime', 'limit'):
+            query[key] = int(query[key])
+        StubBinance.requests.append(query)
+        if StubBinance.rate_limited:
+            StubBinance.rate_limited -= 1
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+        first = -(-query['startTime'] // H) * H
+        opens = range(first, query['endTime'] + 1, H)
+        body = json.dumps([[t, "1", "2", "0.5", "1.5", "10", t + H - 1, "0", 1, "0", "0", "0"]
+                           for t in list(opens)[:query['limit']]]).encode()
+        time.sleep(0.02)  # Round-trip latency
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('X-MBX-USED-WEIGHT-1M', str(2 * len(StubBinance.requests)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    StubBinance.requests = []
+    StubBinance.rate_limited = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubBinance)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_split_windows_covers_range_without_overlap():
+    windows = split_windows(0, 25 * H, '1h', limit=10)
+    assert windows == [(0, 10 * H - 1), (10 * H, 20 * H - 1), (20 * H, 25 * H - 1)]
+
+
+def test_download_merges_concurrent_windows(stub_url):
+    downloader = KlineDownloader(base_url=stub_url, limit=100, max_concurrency=8)
+    klines = downloader.download('SOLUSDT', '1h', 0, 2500 * H)
+    opens = [k[0] for k in klines]
+    assert opens == [i * H for i in range(2500)]
+    assert downloader.stats['requests'] == 25
+    assert len(StubBinance.requests) == 25
+    # Each download runs its own event loop; the shared bucket follows it
+    assert len(downloader.download('SOLUSDT', '1h', 0, 150 * H)) == 150
+
+
+def test_download_retries_after_rate_limit(stub_url):
+    StubBinance.rate_limited = 2
+    downloader = KlineDownloader(base_url=stub_url, limit=100, max_concurrency=1)
+    klines = downloader.download('SOLUSDT', '1h', 0, 150 * H)
+    assert len(klines) == 150
+    assert downloader.stats['retries'] == 2
+
+
+def test_bucket_follows_used_weight_header():
+    bucket = WeightBucket(capacity=100, headroom=1.0)
+    bucket.observe(95)
+    assert bucket.tokens <= 5 + 1e-6
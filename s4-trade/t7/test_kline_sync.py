@@ -0,0 +1,45 @@
+from ohlcv_store import OHLCVStore
+from kline_sync import sync_klines
+
+H = 60 * 60 * 1000
+
+
+def kline(open_time, close):
+    return [open_time, str(close), str(close + 1), str(close - 1), str(close), "5.0",
+            open_time + H - 1, "0", 1, "0", "0", "0"]
+
+
+class FakeExchange:
+    """Serves klines from an in-memory list, recording every request."""
+
+    def __init__(self, klines):
+        self.klines = klines
+        self.calls = []
+
+    def __call__(self, symbol, interval, start_time, end_time, limit):
+        self.calls.append(start_time)
+        rows = [k for k in self.klines if k[0] >= start_time]
+        return rows[:limit]
+
+
+def test_first_sync_pages_through_history(tmp_path):
+    store = OHLCVStore(tmp_path)
+    exchange = FakeExchange([kline(i * H, i) for i in range(25)])
+    stats = sync_klines(store, 'BTCUSDT', '1h', 0, fetch_page=exchange, limit=10)
+    assert stats == {'requests': 3, 'candles': 25, 'rows': 25}
+
+
+def test_refresh_replaces_forming_candle_in_one_request(tmp_path):
+    store = OHLCVStore(tmp_path)
+    exchange = FakeExchange([kline(i * H, i) for i in range(5)])
+    sync_klines(store, 'BTCUSDT', '1h', 0, fetch_page=exchange)
+
+    # The last candle closed at a different price and two more arrived
+    exchange.klines[-1] = kline(4 * H, 40)
+    exchange.klines += [kline(5 * H, 5), kline(6 * H, 6)]
+    exchange.calls.clear()
+    stats = sync_klines(store, 'BTCUSDT', '1h', 0, fetch_page=exchange)
+
+    assert exchange.calls == [4 * H]
+    assert stats == {'requests': 1, 'candles': 3, 'rows': 7}
+    assert list(store.arrays('binance', 'BTCUSDT', '1h')['close']) == [0, 1, 2, 3, 40, 5, 6]
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ohlcv_store import OHLCVStore, load_data
+
+H4 = 4 * 60 * 60 * 1000
+
+
+def make_candles(start, n, step=H4, base=1.0):
+    ts = start + step * np.arange(n)
+    close = base + np.arange(n, dtype=float)
+    return pd.DataFrame({
+        'timestamp': ts, 'open': close, 'high': close + 1,
+        'low': close - 1, 'close': close, 'volume': np.full(n, 10.0),
+    })
+
+
+def test_write_and_load_roundtrip(tmp_path):
+    store = OHLCVStore(tmp_path)
+    store.write('binance', 'SOLUSDT', '4h', make_candles(0, 5))
+    df = store.load('binance', 'SOLUSDT', '4h')
+    assert list(df.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert df.index.name == 'datetime'
+    assert df['timestamp'].tolist() == [i * H4 for i in range(5)]
+    # OHLCV columns are views onto the memory-mapped file
+    assert not df['close'].to_numpy().flags['WRITEABLE']
+
+
+def test_append_replaces_overlapping_candles(tmp_path):
+    store = OHLCVStore(tmp_path)
+    store.write('binance', 'SOLUSDT', '4h', make_candles(0, 5))
+    # Last stored candle was still forming; the refresh re-sends it
+    n = store.append('binance', 'SOLUSDT', '4h', make_candles(4 * H4, 3, base=100.0))
+    assert n == 7
+    close = store.arrays('binance', 'SOLUSDT', '4h')['close']
+    np.testing.assert_array_equal(close, [1, 2, 3, 4, 100, 101, 102])
+    assert store.last_timestamp('binance', 'SOLUSDT', '4h') == 6 * H4
+
+
+def test_append_grows_the_file_in_place(tmp_path):
+    store = OHLCVStore(tmp_path)
+    path = store.path('binance', 'SOLUSDT', '4h')
+    # Stores written before row-major files are converted by their first append
+    store.write('binance', 'SOLUSDT', '4h', make_candles(0, 4))
+    np.save(path, np.asfortranarray(np.load(path)))
+    store.append('binance', 'SOLUSDT', '4h', make_candles(4 * H4, 4, base=5.0))
+    inode = os.stat(path).st_ino
+    for chunk in range(2, 10):
+        store.append('binance', 'SOLUSDT', '4h', make_candles(4 * chunk * H4, 4, base=4 * chunk + 1.0))
+    # Re-sent forming candle: replaced in place too
+    store.append('binance', 'SOLUSDT', '4h', make_candles(39 * H4, 2, base=100.0))
+    assert os.stat(path).st_ino == inode
+    df = store.load('binance', 'SOLUSDT', '4h')
+    assert df['timestamp'].tolist() == [i * H4 for i in range(41)]
+    np.testing.assert_array_equal(df['close'], list(range(1, 40)) + [100, 101])
+    # Rows inside the history fall back to a merged rewrite
+    store.append('binance', 'SOLUSDT', '4h', make_candles(10 * H4, 1, base=-1.0))
+    assert store.arrays('binance', 'SOLUSDT', '4h')['close'][10] == -1
+    assert len(store.matrix('binance', 'SOLUSDT', '4h')) == 41
+
+
+def test_load_slices_by_time(tmp_path):
+    store = OHLCVStore(tmp_path)
+    store.write('binance', 'SOLUSDT', '4h', make_candles(0, 10))
+    df = store.load('binance', 'SOLUSDT', '4h', start=2 * H4, end=pd.Timestamp(4 * H4, unit='ms'))
+    assert df['timestamp'].tolist() == [2 * H4, 3 * H4, 4 * H4]
+
+
+def test_missing_key_raises(tmp_path):
+    with pytest.raises(KeyError):
+        OHLCVStore(tmp_path).load('binance', 'NOPE', '1m')
+
+
+def test_load_data_imports_csv_once(tmp_path):
+    csv = tmp_path / 'candles.csv'
+    make_candles(0, 3).to_csv(csv, index=False)
+    store = OHLCVStore(tmp_path / 'store')
+    df = load_data(str(csv), store=store)
+    assert len(df) == 3
+    assert store.keys() == [('binance', 'SOLUSDT', '4h')]
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from param_search import (excess_return_score, grid_configs, grid_search, halving_cost, rungs, sample_configs,
+                          successive_halving)
+
+
+def make_evaluate(noise=0.3, seed=0):
+    """Synthetic backtests: a smooth return surface plus per-window noise, in sample_metrics' layout."""
+    window_noise = np.random.default_rng(seed).normal(0, noise, (1000, 1000))
+    calls = []
+
+    def evaluate(configs, windows):
+        calls.append((len(configs), len(windows)))
+        rows = {}
+        for i, c in enumerate(configs):
+            quality = -((c['fast'] - 12) / 10) ** 2 - ((c['slow'] - 90) / 60) ** 2 - abs(c['stop'] - 0.05)
+            for j, w in enumerate(windows):
+                rows[(i, j)] = {'total_return': quality + window_noise[c['fast'] * 7 + c['slow'] % 100, w],
+                                'max_drawdown': -0.2, 'win_rate': 0.5}
+        return pd.DataFrame.from_dict(rows, orient='index').rename_axis(['param', 'sample'])
+
+    return evaluate, calls
+
+
+SPACE = {'fast': list(range(3, 31)), 'slow': list(range(20, 201, 10)), 'stop': [0.02, 0.05, 0.1]}
+
+
+def faster(p):
+    return p['fast'] < p['slow']
+
+
+def test_schedule_and_cost():
+    assert rungs(27) == [1, 3, 9, 27]
+    assert rungs(20, min_windows=2) == [2, 6, 18, 20]
+    assert rungs(1) == [1]
+    # 81 configs on 1 window, 27 on 3, 9 on 9, 3 on 27, counting only new windows
+    assert halving_cost(81, [1, 3, 9, 27]) == 81 + 27 * 2 + 9 * 6 + 3 * 18
+
+
+def test_sample_configs_from_ranges_and_grids():
+    rng = np.random.default_rng(0)
+    configs = sample_configs({'fast': (3, 30), 'slow': (20, 200), 'alpha': (0.5, 2.5), 'stop': [0.02, 0.05]}, 200,
+                             rng, constraint=faster)
+    assert len(configs) == 200 and len({tuple(c.values()) for c in configs}) == 200
+    assert all(3 <= c['fast'] <= 30 and isinstance(c['fast'], int) and c['fast'] < c['slow'] for c in configs)
+    assert all(0.5 <= c['alpha'] < 2.5 and c['stop'] in (0.02, 0.05) for c in configs)
+    grid = grid_configs(SPACE, faster)
+    assert sample_configs(SPACE, 10 ** 6, rng, faster) == grid
+    picked = sample_configs(SPACE, 50, rng, faster)
+    assert len(picked) == 50 and all(c in grid for c in picked)
+
+
+def test_excess_return_score_matches_scripts():
+    summary = pd.DataFrame({'total_return': [0.5, -0.1], 'max_drawdown': [-0.25, -0.5], 'win_rate': [0.6, 0.4]})
+    np.testing.assert_allclose(excess_return_score(0.1)(summary), [(0.4 / 1.25) * 0.6, (-0.2 / 1.5) * 0.4])
+
+
+def test_halving_finds_grid_winners_with_a_tenth_of_the_backtests():
+    windows = np.arange(27)
+    evaluate, _ = make_evaluate()
+    full = grid_search(evaluate, SPACE, windows, constraint=faster, batch_size=500)
+    assert full.backtests == len(grid_configs(SPACE, faster)) * 27
+    top = [tuple(p.values()) for p in full.leaderboard['params'].head(5)]
+
+    for seed in range(3):
+        evaluate, calls = make_evaluate()
+        found = successive_halving(evaluate, SPACE, windows, full.backtests // 10, constraint=faster, seed=seed)
+        assert found.backtests <= full.backtests // 10
+        assert tuple(found.leaderboard['params'].iloc[0].values()) in top
+        # Survivors saw every window; nothing was evaluated twice
+        assert found.leaderboard['windows'].iloc[0] == 27
+        assert not found.results.duplicated(['config', 'sample']).any()
+        assert [n for _, n in calls] == [1, 2, 6, 18]
+
+
+def test_halving_with_a_tiny_budget_still_scores_one_config_everywhere():
+    evaluate, _ = make_evaluate()
+    found = successive_halving(evaluate, {'fast': (3, 30), 'slow': (40, 200), 'stop': [0.05]}, np.arange(9), 9)
+    assert found.backtests == 9 and len(found.leaderboard) == 1 and found.leaderboard['windows'].iloc[0] == 9
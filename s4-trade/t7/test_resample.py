@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from ohlcv_store import OHLCVStore
+from resample import ResampleCache, resample_ohlcv
+
+H = 60 * 60 * 1000
+
+
+def random_candles(n, start=0, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.standard_normal(n).cumsum()
+    return {
+        'timestamp': start + np.arange(n, dtype=np.int64) * H,
+        'open': close + rng.standard_normal(n),
+        'high': close + 2,
+        'low': close - 2,
+        'close': close,
+        'volume': rng.random(n),
+    }
+
+
+def pandas_resample(candles, rule, offset=None):
+    df = pd.DataFrame(candles).set_index(pd.to_datetime(candles['timestamp'], unit='ms'))
+    agg = df.resample(rule, offset=offset).agg({'open': 'first', 'high': 'max', 'low': 'min',
+                                                'close': 'last', 'volume': 'sum'})
+    return agg.dropna()
+
+
+def test_resample_matches_pandas():
+    candles = random_candles(1000, start=3 * H)
+    # Drop some candles so buckets have uneven sizes
+    keep = np.ones(1000, dtype=bool)
+    keep[[5, 6, 7, 300, 301]] = False
+    candles = {k: v[keep] for k, v in candles.items()}
+    m = np.column_stack([candles[c] for c in ['timestamp', 'open', 'high', 'low', 'close', 'volume']])
+
+    for interval, rule, offset in [('4h', '4h', None), ('1d', '1D', None), ('1w', 'W-SUN', None)]:
+        expected = pandas_resample(candles, rule, offset)
+        out = resample_ohlcv(m, interval)
+        if interval == '1w':
+            # pandas labels weeks by their (Sunday) end; the store labels them by their Monday open
+            expected.index = expected.index - pd.Timedelta(days=6)
+        np.testing.assert_array_equal(out[:, 0], expected.index.asi8 // 1_000_000)
+        np.testing.assert_allclose(out[:, 1:], expected.to_numpy())
+
+
+def test_cache_refreshes_incrementally_and_after_inserts(tmp_path):
+    store = OHLCVStore(tmp_path / 'ohlcv')
+    candles = random_candles(100)
+    store.write('binance', 'SOLUSDT', '1h', {k: v[:50] for k, v in candles.items()})
+    cache = ResampleCache(store)
+
+    first = cache.get('binance', 'SOLUSDT', '4h')
+    assert len(first) == 13  # last bucket holds only 2 candles so far
+
+    # Appending completes the forming bucket and adds new ones
+    store.append('binance', 'SOLUSDT', '1h', {k: v[50:] for k, v in candles.items()})
+    m = np.column_stack([candles[c] for c in ['timestamp', 'open', 'high', 'low', 'close', 'volume']])
+    np.testing.assert_allclose(cache.get('binance', 'SOLUSDT', '4h').iloc[:, 1:].to_numpy(),
+                               resample_ohlcv(m, '4h')[:, 1:])
+
+    # A rewrite of older history (e.g. gap repair) triggers a full rebuild
+    changed = dict(candles, high=candles['high'] + 10)
+    store.write('binance', 'SOLUSDT', '1h', changed)
+    m = np.column_stack([changed[c] for c in ['timestamp', 'open', 'high', 'low', 'close', 'volume']])
+    np.testing.assert_allclose(cache.get('binance', 'SOLUSDT', '4h')['high'].to_numpy(),
+                               resample_ohlcv(m, '4h')[:, 2])
+    assert cache.finest_base('binance', 'SOLUSDT', '1d') == '1h'
@@ -0,0 +1,100 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from results_store import (RUN_COLUMNS, ResultsStore, cached_sweep, canonical_params, code_hash, dataset_version,
+                           result_key)
+from sweep_runner import param_grid
+
+CALLS = []
+
+
+def window_stats(params, arrays, rng):
+    if params['window'] == 13:
+        raise ValueError('unlucky window')
+    CALLS.append((params['window'], params['sample']))
+    start = int(arrays['starts'][params['sample']])
+    values = arrays['close'][start:start + params['window']]
+    return {'mean': float(values.mean()), 'count': len(values)}
+
+
+def band_stats(params, arrays, rng):
+    low, high = params['band']
+    return {'span': high - low}
+
+
+def keys_for(tasks, close, starts, code=None):
+    dataset = dataset_version(close)
+    code = code or code_hash(window_stats)
+    return [result_key(dataset, code, 'stats', {'window': t['window']}, starts[t['sample']], t['window'])
+            for t in tasks]
+
+
+def setup():
+    close = np.cumsum(np.random.default_rng(0).normal(size=2000)) + 100
+    starts = np.random.default_rng(1).integers(0, 1500, 5)
+    return close, starts, {'close': close, 'starts': starts}
+
+
+def test_params_are_canonical():
+    assert canonical_params('{"b": 1, "a": 0.5}') == canonical_params({'a': 0.5, 'b': np.int64(1)}) \
+        == '{"a": 0.5, "b": 1}'
+
+
+def test_extending_a_grid_only_computes_new_cells(tmp_path):
+    close, starts, arrays = setup()
+    path = str(tmp_path / 'results.sqlite')
+    tasks = param_grid({'window': [10, 50], 'sample': range(5)})
+    CALLS.clear()
+    with ResultsStore(path) as store:
+        first = cached_sweep(store, window_stats, tasks, keys_for(tasks, close, starts), arrays, workers=1,
+                             progress=False)
+    assert len(CALLS) == 10 and not first['cached'].any()
+    assert first['mean'].tolist() == [close[s:s + t['window']].mean() for t in tasks for s in [starts[t['sample']]]]
+    assert first['count'].dtype == np.int64
+
+    grown = param_grid({'window': [10, 50, 100], 'sample': range(5)})
+    CALLS.clear()
+    with ResultsStore(path) as store:
+        second = cached_sweep(store, window_stats, grown, keys_for(grown, close, starts), arrays, workers=1,
+                              progress=False)
+    assert sorted(CALLS) == [(100, s) for s in range(5)]
+    assert second['cached'].tolist() == [True] * 10 + [False] * 5
+    pd.testing.assert_frame_equal(second.iloc[:10][first.columns].drop(columns='cached'),
+                                  first.drop(columns='cached'))
+    # Every row carries the run that computed it
+    assert second['run_id'].tolist() == [1] * 10 + [2] * 5
+    assert second['run_host'].notna().all() and second['computed_at'].notna().all()
+    assert 'numpy' in json.loads(second['run_versions'].iloc[0]) and set(RUN_COLUMNS) <= set(second.columns)
+
+
+def test_new_data_or_code_misses_and_failures_are_retried(tmp_path):
+    close, starts, arrays = setup()
+    tasks = param_grid({'window': [10, 13], 'sample': range(3)})
+    with ResultsStore(str(tmp_path / 'results.sqlite')) as store:
+        out = cached_sweep(store, window_stats, tasks, keys_for(tasks, close, starts), arrays, workers=2,
+                           progress=False)
+        assert out['error'].notna().tolist() == [False] * 3 + [True] * 3 and out['mean'].iloc[3:].isna().all()
+        assert store.missing(keys_for(tasks, close, starts)) == [3, 4, 5]
+        assert store.missing(keys_for(tasks, close, starts, code='changed')) == list(range(6))
+        changed = close.copy()
+        changed[0] += 1
+        assert store.missing(keys_for(tasks, changed, starts)) == list(range(6))
+
+        # Append-only: a stored key keeps its first value
+        key = keys_for(tasks, close, starts)[0]
+        store.append([key], [{'mean': -1.0, 'count': 0}])
+        assert store.fetch([key])['mean'].iloc[0] == pytest.approx(out['mean'].iloc[0])
+
+
+def test_tuple_valued_params_are_one_task_each(tmp_path):
+    close, starts, arrays = setup()
+    tasks = [{'band': (5, 10), 'sample': 0}, {'band': (1, 20), 'sample': 1}, {'band': (2, 3), 'sample': 2}]
+    keys = [result_key(dataset_version(close), code_hash(band_stats), 'band', t, starts[t['sample']], 10)
+            for t in tasks]
+    with ResultsStore(str(tmp_path / 'results.sqlite')) as store:
+        out = cached_sweep(store, band_stats, tasks, keys, arrays, workers=1, progress=False)
+        assert out['span'].tolist() == [5, 19, 1] and out['band'].tolist() == [(5, 10), (1, 20), (2, 3)]
+        assert store.fetch(keys)['span'].tolist() == [5, 19, 1]
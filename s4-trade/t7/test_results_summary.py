@@ -0,0 +1,86 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import results_summary
+from results_store import ResultsStore, result_key
+from results_summary import METRICS, summarize, top_k
+
+
+def results_frame(n, seed):
+    rng = np.random.default_rng(seed)
+    params = [json.dumps({'fast_ma': f, 'slow_ma': s}) for f in range(5, 10) for s in (20, 30)]
+    df = pd.DataFrame({
+        'strategy': rng.choice(['SMA Crossover', 'RSI', 'Bollinger Bands'], n),
+        'params': rng.choice(params, n),
+        'sample': rng.integers(0, 50, n),
+        'total_return': rng.normal(0.02, 0.1, n),
+        'max_drawdown': -rng.uniform(0, 0.5, n),
+        'sharpe_ratio': rng.normal(0.5, 1, n),
+        'win_rate': rng.uniform(0, 1, n),
+        'total_trades': rng.integers(0, 40, n),
+    })
+    # No trades: undefined win rate and Sharpe, as vbt reports them
+    df.loc[df['total_trades'] == 0, ['win_rate', 'sharpe_ratio']] = np.nan
+    return df
+
+
+def reference(df):
+    grouped = df.groupby(['strategy', 'params'])
+    summary = grouped[METRICS].mean()
+    summary['samples'] = grouped.size()
+    return summary.reset_index()
+
+
+def check(summary, df):
+    expected = reference(df)
+    summary = summary.sort_values(['strategy', 'params']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(summary, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize('block_bytes', [results_summary.BLOCK_BYTES, 4096])
+def test_csv_matches_pandas_groupby(tmp_path, monkeypatch, block_bytes):
+    monkeypatch.setattr(results_summary, 'MERGE_EVERY', 3)
+    df = results_frame(20000, 0)
+    path = str(tmp_path / 'backtest_results.csv')
+    df.to_csv(path, index=False)
+    check(summarize(path, block_bytes=block_bytes), df)
+
+
+def test_parquet_file_and_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_summary, 'MERGE_EVERY', 3)
+    parts = [results_frame(5000, seed) for seed in range(4)]
+    directory = tmp_path / 'results'
+    directory.mkdir()
+    for i, part in enumerate(parts):
+        part.to_parquet(directory / f'part-{i}.parquet', index=False)
+    df = pd.concat(parts, ignore_index=True)
+    df.to_parquet(tmp_path / 'results.parquet', index=False, row_group_size=1000)
+    check(summarize(str(tmp_path / 'results.parquet'), batch_rows=700), df)
+    check(summarize(str(directory), batch_rows=700), df)
+
+
+def test_results_store_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_summary, 'MERGE_EVERY', 3)
+    monkeypatch.setattr(results_summary, 'SQLITE_ROWS', 700)
+    df = results_frame(5000, 2)
+    path = str(tmp_path / 'backtest_results.sqlite')
+    with ResultsStore(path) as store:
+        store.append([result_key('data', 'code', r.strategy, r.params, i, 500) for i, r in enumerate(df.itertuples())],
+                     df[['sample'] + METRICS].to_dict('records'))
+    check(summarize(path), df)
+
+
+def test_top_k_matches_a_full_sort():
+    summary = reference(results_frame(3000, 1))
+    summary.loc[3, 'win_rate'] = np.nan  # unscorable groups never qualify
+    expression = 'total_return / (1 + abs(max_drawdown)) * win_rate'
+    expected = summary.assign(score=summary.eval(expression)).dropna(subset=['score'])
+    expected = expected.sort_values('score', ascending=False).head(5).reset_index(drop=True)
+    pd.testing.assert_frame_equal(top_k(summary, expression, k=5), expected)
+    pd.testing.assert_frame_equal(top_k(summary, 'composite', k=5), expected)
+    pd.testing.assert_frame_equal(top_k(summary, lambda s: s['sharpe_ratio'], k=3),
+                                  top_k(summary, 'sharpe', k=3))
+    assert len(top_k(summary, k=100)) == len(summary) - 1
@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import vectorbt as vbt
+
+from robustness import draw_windows, sample_metrics, sample_portfolio, take_windows
+
+
+def random_price(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, n))),
+                     index=pd.date_range('2021-01-01', periods=n, freq='4h'))
+
+
+def sma_signals(price, pairs):
+    fast = np.column_stack([price.rolling(f).mean() for f, _ in pairs])
+    slow = np.column_stack([price.rolling(s).mean() for _, s in pairs])
+    return fast > slow, fast < slow
+
+
+def test_windows_are_seeded_and_in_range():
+    starts = draw_windows(1000, 500, 50, seed=42)
+    np.testing.assert_array_equal(starts, draw_windows(1000, 500, 50, seed=42))
+    assert starts.min() >= 0 and starts.max() <= 500
+    x = np.arange(1000)
+    np.testing.assert_array_equal(take_windows(x, [3, 7], 4), [[3, 7], [4, 8], [5, 9], [6, 10]])
+    with pytest.raises(ValueError):
+        draw_windows(100, 500, 1)
+
+
+def test_batched_columns_match_one_portfolio_per_pair():
+    price = random_price(3000, 0)
+    pairs = [(5, 30), (10, 30), (8, 50)]
+    entries, exits = sma_signals(price, pairs)
+    starts = draw_windows(len(price), 500, 6, seed=1)
+    sl, tp = [0.05, 0.03, 0.1], 0.05
+    metrics = sample_metrics(sample_portfolio(price, entries, exits, starts, 500, sl_stop=sl, tp_stop=tp,
+                                              init_cash=10000, fees=0.001, freq='4h'))
+    assert metrics.index.names == ['param', 'sample'] and len(metrics) == 18
+    for (param, sample), row in metrics.iterrows():
+        window = slice(starts[sample], starts[sample] + 500)
+        pf = vbt.Portfolio.from_signals(price.iloc[window], entries[window, param], exits[window, param],
+                                        init_cash=10000, fees=0.001, sl_stop=sl[param], tp_stop=tp, freq='4h')
+        expected = [pf.total_return(), pf.max_drawdown(), pf.sharpe_ratio(), pf.trades.win_rate(),
+                    len(pf.trades.records)]
+        np.testing.assert_allclose(row.to_numpy(dtype=float), expected, rtol=1e-9)
+
+
+def many_pairs():
+    price = random_price(11_000, 2)
+    pairs = [(f, s) for f in range(3, 23) for s in (30, 50, 100, 150, 200)]
+    entries, exits = sma_signals(price, pairs)
+    return price, entries, exits, draw_windows(len(price), 500, 100, seed=3)
+
+
+def run_many_pairs(price, entries, exits, starts):
+    return sample_metrics(sample_portfolio(price, entries, exits, starts, 500, sl_stop=0.05, tp_stop=0.1,
+                                           init_cash=10000, fees=0.001, freq='4h'))
+
+
+def test_many_pairs_run_as_one_simulation():
+    assert len(run_many_pairs(*many_pairs())) == 100 * 100
+
+
+@pytest.mark.benchmark
+def test_many_pairs_take_seconds():
+    price, entries, exits, starts = many_pairs()
+    sample_portfolio(price, entries[:, :1], exits[:, :1], starts[:1], 500, sl_stop=0.05, freq='4h')  # compile
+    started = time.perf_counter()
+    run_many_pairs(price, entries, exits, starts)
+    assert time.perf_counter() - started < 10
@@ -0,0 +1,78 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import vectorbt as vbt
+
+from stop_sweep import run_stop_sweep, stop_grid, sweep_summary
+from trade_analytics import trade_excursions
+
+
+def random_candles(n, seed):
+    rng = np.random.default_rng(seed)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))),
+                      index=pd.date_range('2022-01-01', periods=n, freq='h'))
+    return pd.DataFrame({'High': close * (1 + rng.uniform(0, 0.01, n)), 'Low': close * (1 - rng.uniform(0, 0.01, n)),
+                         'Close': close})
+
+
+def signals(df):
+    move = df['Close'].pct_change()
+    return move < -0.012, move > 0.012
+
+
+def reference_sweep(df, entries, short_entries, tp_percentages, rr_ratios):
+    """The nested per-pair loop app3 used to run."""
+    rows = []
+    for tp in tp_percentages:
+        for rr in rr_ratios:
+            pf = vbt.Portfolio.from_signals(close=df['Close'], entries=entries, short_entries=short_entries,
+                                            tp_stop=tp / 100, sl_stop=tp / rr / 100, freq='1h',
+                                            init_cash=10000, accumulate=False)
+            trades = pf.trades.records
+            mae = trade_excursions(df['High'], df['Low'], trades['entry_idx'], trades['exit_idx'],
+                                   trades['entry_price'], trades['direction'])['mae']
+            winners = mae[trades['return'].to_numpy() > 0]
+            years = (df.index[-1] - df.index[0]).total_seconds() / (365 * 24 * 3600)
+            rows.append({'sl_pct': tp / rr,
+                         'win_rate': pf.trades.win_rate() * 100 if pf.trades.count() > 0 else 0,
+                         'ann_return': ((1 + pf.total_return()) ** (1 / years) - 1) * 100,
+                         'mean_mae_winners': winners.mean() if len(winners) else np.nan,
+                         'std_mae_winners': pd.Series(winners).std(),
+                         'trades': len(trades)})
+    return pd.DataFrame(rows, index=stop_grid(tp_percentages, rr_ratios))
+
+
+def test_one_simulation_matches_the_per_pair_loop():
+    df = random_candles(2000, 0)
+    entries, short_entries = signals(df)
+    tp_percentages, rr_ratios = [1, 2, 4], [1, 1.5, 3]
+    pf = run_stop_sweep(df['Close'], entries, short_entries, tp_percentages, rr_ratios, freq='1h')
+    summary, trades = sweep_summary(pf, df['High'], df['Low'])
+    expected = reference_sweep(df, entries, short_entries, tp_percentages, rr_ratios)
+    assert summary.index.equals(expected.index)
+    pd.testing.assert_frame_equal(summary[expected.columns], expected, check_dtype=False)
+    assert len(trades) == summary['trades'].sum() and 'mfe' in trades
+
+
+def dense_sweep(df, entries, short_entries):
+    pf = run_stop_sweep(df['Close'], entries, short_entries, np.linspace(0.5, 5, 50), np.linspace(0.5, 4, 50),
+                        freq='1h')
+    return sweep_summary(pf, df['High'], df['Low'])[0]
+
+
+def test_dense_grid_runs_as_a_single_portfolio():
+    df = random_candles(4000, 1)
+    summary = dense_sweep(df, *signals(df))
+    assert len(summary) == 2500 and summary['trades'].gt(0).all()
+
+
+@pytest.mark.benchmark
+def test_dense_grid_takes_seconds():
+    df = random_candles(4000, 1)
+    entries, short_entries = signals(df)
+    run_stop_sweep(df['Close'].iloc[:100], entries.iloc[:100], short_entries.iloc[:100], [1], [1])  # compile
+    started = time.perf_counter()
+    dense_sweep(df, entries, short_entries)
+    assert time.perf_counter() - started < 5
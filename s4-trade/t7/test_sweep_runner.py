@@ -0,0 +1,92 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sweep_runner import SharedArrays, attach, param_grid, run_sweep
+
+
+def window_mean(params, arrays, rng):
+    if params['window'] == 13:
+        raise ValueError('unlucky window')
+    close = arrays['close']
+    start = int(rng.integers(0, len(close) - params['window']))
+    return {'mean': float(close[start:start + params['window']].mean()), 'start': start,
+            'read_only': not close.flags.writeable}
+
+
+def window_means(param_list, arrays, rngs):
+    return [window_mean(params, arrays, rng) for params, rng in zip(param_list, rngs)]
+
+
+def busy(params, arrays, rng):
+    x = arrays['close']
+    for _ in range(20):
+        x = np.sqrt(x * x + 1.0)
+    return {'value': float(x.sum())}
+
+
+def test_param_grid_expands_products_and_passes_plain_dicts_through():
+    assert param_grid({'a': [1, 2], 'b': 'x', 'c': range(2)}) == [
+        {'a': 1, 'b': 'x', 'c': 0}, {'a': 1, 'b': 'x', 'c': 1}, {'a': 2, 'b': 'x', 'c': 0}, {'a': 2, 'b': 'x', 'c': 1}]
+    plain = [{'a': 1, 'b': 2}, {'a': 3}]
+    assert param_grid(plain) == plain
+
+
+def test_shared_arrays_round_trip_read_only():
+    close = np.linspace(1, 2, 1000)
+    with SharedArrays({'close': close, 'starts': np.arange(5)}) as shared:
+        arrays, blocks = attach(shared.spec)
+        np.testing.assert_array_equal(arrays['close'], close)
+        assert arrays['starts'].dtype == np.int64 and not arrays['close'].flags.writeable
+        del arrays
+        for block in blocks:
+            block.close()
+
+
+def test_results_do_not_depend_on_workers_or_chunking(tmp_path):
+    close = np.cumsum(np.random.default_rng(0).normal(size=5000)) + 500
+    grid = {'window': [10, 13, 50, 200], 'sample': range(25)}
+    serial = run_sweep(window_mean, grid, {'close': close}, workers=1, chunk_size=7, seed=3, progress=False)
+    pooled = run_sweep(window_mean, grid, {'close': close}, out=str(tmp_path / 'results.parquet'), workers=2,
+                       chunk_size=11, seed=3, progress=False)
+    pd.testing.assert_frame_equal(serial, pooled)
+    assert serial['task'].tolist() == list(range(100))
+    assert pooled['read_only'].dropna().all()
+
+    # Failing tasks are recorded, not fatal
+    failed = serial[serial['window'] == 13]
+    assert len(failed) == 25 and failed['error'].str.contains('unlucky').all() and failed['mean'].isna().all()
+    assert serial.loc[serial['window'] != 13, 'error'].isna().all()
+
+    # Streamed file holds every row
+    stored = pd.read_parquet(tmp_path / 'results.parquet').sort_values('task', ignore_index=True)
+    pd.testing.assert_frame_equal(stored.drop(columns='read_only'), pooled.drop(columns='read_only'), check_dtype=False)
+
+    # Batched functions get the same per-task generators; a raise fails its whole chunk
+    ok_grid = {'window': [10, 50], 'sample': range(25)}
+    batched = run_sweep(window_means, ok_grid, {'close': close}, workers=2, seed=3, batched=True, progress=False)
+    pd.testing.assert_frame_equal(batched, run_sweep(window_mean, ok_grid, {'close': close}, workers=1, seed=3,
+                                                     progress=False))
+    chunks = run_sweep(window_means, grid, {'close': close}, workers=1, chunk_size=25, seed=3, batched=True,
+                       progress=False)
+    assert chunks['error'].notna().tolist() == [False] * 25 + [True] * 25 + [False] * 50
+
+    # Another seed draws other windows
+    reseeded = run_sweep(window_mean, grid, {'close': close}, workers=1, seed=4, progress=False)
+    assert not reseeded['start'].equals(serial['start'])
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif((os.cpu_count() or 1) < 4, reason='needs at least 4 cores')
+def test_pool_scales_with_cores():
+    close = np.random.default_rng(1).random(200_000)
+    grid = {'task_id': range(400)}
+    started = time.perf_counter()
+    run_sweep(busy, grid, {'close': close}, workers=1, progress=False)
+    serial = time.perf_counter() - started
+    started = time.perf_counter()
+    run_sweep(busy, grid, {'close': close}, workers=4, progress=False)
+    assert serial / (time.perf_counter() - started) > 2.5
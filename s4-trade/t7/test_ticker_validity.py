@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ticker_validity import CANARY, TickerValidity, download_valid
+
+
+class FakeDownload:
+    """Pretends every ticker not starting with 'BAD' trades on Yahoo."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, batch, max_workers):
+        self.batches.append(list(batch))
+        if self.fail:
+            raise ConnectionError("offline")
+        return {t for t in batch if not t.startswith('BAD')}
+
+
+def test_validates_in_batches_and_skips_known_tickers(tmp_path):
+    path = str(tmp_path / 'validity.json')
+    symbols = [f"C{i}" for i in range(120)] + ['BAD1', 'BAD2']
+    download = FakeDownload()
+    valid = TickerValidity(path, batch_size=50, download=download).valid_symbols(symbols)
+    assert valid == symbols[:120]
+    assert [len(b) for b in download.batches] == [50, 50, 22]
+
+    # Another process reads the table and only asks about the new ticker
+    download = FakeDownload()
+    valid = TickerValidity(path, download=download).valid_symbols(symbols + ['NEW'])
+    assert valid == symbols[:120] + ['NEW']
+    assert download.batches == [['NEW-USD']]
+
+
+def test_failed_batches_stay_unknown_and_expired_entries_are_rechecked(tmp_path):
+    path = str(tmp_path / 'validity.json')
+    assert TickerValidity(path, download=FakeDownload(fail=True)).valid_symbols(['SOL']) == []
+
+    download = FakeDownload()
+    assert TickerValidity(path, download=download).valid_symbols(['SOL', 'BAD']) == ['SOL']
+    assert download.batches == [['SOL-USD', 'BAD-USD']]
+
+    download = FakeDownload()
+    TickerValidity(path, ttl_invalid=0, download=download).valid_symbols(['SOL', 'BAD'])
+    assert download.batches == [['BAD-USD']]
+
+
+def yahoo_frame(closes):
+    """A multi-ticker ``yf.download`` result: (Price, Ticker) columns, NaN where Yahoo had nothing."""
+    index = pd.date_range('2025-01-01', periods=5, freq='D', name='Date')
+    columns = pd.MultiIndex.from_product([['Close', 'Volume'], list(closes)], names=['Price', 'Ticker'])
+    values = np.array([closes[t] for t in closes] * 2, dtype=float).T
+    return pd.DataFrame(np.broadcast_to(values, (5, len(columns))).copy(), index=index, columns=columns)
+
+
+def test_validity_is_read_from_the_returned_closes():
+    calls = []
+
+    def download(tickers, **kwargs):
+        calls.append(tickers)
+        return yahoo_frame({t: np.nan if t.startswith('BAD') else 1.0 for t in tickers})
+
+    assert download_valid(['SOL-USD', 'BAD-USD'], download=download) == {'SOL-USD'}
+    assert calls == [sorted(['SOL-USD', 'BAD-USD', CANARY])]
+    # The canary is only asked for, never reported unless requested
+    assert download_valid(['BAD-USD'], download=download) == set()
+
+
+@pytest.mark.parametrize('result', [pd.DataFrame(), yahoo_frame({CANARY: np.nan, 'SOL-USD': np.nan})])
+def test_empty_downloads_are_failures_not_invalid_tickers(tmp_path, result):
+    def download(tickers, **kwargs):
+        return result
+
+    with pytest.raises(ConnectionError):
+        download_valid(['SOL-USD'], download=download)
+    validity = TickerValidity(str(tmp_path / 'validity.json'),
+                              download=lambda batch, workers: download_valid(batch, workers, download))
+    assert validity.valid_symbols(['SOL']) == [] and validity.table == {}
@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import vectorbt as vbt
+
+from trade_analytics import trade_excursions
+
+
+def reference_excursions(df, trades):
+    """The per-row slice from app3's compute_mae, extended with MFE and timing."""
+    rows = []
+    for _, row in trades.iterrows():
+        start, end = int(row['entry_idx']), int(row['exit_idx'])
+        price = row['entry_price']
+        window = df.iloc[start:end + 1]
+        if row['direction'] == 0:
+            mae, mfe = (window['Low'].min() - price) / price * 100, (window['High'].max() - price) / price * 100
+            at = int(np.argmin(window['Low'].to_numpy()))
+        else:
+            mae, mfe = (price - window['High'].max()) / price * 100, (price - window['Low'].min()) / price * 100
+            at = int(np.argmax(window['High'].to_numpy()))
+        rows.append((mae, mfe, at, end - start + 1))
+    return [np.array(col) for col in zip(*rows)]
+
+
+def random_candles(n, seed):
+    rng = np.random.default_rng(seed)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))),
+                      index=pd.date_range('2022-01-01', periods=n, freq='h'))
+    return pd.DataFrame({'High': close * (1 + rng.uniform(0, 0.01, n)), 'Low': close * (1 - rng.uniform(0, 0.01, n)),
+                         'Close': close})
+
+
+def test_matches_per_trade_slices_on_vectorbt_records():
+    df = random_candles(3000, 0)
+    move = df['Close'].pct_change()
+    pf = vbt.Portfolio.from_signals(df['Close'], entries=move < -0.015, short_entries=move > 0.015,
+                                    tp_stop=np.array([[0.01, 0.03]]), sl_stop=np.array([[0.02, 0.01]]),
+                                    accumulate=False)
+    trades = pf.trades.records
+    assert set(trades['direction']) == {0, 1} and trades['col'].nunique() == 2
+    stats = trade_excursions(df['High'], df['Low'], trades['entry_idx'], trades['exit_idx'],
+                             trades['entry_price'], trades['direction'])
+    mae, mfe, bars_to_mae, bars_in_trade = reference_excursions(df, trades)
+    np.testing.assert_allclose(stats['mae'], mae)
+    np.testing.assert_allclose(stats['mfe'], mfe)
+    np.testing.assert_array_equal(stats['bars_to_mae'], bars_to_mae)
+    np.testing.assert_array_equal(stats['bars_in_trade'], bars_in_trade)
+    assert (stats['mae'] <= stats['mfe']).all()
+
+
+def test_rejects_indices_outside_the_candles():
+    with pytest.raises(ValueError):
+        trade_excursions(np.ones(5), np.ones(5), [0, 3], [2, 5], [1.0, 1.0], [0, 1])
+
+
+def many_trades():
+    df = random_candles(200_000, 1)
+    rng = np.random.default_rng(2)
+    entry = np.sort(rng.integers(0, 199_900, 100_000))
+    exit_ = entry + rng.integers(0, 50, 100_000)
+    return (df['High'].to_numpy(), df['Low'].to_numpy(), entry, exit_, df['Close'].to_numpy()[entry],
+            rng.integers(0, 2, 100_000))
+
+
+def test_100k_trades():
+    stats = trade_excursions(*many_trades())
+    assert len(stats['mae']) == 100_000
+
+
+@pytest.mark.benchmark
+def test_100k_trades_take_milliseconds():
+    args = many_trades()
+    trade_excursions(*(a[:10] if len(a) == 100_000 else a for a in args))  # compile
+    started = time.perf_counter()
+    trade_excursions(*args)
+    assert time.perf_counter() - started < 0.05
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+import vectorbt as vbt
+
+from walk_forward import walk_forward, walk_forward_splits
+
+CONFIGS = [{'fast': f, 'slow': s} for f in (3, 5, 10) for s in (20, 40)]
+KWARGS = dict(init_cash=1000, fees=0.001, freq='4h')
+
+
+def signals(price):
+    ma = {w: price.rolling(w).mean().to_numpy() for w in (3, 5, 10, 20, 40)}
+    fast = np.column_stack([ma[c['fast']] for c in CONFIGS])
+    slow = np.column_stack([ma[c['slow']] for c in CONFIGS])
+    return fast > slow, fast < slow
+
+
+def random_price(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n))),
+                     index=pd.date_range('2021-01-01', periods=n, freq='4h'))
+
+
+def test_splits_tile_the_test_bars():
+    assert walk_forward_splits(1000, 400, 200) == [(0, 400, 400, 600), (200, 600, 600, 800), (400, 800, 800, 1000)]
+    assert walk_forward_splits(1050, 400, 200, anchored=True) == [(0, 400, 400, 600), (0, 600, 600, 800),
+                                                                   (0, 800, 800, 1000)]
+    with pytest.raises(ValueError):
+        walk_forward_splits(500, 400, 200)
+
+
+@pytest.mark.parametrize('anchored', [False, True])
+def test_matches_per_fold_loop(anchored):
+    price = random_price(3000, 0)
+    entries, exits = signals(price)
+    sl = [0.03, 0.05, 0.08, 0.1, 0.15, 0.2]
+    wf = walk_forward(price, entries, exits, CONFIGS, 600, 300, anchored=anchored, sl_stop=sl, workers=1, **KWARGS)
+    assert len(wf.folds) == 8
+
+    equity = KWARGS['init_cash']
+    for fold in wf.folds.itertuples():
+        train = slice(fold.train_start, fold.train_stop)
+        bh = price.iloc[fold.train_stop - 1] / price.iloc[fold.train_start] - 1
+        scores = []
+        for i in range(len(CONFIGS)):
+            pf = vbt.Portfolio.from_signals(price.iloc[train].to_numpy(), entries[train, i], exits[train, i],
+                                            sl_stop=sl[i], **KWARGS)
+            scores.append((pf.total_return() - bh) / (1 + abs(pf.max_drawdown())) * pf.trades.win_rate())
+        assert fold.best == int(np.nanargmax(scores)) and fold.params == CONFIGS[fold.best]
+        assert fold.train_score == pytest.approx(np.nanmax(scores))
+
+        test = slice(fold.test_start, fold.test_stop)
+        pf = vbt.Portfolio.from_signals(price.iloc[test].to_numpy(), entries[test, fold.best], exits[test, fold.best],
+                                        sl_stop=sl[fold.best], **KWARGS)
+        assert fold.test_total_return == pytest.approx(pf.total_return())
+        equity *= 1 + pf.total_return()
+        assert wf.equity.loc[fold.test_last] == pytest.approx(equity)
+
+    assert wf.equity.index.is_monotonic_increasing and len(wf.equity) == 8 * 300
+    assert wf.equity.index[0] == price.index[600]
+
+
+def test_parallel_folds_match_serial():
+    price = random_price(4000, 1)
+    entries, exits = signals(price)
+    serial = walk_forward(price, entries, exits, CONFIGS, 500, 250, tp_stop=0.1, workers=1, **KWARGS)
+    pooled = walk_forward(price, entries, exits, CONFIGS, 500, 250, tp_stop=0.1, workers=2, **KWARGS)
+    pd.testing.assert_frame_equal(serial.folds, pooled.folds)
+    pd.testing.assert_series_equal(serial.equity, pooled.equity)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import yf_candles
+from ohlcv_store import OHLCVStore
+from yf_candles import SOURCE, choose_base, load_yf_candles, period_start
+
+NOW = pd.Timestamp('2025-06-15 12:00', tz='UTC')
+
+
+class FakeTicker:
+    """Hourly candles whose prices are a function of the open time, in New York time like Yahoo's."""
+
+    requests = []
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    def history(self, interval, start, end):
+        FakeTicker.requests.append((self.ticker, interval, start, end))
+        index = pd.date_range(pd.Timestamp(start).ceil('h'), pd.Timestamp(end), freq='h', inclusive='left')
+        return hourly_frame(index).tz_convert('America/New_York')
+
+
+def hourly_frame(index):
+    hours = index.asi8 // 3_600_000_000_000
+    close = 100 + (hours * 7919 % 97).astype(float)
+    return pd.DataFrame({'Open': close - 1, 'High': close + 2, 'Low': close - 2, 'Close': close,
+                         'Volume': (hours % 13 + 1).astype(float)}, index=index)
+
+
+@pytest.fixture
+def fake_yahoo(monkeypatch):
+    FakeTicker.requests = []
+    monkeypatch.setattr(yf_candles.yf, 'Ticker', FakeTicker)
+    return FakeTicker.requests
+
+
+def test_period_start():
+    assert period_start('5d', NOW) == NOW - pd.Timedelta(days=5)
+    assert period_start('6mo', NOW) == pd.Timestamp('2024-12-15 12:00', tz='UTC')
+    assert period_start('2y', NOW) == pd.Timestamp('2023-06-15 12:00', tz='UTC')
+    assert period_start('1wk', NOW) == NOW - pd.Timedelta(weeks=1)
+    assert period_start('ytd', NOW) == pd.Timestamp('2025-01-01', tz='UTC')
+    assert period_start('max', NOW) == pd.Timestamp(0, tz='UTC')
+    with pytest.raises(ValueError):
+        period_start('3x', NOW)
+
+
+def test_choose_base_prefers_finest_fitting_then_stored(tmp_path):
+    store = OHLCVStore(tmp_path)
+    assert choose_base('4h', NOW - pd.Timedelta(days=3), store, 'SOL-USD', NOW) == '1m'
+    assert choose_base('4h', NOW - pd.Timedelta(days=30), store, 'SOL-USD', NOW) == '5m'
+    assert choose_base('4h', NOW - pd.Timedelta(days=300), store, 'SOL-USD', NOW) == '1h'
+    assert choose_base('1d', NOW - pd.Timedelta(days=3000), store, 'SOL-USD', NOW) == '1d'
+
+    # A stored base that already covers the window wins over a finer one
+    index = pd.date_range(NOW - pd.Timedelta(days=40), NOW, freq='h')
+    store.write(SOURCE, 'SOL-USD', '1h', hourly_frame(index).rename(columns=str.lower))
+    assert choose_base('4h', NOW - pd.Timedelta(days=30), store, 'SOL-USD', NOW) == '1h'
+    assert choose_base('4h', NOW - pd.Timedelta(days=50), store, 'SOL-USD', NOW) == '5m'
+
+
+def test_choose_base_rejects_intraday_windows_yahoo_does_not_keep(tmp_path):
+    with pytest.raises(ValueError, match='4h'):
+        choose_base('4h', NOW - pd.Timedelta(days=800), OHLCVStore(tmp_path), 'SOL-USD', NOW)
+
+
+def test_candles_are_resampled_from_the_stored_base(tmp_path, fake_yahoo):
+    store = OHLCVStore(tmp_path / 'ohlcv')
+    now = pd.Timestamp.now(tz='UTC')
+    start, end = (now - pd.Timedelta(days=100)).floor('D'), now.floor('D')
+    df = load_yf_candles('SOL-USD', '4h', start=start, end=end, store=store)
+    assert [r[1] for r in fake_yahoo] == ['1h']
+
+    hourly = hourly_frame(pd.date_range(start, end, freq='h', inclusive='left'))
+    expected = hourly.resample('4h').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+                                          'Volume': 'sum'})
+    pd.testing.assert_frame_equal(df, expected, check_freq=False, check_names=False)
+
+    # Daily candles of the same window come from the stored 1h base without another download
+    daily = load_yf_candles('SOL-USD', '1d', start=start, end=end - pd.Timedelta(hours=1), store=store)
+    assert len(fake_yahoo) == 1
+    np.testing.assert_allclose(daily['Close'], hourly['Close'].resample('1D').last())
@@ -0,0 +1,115 @@
+"""Batched Yahoo Finance ticker validation with a persistent validity table.
+
+Instead of one ``yf.Ticker(t).history()`` round trip per symbol, unknown
+tickers are checked in multi-ticker ``yf.download`` batches, with yfinance
+fetching at most ``max_workers`` tickers of a batch at once. Batches run one
+after another because ``yf.download`` keeps its results in module globals.
+
+A ticker is valid when the download returns at least one close for it.
+yfinance reports failures only by leaving a ticker's column empty, so each
+batch also carries ``CANARY``, a ticker that always trades: if even that one
+comes back empty, the download itself failed (network, rate limit) and the
+batch is not recorded.
+
+Every answer is written to a small JSON table (ticker -> valid, checked_at),
+so repeat fetches skip known tickers entirely. Valid tickers are re-checked
+after ``ttl_valid`` and invalid ones after ``ttl_invalid`` (listings appear
+more often than they disappear).
+
+    from ticker_validity import TickerValidity
+    valid = TickerValidity().valid_symbols(['SOL', 'BTC', 'NOTACOIN'])  # ['SOL', 'BTC']
+"""
+import json
+import os
+import tempfile
+import time
+
+import yfinance as yf
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'yahoo', 'ticker_validity.json')
+TTL_VALID = 7 * 24 * 60 * 60
+TTL_INVALID = 24 * 60 * 60
+BATCH_SIZE = 50
+MAX_WORKERS = 4
+CANARY = 'BTC-USD'
+
+
+def traded(data):
+    """Tickers with at least one close in a multi-ticker ``yf.download`` frame."""
+    if data is None or data.empty:
+        return set()
+    close = data['Close']
+    return set(close.columns[close.notna().any().to_numpy()])
+
+
+def download_valid(tickers, max_workers=MAX_WORKERS, download=yf.download):
+    """Return the subset of ``tickers`` that has recent Yahoo data.
+
+    Raises if ``CANARY`` has no data either, so a failed download (network,
+    rate limit) is not recorded as every ticker being invalid.
+    """
+    tickers = list(tickers)
+    data = download(sorted(set(tickers) | {CANARY}), period='5d', interval='1d', progress=False,
+                    threads=max_workers)
+    valid = traded(data)
+    if CANARY not in valid:
+        raise ConnectionError(f"Yahoo download returned no data for {CANARY}; not recording {len(tickers)} tickers")
+    return valid & set(tickers)
+
+
+class TickerValidity:
+    """Persistent ticker -> {valid, checked_at} table, filled in batches."""
+
+    def __init__(self, path=DEFAULT_PATH, ttl_valid=TTL_VALID, ttl_invalid=TTL_INVALID,
+                 batch_size=BATCH_SIZE, max_workers=MAX_WORKERS, download=download_valid):
+        self.path = path
+        self.ttl_valid = ttl_valid
+        self.ttl_invalid = ttl_invalid
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.download = download
+        self.table = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.table = json.load(f)
+
+    def is_known(self, ticker, now=None):
+        entry = self.table.get(ticker)
+        if entry is None:
+            return False
+        ttl = self.ttl_valid if entry['valid'] else self.ttl_invalid
+        return (now or time.time()) - entry['checked_at'] < ttl
+
+    def check(self, tickers):
+        """Return {ticker: valid}, downloading only tickers without a fresh entry."""
+        tickers = list(dict.fromkeys(tickers))
+        now = time.time()
+        unknown = [t for t in tickers if not self.is_known(t, now)]
+        batches = [unknown[i:i + self.batch_size] for i in range(0, len(unknown), self.batch_size)]
+        for batch in batches:
+            valid = self._check_batch(batch)
+            if valid is None:
+                continue  # Batch failed: leave unknown so the next fetch retries it
+            for t in batch:
+                self.table[t] = {'valid': t in valid, 'checked_at': now}
+        if batches:
+            self._save()
+        return {t: self.table.get(t, {}).get('valid', False) for t in tickers}
+
+    def valid_symbols(self, symbols, quote='USD'):
+        """Filter coin symbols down to those with a ``<symbol>-<quote>`` Yahoo ticker."""
+        valid = self.check(f"{s}-{quote}" for s in symbols)
+        return [s for s in symbols if valid[f"{s}-{quote}"]]
+
+    def _check_batch(self, batch):
+        try:
+            return self.download(batch, self.max_workers)
+        except Exception:
+            return None
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.table, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
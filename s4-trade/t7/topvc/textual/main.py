@@ -1,14 +1,17 @@
 #!/usr/bin/env python3
 
 import os
+import sys
 from textual.app import App, ComposeResult
 from textual.widgets import DataTable, Header, Footer, Input, Button, Label
 from textual.scroll_view import ScrollView
 from textual.containers import Vertical, Horizontal
-import requests
 import asyncio
 from datetime import datetime, timedelta
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+import http_client  # pooled, rate-limited, disk-cached
+
 MORALIS_API_KEY = os.getenv('MORALIS_API_KEY')
 if not MORALIS_API_KEY:
     print("Warning: MORALIS_API_KEY not set, using mock data")
@@ -72,7 +75,7 @@ class TopVCTable(App):
             config = DEX_CONFIG[dex]
             url = f"https://deep-index.moralis.io/api/v2.2/erc20/{config['chain']}/dex/{config['exchange']}/tokens"
             params = {"limit": max(self.N, self.M) * 2}  # fetch more to sort
-            response = await asyncio.to_thread(requests.get, url, headers=headers, params=params)
+            response = await asyncio.to_thread(http_client.get, url, headers=headers, params=params)
             if response.status_code == 200:
                 data = response.json()
                 tokens = data.get("tokens", [])
@@ -26,7 +26,7 @@ def sample_api_response():
 
 @pytest.mark.asyncio
 async def test_load_real_data(sample_api_response):
-    with patch('main.requests.get') as mock_get:
+    with patch('main.http_client.get') as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = sample_api_response
@@ -74,7 +74,7 @@ async def test_pagination():
 
 @pytest.mark.asyncio
 async def test_reload_button(sample_api_response):
-    with patch('main.requests.get') as mock_get:
+    with patch('main.http_client.get') as mock_get:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = sample_api_response
@@ -0,0 +1,75 @@
+"""Per-trade excursion analytics over vectorbt trade records.
+
+app3 computed MAE with ``trades_df.apply(compute_mae, axis=1)``: a pandas
+slice of the candles plus a min/max for every trade, repeated for every
+parameter combination. ``trade_excursions`` takes the record arrays
+(``entry_idx``, ``exit_idx``, ``entry_price``, ``direction``) and walks each
+trade's bar range once in a compiled kernel, producing every metric in the
+same pass.
+
+Excursions are in percent of the entry price, signed so that adverse moves
+are negative and favourable ones positive. ``direction`` follows
+vectorbt's ``TradeDirection`` enum: 0 = long, 1 = short.
+
+    from trade_analytics import trade_excursions
+    rec = pf.trades.records
+    stats = trade_excursions(df['High'], df['Low'], rec['entry_idx'], rec['exit_idx'],
+                             rec['entry_price'], rec['direction'])
+    stats['mae'], stats['mfe'], stats['bars_to_mae'], stats['bars_in_trade']
+"""
+import numpy as np
+from numba import njit
+
+LONG = 0
+SHORT = 1
+
+
+@njit(cache=True)
+def trade_excursions_nb(high, low, entry_idx, exit_idx, entry_price, direction):
+    """MAE, MFE, bars from entry to the MAE bar and bars spanned, per trade.
+
+    A trade spans bars ``entry_idx..exit_idx`` inclusive. For longs the
+    adverse extreme is the lowest low and the favourable one the highest
+    high; shorts are mirrored. Ties resolve to the earliest bar.
+    """
+    n = entry_idx.shape[0]
+    mae = np.empty(n)
+    mfe = np.empty(n)
+    bars_to_mae = np.empty(n, dtype=np.int64)
+    bars_in_trade = exit_idx - entry_idx + 1
+    for t in range(n):
+        start = entry_idx[t]
+        lo = low[start]
+        hi = high[start]
+        lo_at = start
+        hi_at = start
+        for i in range(start + 1, exit_idx[t] + 1):
+            if low[i] < lo:
+                lo = low[i]
+                lo_at = i
+            if high[i] > hi:
+                hi = high[i]
+                hi_at = i
+        price = entry_price[t]
+        if direction[t] == LONG:
+            mae[t] = (lo - price) / price * 100
+            mfe[t] = (hi - price) / price * 100
+            bars_to_mae[t] = lo_at - start
+        else:
+            mae[t] = (price - hi) / price * 100
+            mfe[t] = (price - lo) / price * 100
+            bars_to_mae[t] = hi_at - start
+    return mae, mfe, bars_to_mae, bars_in_trade
+
+
+def trade_excursions(high, low, entry_idx, exit_idx, entry_price, direction):
+    """Python-facing wrapper: returns a dict of per-trade arrays (``mae``, ``mfe``, ``bars_to_mae``, ``bars_in_trade``)."""
+    entry_idx = np.ascontiguousarray(entry_idx, dtype=np.int64)
+    exit_idx = np.ascontiguousarray(exit_idx, dtype=np.int64)
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    if len(entry_idx) and (entry_idx.min() < 0 or exit_idx.max() >= len(high) or (exit_idx < entry_idx).any()):
+        raise ValueError("trade indices fall outside the price arrays")
+    mae, mfe, bars_to_mae, bars_in_trade = trade_excursions_nb(
+        high, np.ascontiguousarray(low, dtype=np.float64), entry_idx, exit_idx,
+        np.ascontiguousarray(entry_price, dtype=np.float64), np.ascontiguousarray(direction, dtype=np.int64))
+    return {'mae': mae, 'mfe': mfe, 'bars_to_mae': bars_to_mae, 'bars_in_trade': bars_in_trade}
@@ -0,0 +1,114 @@
+"""Walk-forward optimization with a stitched out-of-sample equity curve.
+
+Picking the best parameters on the whole series and reporting their
+backtest is in-sample selection. ``walk_forward`` splits the series into
+consecutive test folds, each preceded by a train fold (rolling: a fixed
+number of bars; anchored: everything since the first bar), picks the
+configuration with the best train score, and runs only that configuration
+on the test fold it has not seen. The test folds tile the series, so their
+returns chain into one out-of-sample equity curve.
+
+Signals are computed once on the full series by the caller and sliced per
+fold, so indicators shared by overlapping train folds are never recomputed
+(and each fold's indicators are warmed up by the bars before it). Train
+folds are optimized in parallel through ``sweep_runner.run_sweep``, with the
+price and signal arrays in shared memory.
+
+    from walk_forward import walk_forward
+    entries, exits = strategy_signals('SMA Crossover', configs, price)   # (bars, configs)
+    wf = walk_forward(price, entries, exits, configs, train=1500, test=250,
+                      sl_stop=[c['sl_stop'] for c in configs], init_cash=10000, fees=0.001, freq='4h')
+    wf.folds        # chosen config, train score and out-of-sample metrics per fold
+    wf.equity       # stitched out-of-sample equity curve
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import vectorbt as vbt
+
+from param_search import excess_return_score
+from robustness import sample_metrics, sample_portfolio
+from sweep_runner import run_sweep
+
+WalkForwardResult = namedtuple('WalkForwardResult', ['folds', 'equity', 'portfolio'])
+
+
+def walk_forward_splits(n_bars, train, test, anchored=False):
+    """(train_start, train_stop, test_start, test_stop) per fold; test folds are consecutive and full length."""
+    if train + test > n_bars:
+        raise ValueError(f"train + test ({train + test} bars) is longer than the series ({n_bars} bars)")
+    return [(0 if anchored else start - train, start, start, start + test)
+            for start in range(train, n_bars - test + 1, test)]
+
+
+def _optimize_fold(fold, arrays, rng):
+    """Best configuration on one train fold; runs in a worker process."""
+    price = arrays['close']
+    start, stop = fold['train_start'], fold['train_stop']
+    stops = {name: arrays[name] for name in ('sl_stop', 'tp_stop') if name in arrays}
+    pf = sample_portfolio(price, arrays['entries'], arrays['exits'], [start], stop - start, **stops,
+                          **fold['portfolio_kwargs'])
+    metrics = sample_metrics(pf).droplevel('sample')
+    score = fold['score'] or excess_return_score(price[stop - 1] / price[start] - 1)
+    scores = pd.Series(np.asarray(score(metrics), dtype=float), index=metrics.index)
+    best = int(scores.fillna(-np.inf).to_numpy().argmax())
+    return {'best': best, 'train_score': scores.iloc[best],
+            **{f'train_{name}': value for name, value in metrics.iloc[[best]].to_dict('records')[0].items()}}
+
+
+def walk_forward(price, entries, exits, configs, train, test, anchored=False, sl_stop=None, tp_stop=None,
+                 score=None, workers=None, progress=False, **kwargs):
+    """Optimize on each train fold, trade the winner on the next test fold; returns a ``WalkForwardResult``.
+
+    ``entries``/``exits`` are ``(bars, configs)`` signals on the full series
+    and ``configs`` the parameter dicts they came from; ``sl_stop``/
+    ``tp_stop`` are scalars or one value per config. ``score`` maps per-config
+    train metrics (``sample_metrics`` columns) to a score and must be a
+    module-level function when ``workers > 1``; by default it is the sol4h
+    score against buy-and-hold over the train fold. Every test fold starts
+    flat with fresh cash; the stitched ``equity`` compounds their returns.
+    ``portfolio`` holds one column per test fold. Extra keyword arguments go
+    to ``Portfolio.from_signals``.
+    """
+    close = np.asarray(price, dtype=float)
+    entries = np.asarray(entries, dtype=bool).reshape(len(close), -1)
+    exits = np.asarray(exits, dtype=bool).reshape(len(close), -1)
+    n_configs = entries.shape[1]
+    if len(configs) != n_configs:
+        raise ValueError(f"{len(configs)} configs for {n_configs} signal columns")
+    arrays = {'close': close, 'entries': entries, 'exits': exits}
+    for name, stop in (('sl_stop', sl_stop), ('tp_stop', tp_stop)):
+        if stop is not None:
+            arrays[name] = np.broadcast_to(np.asarray(stop, dtype=float), n_configs).copy()
+
+    splits = walk_forward_splits(len(close), train, test, anchored)
+    tasks = [{'fold': i, 'train_start': a, 'train_stop': b, 'test_start': c, 'test_stop': d,
+              'score': score, 'portfolio_kwargs': kwargs} for i, (a, b, c, d) in enumerate(splits)]
+    folds = run_sweep(_optimize_fold, tasks, arrays, workers=workers, progress=progress)
+    failed = folds[folds['error'].notna()]
+    if not failed.empty:
+        raise RuntimeError(f"fold {failed['fold'].iloc[0]} failed: {failed['error'].iloc[0]}")
+    folds = folds.drop(columns=['task', 'score', 'portfolio_kwargs', 'error'])
+
+    # Out of sample: column j trades fold j's winner over fold j's test bars
+    best = folds['best'].to_numpy()
+    bars = folds['test_start'].to_numpy()[None, :] + np.arange(test)[:, None]
+    columns = pd.Index(folds['fold'], name='fold')
+    frame = lambda values: pd.DataFrame(values, index=pd.RangeIndex(test, name='bar'), columns=columns)
+    stops = {name: arrays[name][best][None] for name in ('sl_stop', 'tp_stop') if name in arrays}
+    pf = vbt.Portfolio.from_signals(frame(close[bars]), frame(entries[bars, best]), frame(exits[bars, best]),
+                                    **stops, **kwargs)
+
+    folds.insert(folds.columns.get_loc('best') + 1, 'params', [configs[i] for i in best])
+    if isinstance(price, pd.Series):
+        folds['test_first'] = price.index[folds['test_start']]
+        folds['test_last'] = price.index[folds['test_stop'] - 1]
+    oos = sample_metrics(pf)
+    folds = pd.concat([folds, oos.add_prefix('test_').reset_index(drop=True)], axis=1)
+
+    returns = pf.returns().to_numpy().ravel(order='F')
+    index = price.index[bars.ravel(order='F')] if isinstance(price, pd.Series) else bars.ravel(order='F')
+    init_cash = kwargs.get('init_cash', 100.0)
+    equity = pd.Series(init_cash * np.cumprod(1 + returns), index=index, name='equity')
+    return WalkForwardResult(folds, equity, pf)
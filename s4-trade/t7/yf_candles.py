@@ -0,0 +1,124 @@
+"""Yahoo Finance candles served from the local store at any timeframe.
+
+The apps used to call ``vbt.YFData.download`` once per timeframe. Here one
+base interval per ticker is downloaded into the ``OHLCVStore`` (source
+``yfinance``) and every other timeframe is derived from it by
+``ResampleCache``. Switching between, say, 1h, 4h and 1d on the same ticker
+is served from disk; Yahoo is only asked for candles the store is missing,
+and at most once per ``REFRESH_SECONDS`` for the newest ones.
+"""
+import os
+import time
+
+import pandas as pd
+import yfinance as yf
+
+from kline_download import interval_ms
+from ohlcv_store import OHLCVStore
+from resample import ResampleCache, divides
+
+SOURCE = 'yfinance'
+REFRESH_SECONDS = 15 * 60
+
+# Yahoo base intervals and how far back each one can be requested
+BASE_LOOKBACK = {
+    '1m': pd.Timedelta(days=7),
+    '5m': pd.Timedelta(days=59),
+    '1h': pd.Timedelta(days=729),
+    '1d': None,
+}
+PERIOD_UNITS = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+
+
+def period_start(period, now=None):
+    """Translate a yfinance period string ('5d', '6mo', '1y', 'max') into a start timestamp."""
+    now = now or pd.Timestamp.now(tz='UTC')
+    if period == 'max':
+        return pd.Timestamp(0, tz='UTC')
+    if period == 'ytd':
+        return pd.Timestamp(year=now.year, month=1, day=1, tz='UTC')
+    for suffix, unit in PERIOD_UNITS.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return now - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def choose_base(interval, start, store, ticker, now=None):
+    """Pick the base interval to derive ``interval`` from for a window starting at ``start``."""
+    now = now or pd.Timestamp.now(tz='UTC')
+    usable = [b for b in BASE_LOOKBACK
+              if divides(b, interval) and (BASE_LOOKBACK[b] is None or start >= now - BASE_LOOKBACK[b])]
+    if not usable:
+        # Yahoo keeps intraday candles only for the BASE_LOOKBACK windows
+        raise ValueError(f"Yahoo has no {interval} candles back to {start:%Y-%m-%d}; "
+                         f"use a later start or a daily or longer interval")
+    # Prefer a base that is already stored and covers the window
+    start_ms = start.value // 1_000_000
+    for b in usable:
+        if store.exists(SOURCE, ticker, b) and len(store.matrix(SOURCE, ticker, b)) \
+                and store.matrix(SOURCE, ticker, b)[0, 0] <= start_ms + interval_ms(b):
+            return b
+    return usable[0]
+
+
+def _download(ticker, interval, start, end):
+    raw = yf.Ticker(ticker).history(interval=interval, start=start, end=end)
+    if raw.empty:
+        return None
+    index = raw.index.tz_convert('UTC') if raw.index.tz is not None else raw.index.tz_localize('UTC')
+    return pd.DataFrame({
+        'timestamp': index.asi8 // 1_000_000,
+        'open': raw['Open'].to_numpy(), 'high': raw['High'].to_numpy(),
+        'low': raw['Low'].to_numpy(), 'close': raw['Close'].to_numpy(),
+        'volume': raw['Volume'].to_numpy(),
+    })
+
+
+def ensure_base(ticker, base, start, end, store):
+    """Download only what the store lacks for ``ticker``/``base`` in [start, end]."""
+    path = store.path(SOURCE, ticker, base)
+    if not store.exists(SOURCE, ticker, base) or not len(store.matrix(SOURCE, ticker, base)):
+        frame = _download(ticker, base, start, end)
+        if frame is not None:
+            store.write(SOURCE, ticker, base, frame)
+        return
+    m = store.matrix(SOURCE, ticker, base)
+    first = pd.Timestamp(int(m[0, 0]), unit='ms', tz='UTC')
+    last = pd.Timestamp(int(m[-1, 0]), unit='ms', tz='UTC')
+    if start < first - pd.Timedelta(milliseconds=interval_ms(base)):
+        frame = _download(ticker, base, start, first)
+        if frame is not None:
+            store.append(SOURCE, ticker, base, frame)
+    if end > last + pd.Timedelta(milliseconds=interval_ms(base)) and time.time() - os.path.getmtime(path) > REFRESH_SECONDS:
+        # From the last stored open time, so the forming candle is replaced
+        frame = _download(ticker, base, last, end)
+        if frame is not None:
+            store.append(SOURCE, ticker, base, frame)
+
+
+def _utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tz is None else ts.tz_convert('UTC')
+
+
+def load_yf_candles(ticker, interval, period=None, start=None, end=None, store=None):
+    """Return ``Open/High/Low/Close/Volume`` candles for ``ticker`` at ``interval``.
+
+    Takes either a yfinance-style ``period`` or ``start``/``end`` dates, like
+    ``vbt.YFData.download``. The index is a UTC ``DatetimeIndex``.
+    """
+    store = store or OHLCVStore()
+    now = pd.Timestamp.now(tz='UTC')
+    end = _utc(end) if end is not None else now
+    start = _utc(start) if start is not None else period_start(period or '1y', now)
+
+    base = choose_base(interval, start, store, ticker, now)
+    ensure_base(ticker, base, start, end, store)
+    if not store.exists(SOURCE, ticker, base):
+        return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+
+    df = ResampleCache(store).get(SOURCE, ticker, interval, base=base,
+                                  start=start.tz_convert(None), end=end.tz_convert(None))
+    df = df.drop(columns='timestamp').rename(columns=str.capitalize)
+    df.index = df.index.tz_localize('UTC')
+    return df